@@ -11,7 +11,11 @@ import xml.etree.ElementTree as ET
 import httpx
 from dotenv import load_dotenv
 
-from db import get_procurement, get_analysis, save_analysis, get_all_procurements, update_ai_relevance
+from db import (
+    get_procurement, get_analysis, save_analysis, get_all_procurements, update_ai_relevance,
+    get_unassessed_procurements,
+)
+from scrapers.http_cache import cached_get
 
 logger = logging.getLogger(__name__)
 
@@ -245,9 +249,7 @@ def fetch_full_notice_text(pub_number: str) -> str | None:
 
     url = f"https://ted.europa.eu/en/notice/{pub_number}/xml"
     try:
-        resp = httpx.get(url, timeout=30, follow_redirects=True)
-        if resp.status_code != 200:
-            return None
+        resp = cached_get(url, timeout=30)
         return _extract_text_from_xml(resp.content)
     except httpx.HTTPError:
         return None
@@ -565,30 +567,23 @@ def ollama_prefilter_all(model: str = "Ministral-3-14B-Instruct-2512-Q4_K_M.gguf
     Skips already-assessed procurements unless force=True.
     Returns number of procurements filtered as irrelevant.
     """
-    procs = get_all_procurements()
+    # Without force only the unassessed queue is needed (partial index lookup)
+    if force:
+        procs = [p for p in get_all_procurements() if (p.get("score") or 0) >= min_score]
+    else:
+        procs = get_unassessed_procurements(min_score=min_score)
     filtered = 0
     checked = 0
-    skipped_low = 0
 
     for p in procs:
-        # Skip procurements that didn't pass sector gate
-        score = p.get("score") or 0
-        if score < min_score:
-            skipped_low += 1
-            continue
-
-        # Skip already assessed unless force
-        if not force and p.get("ai_relevance") is not None:
-            continue
-
         result = ollama_prefilter_procurement(p["id"], model=model)
         if result is not None:
             checked += 1
             if not result["relevant"]:
                 filtered += 1
 
-    logger.info("Ollama prefilter: checked %d, filtered %d as irrelevant, skipped %d (low score)", checked, filtered, skipped_low)
-    print(f"Ollama-prefilter: {checked} bedömda, {filtered} filtrerade som irrelevanta, {skipped_low} hoppade över (score < {min_score})")
+    logger.info("Ollama prefilter: checked %d, filtered %d as irrelevant (score >= %d)", checked, filtered, min_score)
+    print(f"Ollama-prefilter: {checked} bedömda, {filtered} filtrerade som irrelevanta (score >= {min_score})")
     return filtered
 
 
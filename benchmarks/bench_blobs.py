@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Benchmark: inline large text vs compressed procurement_blobs.
+
+Builds a v4-layout database (score_breakdown inline in procurements,
+full_notice_text inline in analyses), times a list scan, runs the v4 → v5
+migration and times the same scan again. Reports the database size before
+and after.
+
+Usage:
+    python -m benchmarks.bench_blobs
+    python -m benchmarks.bench_blobs --rows 50000 --analyzed 0.1
+"""
+
+import argparse
+import json
+import random
+import sqlite3
+
+import db
+import migrate
+from benchmarks.common import FILLER_WORDS, seed_procurements, temp_database, timed
+
+# A list view: every row read, wide text columns skipped
+SCAN_SQL = "SELECT id, title, buyer, score FROM procurements WHERE title LIKE '%coaching%'"
+
+
+def _make_legacy(rows: int, analyzed: float, seed: int = 7):
+    """Re-add the v4 inline columns and fill them with realistic text."""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(str(db.DB_PATH))
+    conn.execute("ALTER TABLE procurements ADD COLUMN score_breakdown TEXT")
+    conn.execute("ALTER TABLE analyses ADD COLUMN full_notice_text TEXT")
+    breakdown = {
+        "sector_gate": "CPV 80532000",
+        "keywords": {w: rng.randint(1, 10) for w in rng.sample(FILLER_WORDS, 20)},
+        "buyer_bonus": 5,
+    }
+    conn.execute("UPDATE procurements SET score_breakdown = ?",
+                 (json.dumps(breakdown, ensure_ascii=False),))
+    ids = [r[0] for r in conn.execute("SELECT id FROM procurements")]
+    conn.executemany(
+        "INSERT INTO analyses (procurement_id, kravsammanfattning, full_notice_text) VALUES (?, 'k', ?)",
+        [(pid, " ".join(rng.choices(FILLER_WORDS, k=3000))) for pid in rng.sample(ids, int(len(ids) * analyzed))],
+    )
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+
+
+def _scan():
+    conn = sqlite3.connect(str(db.DB_PATH))
+    conn.execute(SCAN_SQL).fetchall()
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compressed blob storage benchmark")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--analyzed", type=float, default=0.05, help="Share of rows with a stored notice text")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with temp_database():
+        seed_procurements(args.rows)
+        _make_legacy(args.rows, args.analyzed)
+        inline = timed(_scan, args.repeat)
+        migrate.migrate_v4_to_v5()
+        side_table = timed(_scan, args.repeat)
+
+    print(f"List scan, {args.rows} rows")
+    print(f"  inline text:   {inline * 1000:8.1f} ms")
+    print(f"  side table:    {side_table * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
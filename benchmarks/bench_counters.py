@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Benchmark: COUNT/SUM aggregates vs trigger-maintained counters.
+
+Replays what a dashboard rerun asks for (get_stats, get_label_stats,
+get_pipeline_summary and the admin status figures).
+
+Usage:
+    python -m benchmarks.bench_counters
+    python -m benchmarks.bench_counters --rows 200000
+"""
+
+import argparse
+
+import db
+from benchmarks.common import seed_procurements, temp_database, timed
+
+
+def _aggregate_rerun():
+    """The pre-counter queries: full-table aggregates on every rerun."""
+    conn = db.get_connection()
+    for sql in [
+        "SELECT COUNT(*) FROM procurements",
+        "SELECT AVG(score) FROM procurements",
+        "SELECT COUNT(*) FROM procurements WHERE score >= 60",
+        "SELECT source, COUNT(*) FROM procurements GROUP BY source",
+        "SELECT COUNT(*) FROM labels",
+        "SELECT COUNT(*) FROM labels WHERE label = 'relevant'",
+        "SELECT COUNT(*) FROM labels WHERE label = 'irrelevant'",
+        "SELECT stage, COUNT(*), SUM(COALESCE(estimated_value, 0) * probability / 100.0),"
+        " SUM(COALESCE(estimated_value, 0)) FROM pipeline GROUP BY stage",
+        "SELECT COUNT(*) FROM procurements WHERE ai_relevance IS NOT NULL",
+        "SELECT COUNT(*) FROM procurements WHERE (deadline IS NULL OR deadline >= date('now'))"
+        " AND status != 'expired'",
+        "SELECT COUNT(*) FROM procurements WHERE status = 'expired'"
+        " OR (deadline IS NOT NULL AND deadline < date('now'))",
+        "SELECT COUNT(*) FROM procurements WHERE deadline IS NULL",
+        "SELECT COUNT(DISTINCT account_id) FROM procurements WHERE account_id IS NOT NULL",
+        *[f"SELECT COUNT(*) FROM procurements WHERE {f} IS NOT NULL AND {f} != ''"
+          for f in ["title", "buyer", "geography", "deadline", "description", "cpv_codes"]],
+        "SELECT COUNT(*) FROM procurements WHERE estimated_value IS NOT NULL AND estimated_value > 0",
+    ]:
+        conn.execute(sql).fetchall()
+    conn.close()
+
+
+def _counter_rerun():
+    db.get_stats()
+    db.get_label_stats()
+    db.get_pipeline_summary()
+    db.get_status_counts()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard counters benchmark")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with temp_database():
+        seed_procurements(args.rows)
+        db.rebuild_counters()
+        aggregates = timed(_aggregate_rerun, args.repeat)
+        counters = timed(_counter_rerun, args.repeat)
+
+    print(f"Dashboard rerun, {args.rows} rows, best of {args.repeat}")
+    print(f"  COUNT/SUM aggregates: {aggregates * 1000:8.1f} ms")
+    print(f"  counters table:       {counters * 1000:8.1f} ms")
+    print(f"  speedup:              {aggregates / counters:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Benchmark: per-call open/close vs pooled connection reuse.
+
+Replays the read calls a kanban render makes (stats, the procurement list
+and per-card label/analysis lookups) against a synthetic database.
+
+Usage:
+    python -m benchmarks.bench_db_connections
+    python -m benchmarks.bench_db_connections --rows 5000 --cards 120
+"""
+
+import argparse
+import sqlite3
+
+import db
+from benchmarks.common import seed_procurements, temp_database, timed
+
+
+def _legacy_get_connection() -> sqlite3.Connection:
+    """The pre-pool connection factory: new connection + PRAGMAs per call."""
+    conn = sqlite3.connect(str(db.DB_PATH))
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA foreign_keys = ON")
+    return conn
+
+
+def _kanban_render(cards: int):
+    db.get_stats()
+    procs = db.get_all_procurements()
+    for p in procs[:cards]:
+        db.get_label(p["id"])
+        db.get_analysis(p["id"])
+    db.get_label_stats()
+    db.get_pipeline_summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Connection pool benchmark")
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--cards", type=int, default=120)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with temp_database():
+        seed_procurements(args.rows)
+        calls = args.cards * 2 + 4
+
+        pooled = db.get_connection
+        db.get_connection = _legacy_get_connection
+        try:
+            per_call = timed(lambda: _kanban_render(args.cards), args.repeat)
+        finally:
+            db.get_connection = pooled
+        reused = timed(lambda: _kanban_render(args.cards), args.repeat)
+
+    print(f"Kanban render, {args.rows} rows, ~{calls} db calls")
+    print(f"  per-call open/close: {per_call * 1000:8.1f} ms")
+    print(f"  pooled reuse:        {reused * 1000:8.1f} ms")
+    print(f"  speedup:             {per_call / reused:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Benchmark: listing-page parse throughput per HTML backend.
+
+Builds Kommers- and e-Avrop-shaped listing pages from the test fixtures,
+with many rows and a large ASP.NET ViewState, and times a full listing
+parse (rows + pagination form) for each backend in scrapers.parsing.PARSERS,
+on the whole page and restricted by the scrapers' SoupStrainers.
+
+Usage:
+    python -m benchmarks.bench_parsing
+    python -m benchmarks.bench_parsing --rows 100 --viewstate 500
+"""
+
+import argparse
+import random
+import re
+import string
+from pathlib import Path
+
+import scrapers.eavrop as eavrop
+import scrapers.kommers as kommers
+import scrapers.parsing as parsing
+from benchmarks.common import timed
+from scrapers.eavrop import EAvropScraper
+from scrapers.kommers import KommersScraper
+
+FIXTURES_DIR = Path(__file__).parent.parent / "tests" / "fixtures"
+STRAINERS = ((kommers, "_ROWS_ONLY"), (kommers, "_FORMS_ONLY"), (eavrop, "_GRID_ONLY"), (eavrop, "_INPUTS_ONLY"))
+
+
+def _pager(viewstate_kb: int) -> str:
+    rng = random.Random(3)
+    viewstate = "".join(rng.choices(string.ascii_letters + string.digits + "+/", k=viewstate_kb * 1024))
+    return (f'<form method="post"><input type="hidden" name="__VIEWSTATE" value="{viewstate}" />'
+            '<input type="hidden" name="__EVENTVALIDATION" value="ev" />'
+            '<button type="submit">Nästa</button></form>')
+
+
+def _kommers_page(rows: int, viewstate_kb: int) -> str:
+    html = (FIXTURES_DIR / "kommers_listing.html").read_text()
+    row = re.search(r'<div class="row mt-4 mb-4">.*?<div class="col-md-2">.*?</div>\s*</div>', html, re.S).group(0)
+    body = "".join(row.replace("12345", str(20000 + i)) for i in range(rows))
+    return f"<html><body>{_pager(viewstate_kb)}{body}</body></html>"
+
+
+def _eavrop_page(rows: int, viewstate_kb: int) -> str:
+    html = (FIXTURES_DIR / "eavrop_listing.html").read_text()
+    row = re.findall(r"<tr>\s*<td>.*?</tr>", html, re.S)[0]
+    body = "".join(row.replace("5001", str(9000 + i)) for i in range(rows))
+    return (f"<html><body>{_pager(viewstate_kb)}"
+            f'<table id="ctl00_mainContent_tenderGridView">{body}</table></body></html>')
+
+
+def _parse_kommers(page: str):
+    records = KommersScraper()._parse_listing(page)
+    KommersScraper._extract_next_form(page)
+    return records
+
+
+def _parse_eavrop(page: str):
+    records = EAvropScraper()._parse_listing(page)
+    EAvropScraper._build_postback(page, 2)
+    return records
+
+
+def _measure(parser: str, strained: bool, fn, page: str, repeat: int) -> tuple[float, int]:
+    saved = {(m, n): getattr(m, n) for m, n in STRAINERS}
+    parsing.PARSER = parser
+    if not strained:
+        for m, n in STRAINERS:
+            setattr(m, n, None)
+    try:
+        count = len(fn(page))
+        return timed(lambda: fn(page), repeat=repeat), count
+    finally:
+        for (m, n), value in saved.items():
+            setattr(m, n, value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML parsing backend benchmark")
+    parser.add_argument("--rows", type=int, default=50, help="Notice rows per listing page")
+    parser.add_argument("--viewstate", type=int, default=200, help="ViewState size in KB")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pages = {
+        "kommers": (_parse_kommers, _kommers_page(args.rows, args.viewstate)),
+        "eavrop": (_parse_eavrop, _eavrop_page(args.rows, args.viewstate)),
+    }
+    default = parsing.PARSER
+    for source, (fn, page) in pages.items():
+        print(f"{source}: {args.rows} rows, {len(page) / 1024:.0f} KB page")
+        for backend in parsing.PARSERS:
+            for strained in (False, True):
+                seconds, count = _measure(backend, strained, fn, page, args.repeat)
+                assert count == args.rows
+                label = f"{backend}{' + strainer' if strained else ''}"
+                print(f"  {label:<26} {seconds * 1000:8.1f} ms   {1 / seconds:7.1f} pages/s")
+    parsing.PARSER = default
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Benchmark: purging expired procurements with cascading child rows.
+
+Every procurement gets a label and a pipeline entry; all rows are expired
+so the whole table is purged in one call.
+
+Usage:
+    python -m benchmarks.bench_purge
+    python -m benchmarks.bench_purge --rows 200000
+"""
+
+import argparse
+import sqlite3
+import time
+
+import db
+from benchmarks.common import seed_procurements, temp_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Purge benchmark")
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with temp_database():
+        seed_procurements(args.rows)
+        conn = sqlite3.connect(str(db.DB_PATH))
+        conn.execute("UPDATE procurements SET status = 'expired', deadline = '2020-01-01'")
+        conn.execute("INSERT INTO labels (procurement_id, label) SELECT id, 'relevant' FROM procurements")
+        conn.execute("INSERT INTO pipeline (procurement_id) SELECT id FROM procurements")
+        conn.commit()
+        conn.close()
+
+        t0 = time.perf_counter()
+        deleted = db.purge_old_expired(days=0)
+        elapsed = time.perf_counter() - t0
+
+    print(f"Purge of {deleted} procurements (+ {2 * deleted} child rows)")
+    print(f"  temp-table join + ON DELETE CASCADE: {elapsed:8.2f} s")
+
+
+if __name__ == "__main__":
+    main()
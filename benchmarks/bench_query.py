@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Benchmark: full-table SELECT * vs projected keyset pages for the kanban.
+
+Usage:
+    python -m benchmarks.bench_query
+    python -m benchmarks.bench_query --rows 200000
+"""
+
+import argparse
+
+import db
+from benchmarks.common import seed_procurements, temp_database, timed
+
+CARD_COLUMNS = [
+    "id", "title", "buyer", "source", "published_date", "deadline", "estimated_value",
+    "currency", "score", "ai_relevance", "description_preview", "label", "has_analysis",
+]
+BANDS = [(60, 100), (30, 59), (1, 29)]
+
+
+def _legacy_kanban():
+    """Load everything, filter and sort in Python, look up label/analysis per card."""
+    procs = db.get_all_procurements()
+    visible = [p for p in procs if (p.get("score") or 0) > 0 and p.get("ai_relevance") != "irrelevant"]
+    visible.sort(key=lambda p: p.get("published_date") or "", reverse=True)
+    for lo, hi in BANDS:
+        for p in [p for p in visible if lo <= p["score"] <= hi][:50]:
+            db.get_label(p["id"])
+            db.get_analysis(p["id"])
+
+
+def _paged_kanban():
+    for lo, hi in BANDS:
+        filters = {"min_score": lo, "max_score": hi, "ai_relevance": "not_irrelevant"}
+        db.count_procurements(**filters)
+        db.query_procurements(CARD_COLUMNS, limit=50, order_by="published", **filters)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kanban query benchmark")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with temp_database():
+        seed_procurements(args.rows)
+        legacy = timed(_legacy_kanban, args.repeat)
+        paged = timed(_paged_kanban, args.repeat)
+
+    print(f"Kanban render, {args.rows} rows, best of {args.repeat}")
+    print(f"  SELECT * + per-card lookups: {legacy * 1000:8.1f} ms")
+    print(f"  projected keyset pages:      {paged * 1000:8.1f} ms")
+    print(f"  speedup:                     {legacy / paged:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
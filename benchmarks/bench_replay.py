@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Benchmark: a full scrape run replayed offline from a recorded cassette.
+
+--record runs every scraper once against the live sites (full sync, real
+rate limits) and saves the session to a cassette. Without it, the cassette
+is replayed through run_scrapers.scrape_sources() into a temporary database
+with an empty HTTP cache and no rate limits, so the time covers request
+scheduling, parsing and upserts at the simulated latency, and can be
+compared across changes.
+
+Usage:
+    python -m benchmarks.bench_replay --record
+    python -m benchmarks.bench_replay
+    python -m benchmarks.bench_replay --latency recorded
+    python -m benchmarks.bench_replay --latency 0.2 --repeat 5
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import run_scrapers
+import scrapers.http_cache as http_cache
+import scrapers.ratelimit as ratelimit
+from benchmarks.common import temp_database
+from scrapers.cassette import CASSETTE_DIR, RecordingTransport, ReplayTransport, load_cassette
+
+DEFAULT_CASSETTE = CASSETTE_DIR / "scrape_run.json.gz"
+
+
+def _record(path: Path) -> None:
+    transport = RecordingTransport()
+    with temp_database():
+        counts = run_scrapers.scrape_sources(on_progress=print, full=True, transport=transport)
+    transport.save(path)
+    print(f"Sparade {len(transport.interactions)} anrop ({sum(counts.values())} upphandlingar) i {path}")
+
+
+def _replay(interactions: list[dict], latency: float | None) -> tuple[float, int, int]:
+    transport = ReplayTransport(interactions, latency=latency)
+    http_cache.get_cache().clear()
+    with temp_database():
+        t0 = time.perf_counter()
+        counts = run_scrapers.scrape_sources(on_progress=lambda msg: None, full=True, transport=transport)
+        return time.perf_counter() - t0, sum(counts.values()), transport.requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline scrape run benchmark")
+    parser.add_argument("--cassette", type=Path, default=DEFAULT_CASSETTE)
+    parser.add_argument("--record", action="store_true", help="Record a new cassette from the live sites")
+    parser.add_argument("--latency", default="0.1",
+                        help="Simulated seconds per request, or 'recorded' for the recorded timings")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        http_cache.CACHE_PATH = Path(tmp) / "http_cache.db"
+        if args.record:
+            _record(args.cassette)
+        else:
+            _run(args)
+        http_cache.get_cache().close()
+
+
+def _run(args):
+    if not args.cassette.exists():
+        raise SystemExit(f"{args.cassette} saknas; spela in med --record")
+    latency = None if args.latency == "recorded" else float(args.latency)
+    interactions = load_cassette(args.cassette)
+    # Measure the pipeline, not the politeness limits
+    ratelimit.HOST_LIMITS = {}
+    ratelimit.DEFAULT_LIMIT = ratelimit.RateLimit(rate=1e6, burst=10**6)
+
+    runs = []
+    for _ in range(args.repeat):
+        ratelimit.reset_limiters()
+        runs.append(_replay(interactions, latency))
+    seconds, records, requests = min(runs)
+    assert all(r[1:] == (records, requests) for r in runs)
+
+    label = "recorded latency" if latency is None else f"{latency * 1000:.0f} ms per request"
+    print(f"{args.cassette.name}: {len(interactions)} recorded requests, {label}")
+    print(f"  replayed requests: {requests:8d}")
+    print(f"  records stored:    {records:8d}")
+    print(f"  scrape run:        {seconds:8.2f} s   ({records / seconds:.0f} records/s)")
+
+
+if __name__ == "__main__":
+    main()
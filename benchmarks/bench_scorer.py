@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Benchmark: scoring throughput per core for each keyword matcher backend.
+
+Runs score_procurement() over synthetic procurements in a single process
+on each backend in scorer.MATCHER_BACKENDS: the pyahocorasick automaton
+when installed, and the substring fallback (one `kw in text` per keyword,
+as the scorer did before the automaton).
+
+It then rescores a seeded database end to end: row by row with one
+update_score() commit each, against run_scrapers.score_all() (score_many()
+and one executemany() transaction), and finally a full rescore with
+score_all() across 1, 2, 4 ... process-pool workers up to --workers.
+
+Usage:
+    python -m benchmarks.bench_scorer
+    python -m benchmarks.bench_scorer --records 5000 --rescore 100000
+    python -m benchmarks.bench_scorer --workers 8
+"""
+
+import argparse
+import os
+import random
+import time
+
+import db
+import run_scrapers
+import scorer
+from benchmarks.common import make_record, seed_procurements, temp_database, timed
+from scorer import KeywordMatcher, score_procurement
+
+
+def _rescore_per_row() -> int:
+    procurements = db.get_all_procurements()
+    for p in procurements:
+        score, rationale, breakdown = score_procurement(
+            p["title"], p["description"] or "", p["buyer"] or "", p["cpv_codes"] or "")
+        db.update_score(p["id"], score, rationale, breakdown)
+    return len(procurements)
+
+
+def _rescore(n: int, fn, runs: int = 1) -> list[float]:
+    """Seed *n* rows and time *runs* consecutive calls of fn()."""
+    times = []
+    with temp_database():
+        seed_procurements(n)
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t0)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scorer throughput benchmark")
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--rescore", type=int, default=20000, help="Rows in the end-to-end rescoring run")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Most workers in the scaling run")
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    rows = [(r["title"], r["description"], r["buyer"], r["cpv_codes"])
+            for r in (make_record(i, rng) for i in range(args.records))]
+    default = scorer._MATCHER
+
+    def run_scorer():
+        for row in rows:
+            score_procurement(*row)
+
+    print(f"Scoring {args.records} procurements on one core "
+          f"({len(default.keywords)} keywords, ~{sum(len(r[1]) for r in rows) // len(rows)} chars each)")
+    for backend in scorer.MATCHER_BACKENDS:
+        scorer._MATCHER = KeywordMatcher(default.keywords, backend)
+        seconds = timed(run_scorer, repeat=args.repeat)
+        print(f"  {backend:<14} {seconds:6.2f} s   {args.records / seconds:8.0f} records/s")
+    scorer._MATCHER = default
+
+    [per_row] = _rescore(args.rescore, _rescore_per_row)
+    batched, unchanged = _rescore(args.rescore, lambda: run_scrapers.score_all(on_progress=lambda msg: None), runs=2)
+    print(f"Rescoring {args.rescore} stored procurements")
+    print(f"  update_score() per row:   {per_row:6.2f} s")
+    print(f"  score_all() batched:      {batched:6.2f} s")
+    print(f"  score_all() no changes:   {unchanged:6.2f} s")
+
+    counts = [1]
+    while counts[-1] * 2 <= args.workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != args.workers:
+        counts.append(args.workers)
+    print(f"Full rescore of {args.rescore} procurements by worker count ({os.cpu_count()} cores)")
+    single = None
+    for workers in counts:
+        [seconds] = _rescore(args.rescore, lambda: run_scrapers.score_all(
+            on_progress=lambda msg: None, rescore_all=True, workers=workers))
+        single = single or seconds
+        speedup = f"{single / seconds:5.2f}x" if workers > 1 else ""
+        print(f"  {workers:2d} workers: {seconds:6.2f} s   {args.rescore / seconds:8.0f} records/s   {speedup}")
+
+
+if __name__ == "__main__":
+    main()
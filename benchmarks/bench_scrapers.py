@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Benchmark: sources and detail pages fetched sequentially vs concurrently.
+
+Serves the offline fixtures through an httpx.MockTransport that adds a
+fixed per-request latency, so the numbers reflect request scheduling
+rather than network conditions. The HTTP cache lives in a temporary
+directory and is emptied before each cold measurement.
+
+Usage:
+    python -m benchmarks.bench_scrapers
+    python -m benchmarks.bench_scrapers --latency 0.2 --details 300
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+import scrapers.http_cache as http_cache
+import scrapers.ratelimit as ratelimit
+from scrapers.backoff import arequest
+from scrapers.base import DETAIL_CONCURRENCY, fetch_details, make_async_client
+from scrapers.eavrop import EAvropScraper
+from scrapers.kommers import KommersScraper
+from scrapers.ted import TedScraper
+
+FIXTURES_DIR = Path(__file__).parent.parent / "tests" / "fixtures"
+DETAIL_HTML = (
+    "<dl><dt>Upphandlande myndighet</dt><dd>Region Skåne</dd>"
+    "<dt>Beskrivning</dt><dd>Utbildning i ledarskap för chefer</dd></dl>"
+)
+
+
+def _transport(latency: float) -> httpx.MockTransport:
+    kommers = (FIXTURES_DIR / "kommers_listing.html").read_text()
+    eavrop = (FIXTURES_DIR / "eavrop_listing.html").read_text()
+    notices = json.loads((FIXTURES_DIR / "ted_notices.json").read_text())
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        if request.url.host == "api.ted.europa.eu":
+            return httpx.Response(200, json={"notices": notices})
+        if "TenderNotice/" in request.url.path or "upphandling.aspx" in request.url.path:
+            return httpx.Response(200, text=DETAIL_HTML)
+        return httpx.Response(200, text=kommers if "kommersannons" in request.url.host else eavrop)
+
+    return httpx.MockTransport(handler)
+
+
+async def _sequential(latency: float) -> int:
+    async with make_async_client(transport=_transport(latency)) as client:
+        total = 0
+        for scraper in (TedScraper(), KommersScraper(), EAvropScraper()):
+            total += len(await scraper.afetch(client))
+        return total
+
+
+async def _concurrent(latency: float) -> int:
+    async with make_async_client(transport=_transport(latency)) as client:
+        lists = await asyncio.gather(*(s.afetch(client) for s in (TedScraper(), KommersScraper(), EAvropScraper())))
+        return sum(len(x) for x in lists)
+
+
+async def _details_sequential(latency: float, urls: list[str]) -> list:
+    async with make_async_client(transport=_transport(latency)) as client:
+        return [EAvropScraper._parse_detail((await arequest(client, "GET", u)).text) for u in urls]
+
+
+async def _details_concurrent(latency: float, urls: list[str]) -> list:
+    async with make_async_client(transport=_transport(latency)) as client:
+        return await fetch_details(client, urls, EAvropScraper._parse_detail)
+
+
+def _time(coro, cold: bool = True) -> tuple[float, object]:
+    if cold:
+        http_cache.get_cache().clear()
+    t0 = time.perf_counter()
+    result = asyncio.run(coro)
+    return time.perf_counter() - t0, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scraper concurrency benchmark")
+    parser.add_argument("--latency", type=float, default=0.1, help="Simulated seconds per request")
+    parser.add_argument("--details", type=int, default=120, help="Detail pages (6 e-Avrop pages ~ 120)")
+    args = parser.parse_args()
+    # Measure scheduling, not the politeness limits
+    ratelimit.HOST_LIMITS = {}
+    ratelimit.DEFAULT_LIMIT = ratelimit.RateLimit(rate=1e6, burst=10**6)
+    with tempfile.TemporaryDirectory() as tmp:
+        http_cache.CACHE_PATH = Path(tmp) / "http_cache.db"
+        _run(args)
+        http_cache.get_cache().close()
+
+
+def _run(args):
+    seq, n_seq = _time(_sequential(args.latency))
+    con, n_con = _time(_concurrent(args.latency))
+    assert n_seq == n_con
+
+    urls = [f"https://www.e-avrop.com/org/visa/upphandling.aspx?id={i}" for i in range(args.details)]
+    d_seq, r_seq = _time(_details_sequential(args.latency, urls))
+    d_con, r_con = _time(_details_concurrent(args.latency, urls))
+    assert r_seq == r_con
+    http_cache.get_cache().reset_stats()
+    d_warm, r_warm = _time(_details_concurrent(args.latency, urls), cold=False)
+    assert r_warm == r_con
+    stats = http_cache.get_cache().stats
+
+    print(f"3 sources, {n_seq} notices, {args.latency * 1000:.0f} ms per request")
+    print(f"  one after another: {seq:6.2f} s")
+    print(f"  concurrent:        {con:6.2f} s")
+    print(f"{args.details} detail pages on one host")
+    print(f"  sequential:        {d_seq:6.2f} s")
+    print(f"  {DETAIL_CONCURRENCY} per host:        {d_con:6.2f} s")
+    print(f"  warm HTTP cache:   {d_warm:6.2f} s   ({stats.hit_ratio:.0%} hits)")
+
+
+if __name__ == "__main__":
+    main()
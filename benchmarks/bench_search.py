@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Benchmark: LIKE '%...%' scans vs the FTS5 index behind search_procurements.
+
+Usage:
+    python -m benchmarks.bench_search
+    python -m benchmarks.bench_search --rows 200000
+"""
+
+import argparse
+
+import db
+from benchmarks.common import seed_procurements, temp_database, timed
+
+QUERIES = ["ledarskap", "förändringsledning", "Region Skåne", "coaching workshop", "ord1234"]
+LIMIT = 200
+
+
+def _like_search(query: str) -> list[dict]:
+    """The pre-FTS search: substring match on title/description/buyer."""
+    conn = db.get_connection()
+    like = f"%{query}%"
+    rows = conn.execute("""
+        SELECT * FROM procurements
+        WHERE title LIKE ? OR description LIKE ? OR buyer LIKE ?
+        ORDER BY score DESC, published_date DESC LIMIT ?
+    """, (like, like, like, LIMIT)).fetchall()
+    conn.close()
+    return [dict(r) for r in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-text search benchmark")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with temp_database():
+        seed_procurements(args.rows)
+        db.rebuild_search_index()
+
+        print(f"Search, {args.rows} rows, top {LIMIT}, best of {args.repeat}")
+        for q in QUERIES:
+            like = timed(lambda: _like_search(q), args.repeat)
+            fts = timed(lambda: db.search_procurements(query=q, limit=LIMIT), args.repeat)
+            print(f"  {q!r:24} LIKE {like * 1000:8.1f} ms   FTS {fts * 1000:8.1f} ms   "
+                  f"{like / fts:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
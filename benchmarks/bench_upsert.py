@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Benchmark: per-record upsert_procurement() vs bulk upsert_procurements().
+
+Usage:
+    python -m benchmarks.bench_upsert
+    python -m benchmarks.bench_upsert --records 10000
+"""
+
+import argparse
+import random
+import time
+
+import db
+from benchmarks.common import make_record, temp_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk upsert benchmark")
+    parser.add_argument("--records", type=int, default=10000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    records = [make_record(i, rng) for i in range(args.records)]
+
+    with temp_database():
+        t0 = time.perf_counter()
+        for r in records:
+            db.upsert_procurement(r)
+        per_record = time.perf_counter() - t0
+
+    with temp_database():
+        t0 = time.perf_counter()
+        db.upsert_procurements(records)
+        bulk_insert = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        db.upsert_procurements(records)
+        bulk_update = time.perf_counter() - t0
+
+    print(f"Upsert of {args.records} records")
+    print(f"  upsert_procurement() per record: {per_record:8.2f} s")
+    print(f"  upsert_procurements() insert:    {bulk_insert:8.2f} s")
+    print(f"  upsert_procurements() unchanged: {bulk_update:8.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Benchmark: concurrent direct writes vs the serialized writer queue.
+
+N simulated dashboard sessions (threads) each make a series of small
+writes (labels, notes, pipeline moves, messages) either directly on their
+own pooled connection or through submit_write(). Reports throughput,
+latency percentiles and "database is locked" failures.
+
+Usage:
+    python -m benchmarks.bench_write_queue
+    python -m benchmarks.bench_write_queue --sessions 32 --writes 100
+"""
+
+import argparse
+import random
+import sqlite3
+import threading
+import time
+
+import db
+from benchmarks.common import seed_procurements, temp_database
+
+def _session_writes(user: str, n: int, ids: list[int], seed: int) -> list[tuple]:
+    """The (fn, args) writes one session makes, in order."""
+    rng = random.Random(seed)
+    writes = []
+    for _ in range(n):
+        pid = rng.choice(ids)
+        writes.append(rng.choice([
+            (db.save_label, (pid, rng.choice(["relevant", "irrelevant"]), "bench")),
+            (db.add_procurement_note, (pid, user, "anteckning")),
+            (db.update_pipeline_stage, (pid, rng.choice(db.PIPELINE_STAGES), user)),
+            (db.send_message, (user, "hej", "kam0", pid)),
+        ]))
+    return writes
+
+
+def _run(sessions: int, writes: int, ids: list[int], queued: bool) -> tuple[float, list[float], int]:
+    latencies: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+    barrier = threading.Barrier(sessions)
+
+    def session(n: int):
+        nonlocal errors
+        plan = _session_writes(f"kam{n}", writes, ids, seed=n)
+        barrier.wait()
+        for fn, args in plan:
+            t0 = time.perf_counter()
+            try:
+                if queued:
+                    db.submit_write(fn, *args).result()
+                else:
+                    fn(*args)
+            except sqlite3.OperationalError:
+                with lock:
+                    errors += 1
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - t0)
+
+    threads = [threading.Thread(target=session, args=(n,)) for n in range(sessions)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - t0, sorted(latencies), errors
+
+
+def _report(label: str, elapsed: float, latencies: list[float], errors: int):
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else float("nan")
+    print(f"  {label:<14} {len(latencies) / elapsed:8.0f} writes/s   "
+          f"p50 {pct(0.5):6.1f} ms   p99 {pct(0.99):7.1f} ms   locked {errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write contention benchmark")
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--sessions", type=int, default=16)
+    parser.add_argument("--writes", type=int, default=50, help="Writes per session")
+    args = parser.parse_args()
+
+    with temp_database():
+        seed_procurements(args.rows)
+        ids = list(range(1, args.rows + 1))
+        for pid in ids[:200]:
+            db.ensure_pipeline_entry(pid)
+        pool = ids[:200]
+        direct = _run(args.sessions, args.writes, pool, queued=False)
+        queued = _run(args.sessions, args.writes, pool, queued=True)
+
+    print(f"{args.sessions} sessions x {args.writes} writes")
+    _report("direct", *direct)
+    _report("writer queue", *queued)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Shared helpers for the benchmark scripts."""
+
+from __future__ import annotations
+
+import random
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import db
+
+TITLE_WORDS = [
+    "Ledarskapsutbildning", "chefsutveckling", "teamutveckling", "coaching",
+    "organisationsutveckling", "ramavtal", "konsulttjänster", "workshop",
+    "kompetensutveckling", "förändringsledning", "arbetsmiljö", "seminarium",
+    "utbildning", "handledning", "medarbetarskap", "kommunikation",
+]
+BUYERS = [
+    "Region Stockholm", "Göteborgs kommun", "Malmö stad", "Skatteverket",
+    "Försäkringskassan", "Region Skåne", "Trafikverket", "Uppsala kommun",
+]
+SOURCES = ["ted", "kommers", "eavrop"]
+# Filler vocabulary so descriptions are not made of the same 16 words
+FILLER_WORDS = [f"ord{n}" for n in range(5000)]
+
+
+def make_record(i: int, rng: random.Random) -> dict:
+    """Build a synthetic procurement dict with realistic field sizes."""
+    words = rng.sample(TITLE_WORDS, 4)
+    return {
+        "source": rng.choice(SOURCES),
+        "source_id": f"BENCH-{i}",
+        "title": " ".join(words).capitalize(),
+        "buyer": rng.choice(BUYERS),
+        "geography": "Sverige",
+        "cpv_codes": rng.choice(["80532000", "79633000,80511000", "79414000", ""]),
+        "procedure_type": None,
+        "published_date": f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "deadline": f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "estimated_value": float(rng.randint(1, 500)) * 10000,
+        "currency": "SEK",
+        "status": "published",
+        "url": f"https://example.invalid/{i}",
+        "description": " ".join(rng.choices(TITLE_WORDS, k=5) + rng.choices(FILLER_WORDS, k=195)),
+        "score": rng.randint(0, 100),
+        "score_rationale": None,
+    }
+
+
+def seed_procurements(n: int, seed: int = 42) -> None:
+    """Insert *n* synthetic procurements into the current DB_PATH."""
+    rng = random.Random(seed)
+    rows = [make_record(i, rng) for i in range(n)]
+    conn = sqlite3.connect(str(db.DB_PATH))
+    conn.executemany("""
+        INSERT INTO procurements
+            (source, source_id, title, buyer, geography, cpv_codes,
+             procedure_type, published_date, deadline, estimated_value,
+             currency, status, url, description, score, score_rationale)
+        VALUES
+            (:source, :source_id, :title, :buyer, :geography, :cpv_codes,
+             :procedure_type, :published_date, :deadline, :estimated_value,
+             :currency, :status, :url, :description, :score, :score_rationale)
+    """, rows)
+    conn.commit()
+    conn.close()
+
+
+@contextmanager
+def temp_database():
+    """Point db.DB_PATH at a fresh temporary database for the duration."""
+    original = db.DB_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = Path(tmp) / "bench.db"
+        db.init_db()
+        try:
+            yield db.DB_PATH
+        finally:
+            db.close_all_connections()
+            db.DB_PATH = original
+
+
+def timed(fn, repeat: int = 5) -> float:
+    """Return the best wall time in seconds over *repeat* runs of fn()."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
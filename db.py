@@ -1,21 +1,376 @@
 """SQLite schema and CRUD operations for procurements."""
 
+import functools
+import hashlib
 import json
+import logging
+import queue
+import re
 import sqlite3
+import sys
+import threading
+import weakref
+import zlib
+from concurrent.futures import Future
+from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
+from typing import NamedTuple
 from datetime import datetime, timedelta, timezone
 
+logger = logging.getLogger(__name__)
+
 DB_PATH = Path(__file__).parent / "upphandlingar.db"
 
+# PRAGMAs applied once when a physical connection is opened.
+# journal_mode=WAL is persistent in the file, the rest are per-connection.
+CONNECTION_PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA cache_size = -16000",     # 16 MB page cache
+    "PRAGMA mmap_size = 134217728",   # 128 MB memory-mapped I/O
+    "PRAGMA temp_store = MEMORY",
+]
+
+# Idle connections kept per database file
+POOL_MAX_IDLE = 8
+
+# Most queued writes committed together by the writer thread
+WRITE_BATCH_MAX = 64
+
+
+# =====================================================================
+# Connection pool
+# =====================================================================
+
+class _Lease:
+    """A physical connection checked out by one thread (re-entrant)."""
+
+    __slots__ = ("conn", "path", "key", "refs", "batching")
+
+    def __init__(self, conn: sqlite3.Connection, path: str, key: tuple[int, str]):
+        self.conn = conn
+        self.path = path
+        self.key = key
+        self.refs = 0
+        # Set while the writer thread runs a group commit on this connection
+        self.batching = False
+
+
+class PooledConnection:
+    """Handle to a pooled sqlite3 connection.
+
+    Behaves like sqlite3.Connection, but close() hands the physical
+    connection back to the pool instead of closing it. Nested
+    get_connection() calls on the same thread share one connection, so
+    the legacy ``conn = get_connection() ... conn.close()`` pattern keeps
+    working. A handle that is garbage collected without close() is
+    logged as a leak and released.
+    """
+
+    def __init__(self, lease: _Lease, origin: str):
+        self._lease = lease
+        self._closed = False
+        self._finalizer = weakref.finalize(self, _report_leak, lease, origin)
+        self._finalizer.atexit = False
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._finalizer.detach()
+        _release(self._lease)
+
+    @property
+    def raw(self) -> sqlite3.Connection:
+        if self._closed:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return self._lease.conn
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+    def commit(self):
+        # Inside a group commit the writer thread commits the whole batch
+        if not self._lease.batching:
+            self.raw.commit()
+
+    def rollback(self):
+        # Inside a group commit the writer rolls back to the write's savepoint
+        if not self._lease.batching:
+            self.raw.rollback()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Same semantics as sqlite3.Connection: commit/rollback, no close
+        return self.raw.__exit__(exc_type, exc, tb)
 
-def get_connection() -> sqlite3.Connection:
-    conn = sqlite3.connect(str(DB_PATH))
+
+_pool_lock = threading.Lock()
+_idle: dict[str, list[sqlite3.Connection]] = {}
+_leases: dict[tuple[int, str], _Lease] = {}
+
+
+def _open_connection(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, check_same_thread=False)
     conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA foreign_keys = ON")
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
     return conn
 
 
+def _release(lease: _Lease):
+    with _pool_lock:
+        lease.refs -= 1
+        if lease.refs > 0:
+            return
+        _leases.pop(lease.key, None)
+    conn = lease.conn
+    if conn.in_transaction:
+        # Uncommitted work is discarded, same as closing a plain connection
+        conn.rollback()
+    with _pool_lock:
+        idle = _idle.setdefault(lease.path, [])
+        if len(idle) < POOL_MAX_IDLE:
+            idle.append(conn)
+            return
+    conn.close()
+
+
+def _report_leak(lease: _Lease, origin: str):
+    logger.warning("Database connection opened at %s was never closed", origin)
+    _release(lease)
+
+
+def get_connection() -> PooledConnection:
+    """Check out a connection to DB_PATH from the pool.
+
+    Call close() (or use transaction()) when done.
+    """
+    path = str(DB_PATH)
+    key = (threading.get_ident(), path)
+    with _pool_lock:
+        lease = _leases.get(key)
+        if lease is None:
+            idle = _idle.get(path)
+            conn = idle.pop() if idle else None
+            lease = _Lease(conn, path, key)
+            _leases[key] = lease
+        lease.refs += 1
+    if lease.conn is None:
+        try:
+            lease.conn = _open_connection(path)
+        except Exception:
+            with _pool_lock:
+                _leases.pop(key, None)
+            raise
+    caller = sys._getframe(1)
+    origin = f"{caller.f_code.co_filename}:{caller.f_lineno} ({caller.f_code.co_name})"
+    return PooledConnection(lease, origin)
+
+
+@contextmanager
+def transaction():
+    """Context manager yielding a pooled connection.
+
+    Commits on success, rolls back on exception, and always returns the
+    connection to the pool.
+    """
+    conn = get_connection()
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def close_all_connections():
+    """Close every idle pooled connection (e.g. before deleting the DB file).
+
+    Stops the writer threads first, after they have drained their queues.
+    """
+    with _pool_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.stop()
+    with _pool_lock:
+        idle = [conn for conns in _idle.values() for conn in conns]
+        _idle.clear()
+    for conn in idle:
+        conn.close()
+
+
+# =====================================================================
+# Serialized writer
+# =====================================================================
+
+class _Writer:
+    """Background thread that owns the write connection to one database.
+
+    Queued writes are run one after another on that connection. Whatever
+    has queued up while the previous commit ran is committed together in
+    one BEGIN IMMEDIATE ... COMMIT, each write inside its own savepoint,
+    so a failing write is rolled back alone and reported on its future.
+    Futures resolve only after the batch has committed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.queue: queue.SimpleQueue = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self._run, name=f"db-writer:{path}", daemon=True)
+        self.thread.start()
+
+    def submit(self, fn, args, kwargs) -> Future:
+        future = Future()
+        self.queue.put((future, fn, args, kwargs))
+        return future
+
+    def stop(self):
+        self.queue.put(None)
+        self.thread.join()
+
+    def _run(self):
+        # Held for the thread's lifetime, so the get_connection() calls made
+        # by queued writes re-enter this lease instead of checking one out
+        conn = get_connection()
+        try:
+            stopping = False
+            while not stopping:
+                item = self.queue.get()
+                if item is None:
+                    break
+                batch = [item]
+                while len(batch) < WRITE_BATCH_MAX:
+                    try:
+                        item = self.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stopping = True
+                        break
+                    batch.append(item)
+                self._commit(conn, batch)
+        finally:
+            conn.close()
+
+    def _commit(self, conn: PooledConnection, batch: list):
+        done = []
+        conn._lease.batching = True
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for future, fn, args, kwargs in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                conn.execute("SAVEPOINT queued_write")
+                try:
+                    done.append((future, True, fn(*args, **kwargs)))
+                except Exception as e:
+                    conn.execute("ROLLBACK TO queued_write")
+                    done.append((future, False, e))
+                conn.execute("RELEASE queued_write")
+            conn.raw.commit()
+        except Exception as e:
+            if conn.raw.in_transaction:
+                conn.raw.rollback()
+            for future, *_ in batch:
+                if future.running():
+                    future.set_exception(e)
+            return
+        finally:
+            conn._lease.batching = False
+        for future, ok, value in done:
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+
+_writers: dict[str, _Writer] = {}
+
+
+def submit_write(fn, *args, **kwargs) -> Future:
+    """Queue ``fn(*args, **kwargs)`` on the writer thread for DB_PATH.
+
+    *fn* is a db write function (save_label, add_procurement_note, ...);
+    its get_connection() calls share the writer's connection and its
+    commit() is deferred to the group commit. Returns a Future with fn's
+    return value or exception, resolved once the write is committed.
+    Called from the writer thread itself, fn runs inline.
+    """
+    path = str(DB_PATH)
+    with _pool_lock:
+        writer = _writers.get(path)
+        if writer is None:
+            writer = _writers[path] = _Writer(path)
+    if threading.current_thread() is writer.thread:
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    return writer.submit(fn, args, kwargs)
+
+
+# Indexes for the hot query paths. Partial indexes must repeat their WHERE
+# term literally in the query (e.g. "status != 'expired'") to be used.
+# tests/test_query_plans.py fails if a query full-scans a large table.
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_procurements_buyer ON procurements(buyer)",
+    "CREATE INDEX IF NOT EXISTS idx_procurements_account ON procurements(account_id)",
+    # Score bands and keyset pages: (score, published_date) and (published_date)
+    # orderings, matching the COALESCE used by query_procurements()
+    "CREATE INDEX IF NOT EXISTS idx_procurements_score_published"
+    " ON procurements(score, COALESCE(published_date, ''))",
+    "CREATE INDEX IF NOT EXISTS idx_procurements_published"
+    " ON procurements(COALESCE(published_date, ''))",
+    "CREATE INDEX IF NOT EXISTS idx_procurements_created ON procurements(created_at)",
+    # Open deadlines (archiving, deadline calendar) vs. expired ones (purge)
+    "CREATE INDEX IF NOT EXISTS idx_procurements_open_deadline"
+    " ON procurements(deadline) WHERE status != 'expired'",
+    "CREATE INDEX IF NOT EXISTS idx_procurements_expired_deadline"
+    " ON procurements(deadline) WHERE status = 'expired'",
+    # AI prefilter queue
+    "CREATE INDEX IF NOT EXISTS idx_procurements_unassessed"
+    " ON procurements(score) WHERE ai_relevance IS NULL",
+    "CREATE INDEX IF NOT EXISTS idx_labels_procurement ON labels(procurement_id)",
+    "CREATE INDEX IF NOT EXISTS idx_pipeline_assigned ON pipeline(assigned_to)",
+    "CREATE INDEX IF NOT EXISTS idx_pipeline_stage ON pipeline(stage)",
+    "CREATE INDEX IF NOT EXISTS idx_pipeline_updated ON pipeline(updated_at)",
+    "CREATE INDEX IF NOT EXISTS idx_procurement_notes_procurement ON procurement_notes(procurement_id)",
+    "CREATE INDEX IF NOT EXISTS idx_procurement_notes_user ON procurement_notes(user_username, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_procurement_notes_created ON procurement_notes(created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_notifications_user_read ON notifications(user_username, read_at)",
+    "CREATE INDEX IF NOT EXISTS idx_messages_to_read ON messages(to_user, read_at)",
+    "CREATE INDEX IF NOT EXISTS idx_messages_from ON messages(from_user, to_user)",
+    "CREATE INDEX IF NOT EXISTS idx_calendar_events_procurement ON calendar_events(procurement_id, event_date)",
+    "CREATE INDEX IF NOT EXISTS idx_calendar_events_user ON calendar_events(user_username, event_date)",
+    "CREATE INDEX IF NOT EXISTS idx_watch_list_user ON watch_list(user_username, watch_type)",
+]
+
+
+# Tables whose rows belong to a procurement and are deleted with it
+CASCADE_TABLES = ["analyses", "labels", "pipeline", "procurement_notes", "procurement_blobs"]
+
+
+def tables_without_cascade(conn) -> list[str]:
+    """Return the CASCADE_TABLES whose procurement FK lacks ON DELETE CASCADE."""
+    stale = []
+    for table in CASCADE_TABLES:
+        fks = conn.execute(f"PRAGMA foreign_key_list({table})").fetchall()
+        if not any(fk["table"] == "procurements" and fk["on_delete"] == "CASCADE" for fk in fks):
+            stale.append(table)
+    return stale
+
+
 def init_db():
     """Create tables if they don't exist."""
     conn = get_connection()
@@ -47,7 +402,6 @@ def init_db():
         CREATE TABLE IF NOT EXISTS analyses (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             procurement_id INTEGER NOT NULL UNIQUE,
-            full_notice_text TEXT,
             kravsammanfattning TEXT,
             matchningsanalys TEXT,
             prisstrategi TEXT,
@@ -56,7 +410,7 @@ def init_db():
             input_tokens INTEGER,
             output_tokens INTEGER,
             created_at TEXT DEFAULT (datetime('now')),
-            FOREIGN KEY (procurement_id) REFERENCES procurements(id)
+            FOREIGN KEY (procurement_id) REFERENCES procurements(id) ON DELETE CASCADE
         )
     """)
     # Add AI relevance columns if they don't exist
@@ -66,8 +420,24 @@ def init_db():
         conn.execute("ALTER TABLE procurements ADD COLUMN ai_relevance TEXT")
     if "ai_relevance_reasoning" not in existing_cols:
         conn.execute("ALTER TABLE procurements ADD COLUMN ai_relevance_reasoning TEXT")
-    if "score_breakdown" not in existing_cols:
-        conn.execute("ALTER TABLE procurements ADD COLUMN score_breakdown TEXT")
+    if "content_hash" not in existing_cols:
+        conn.execute("ALTER TABLE procurements ADD COLUMN content_hash TEXT")
+    # Scorer ruleset and content_hash the current score was computed from
+    if "scored_ruleset" not in existing_cols:
+        conn.execute("ALTER TABLE procurements ADD COLUMN scored_ruleset TEXT")
+    if "scored_content_hash" not in existing_cols:
+        conn.execute("ALTER TABLE procurements ADD COLUMN scored_content_hash TEXT")
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS procurement_blobs (
+            procurement_id INTEGER NOT NULL,
+            field TEXT NOT NULL,
+            codec TEXT NOT NULL,
+            data BLOB NOT NULL,
+            PRIMARY KEY (procurement_id, field),
+            FOREIGN KEY (procurement_id) REFERENCES procurements(id) ON DELETE CASCADE
+        )
+    """)
 
     conn.execute("""
         CREATE TABLE IF NOT EXISTS labels (
@@ -77,7 +447,7 @@ def init_db():
             reason TEXT,
             user_username TEXT,
             created_at TEXT DEFAULT (datetime('now')),
-            FOREIGN KEY (procurement_id) REFERENCES procurements(id)
+            FOREIGN KEY (procurement_id) REFERENCES procurements(id) ON DELETE CASCADE
         )
     """)
 
@@ -107,7 +477,7 @@ def init_db():
             updated_by TEXT,
             created_at TEXT DEFAULT (datetime('now')),
             updated_at TEXT DEFAULT (datetime('now')),
-            FOREIGN KEY (procurement_id) REFERENCES procurements(id)
+            FOREIGN KEY (procurement_id) REFERENCES procurements(id) ON DELETE CASCADE
         )
     """)
 
@@ -118,7 +488,7 @@ def init_db():
             user_username TEXT NOT NULL,
             content TEXT NOT NULL,
             created_at TEXT DEFAULT (datetime('now')),
-            FOREIGN KEY (procurement_id) REFERENCES procurements(id)
+            FOREIGN KEY (procurement_id) REFERENCES procurements(id) ON DELETE CASCADE
         )
     """)
 
@@ -234,6 +604,15 @@ def init_db():
         )
     """)
 
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS scrape_state (
+            source TEXT PRIMARY KEY,
+            watermark TEXT,
+            last_run_at TEXT,
+            last_full_sync_at TEXT
+        )
+    """)
+
     conn.execute("""
         CREATE TABLE IF NOT EXISTS schema_version (
             version INTEGER PRIMARY KEY,
@@ -251,12 +630,22 @@ def init_db():
         conn.execute("ALTER TABLE labels ADD COLUMN user_username TEXT")
 
     # Create indexes
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_procurements_buyer ON procurements(buyer)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_procurements_account ON procurements(account_id)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_pipeline_assigned ON pipeline(assigned_to)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_pipeline_stage ON pipeline(stage)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_notifications_user ON notifications(user_username)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_to ON messages(to_user)")
+    for ddl in INDEXES:
+        conn.execute(ddl)
+    # Superseded by the composite (user, read_at) indexes
+    conn.execute("DROP INDEX IF EXISTS idx_notifications_user")
+    conn.execute("DROP INDEX IF EXISTS idx_messages_to")
+
+    _init_search_index(conn)
+    _init_counters(conn)
+    _init_table_versions(conn)
+
+    stale = tables_without_cascade(conn)
+    if stale:
+        logger.warning(
+            "Tables %s lack ON DELETE CASCADE; procurement deletes remove their "
+            "rows explicitly until `python migrate.py` has run", ", ".join(stale),
+        )
 
     # Seed schema version
     conn.execute("INSERT OR IGNORE INTO schema_version (version) VALUES (2)")
@@ -265,6 +654,481 @@ def init_db():
     conn.close()
 
 
+def _sync_triggers(conn, prefix: str, wanted: dict[str, str]) -> bool:
+    """Make the triggers named *prefix*... exactly *wanted* ({name: sql}).
+
+    Triggers are only dropped and recreated when their definition changed,
+    so init_db() does not touch the schema on every start. Returns True if
+    anything changed.
+    """
+    existing = {
+        r[0]: r[1] for r in conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND substr(name, 1, ?) = ?",
+            (len(prefix), prefix),
+        )
+    }
+    if existing == wanted:
+        return False
+    for name in existing:
+        conn.execute(f"DROP TRIGGER {name}")
+    for sql in wanted.values():
+        conn.execute(sql)
+    return True
+
+
+# =====================================================================
+# Full-text search (FTS5)
+# =====================================================================
+
+# External-content FTS5 index over procurements. unicode61 with
+# remove_diacritics 2 folds å/ä/ö so "forandring" finds "förändring";
+# the prefix indexes keep Swedish compound-word prefix queries cheap.
+_FTS_COLUMNS = ["title", "description", "buyer", "cpv_codes"]
+
+# bm25 column weights, in _FTS_COLUMNS order
+_FTS_WEIGHTS = "10.0, 2.0, 5.0, 1.0"
+
+
+def _init_search_index(conn):
+    """Create the FTS5 table and sync triggers. Backfills a new index."""
+    exists = _has_search_index(conn)
+    cols = ", ".join(_FTS_COLUMNS)
+    new_cols = ", ".join(f"new.{c}" for c in _FTS_COLUMNS)
+    old_cols = ", ".join(f"old.{c}" for c in _FTS_COLUMNS)
+    try:
+        conn.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS procurements_fts USING fts5(
+                {cols},
+                content='procurements', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2',
+                prefix='2 3'
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        logger.warning("FTS5 not available, search falls back to LIKE: %s", e)
+        return
+
+    # Re-scraped rows mostly come back unchanged; skip the FTS delete+insert then
+    changed = " OR ".join(f"old.{c} IS NOT new.{c}" for c in _FTS_COLUMNS)
+    _sync_triggers(conn, "procurements_fts_", {
+        "procurements_fts_ai": (
+            f"CREATE TRIGGER procurements_fts_ai AFTER INSERT ON procurements BEGIN\n"
+            f"    INSERT INTO procurements_fts(rowid, {cols}) VALUES (new.id, {new_cols});\nEND"
+        ),
+        "procurements_fts_ad": (
+            f"CREATE TRIGGER procurements_fts_ad AFTER DELETE ON procurements BEGIN\n"
+            f"    INSERT INTO procurements_fts(procurements_fts, rowid, {cols}) VALUES ('delete', old.id, {old_cols});\nEND"
+        ),
+        "procurements_fts_au": (
+            f"CREATE TRIGGER procurements_fts_au AFTER UPDATE OF {cols} ON procurements WHEN {changed} BEGIN\n"
+            f"    INSERT INTO procurements_fts(procurements_fts, rowid, {cols}) VALUES ('delete', old.id, {old_cols});\n"
+            f"    INSERT INTO procurements_fts(rowid, {cols}) VALUES (new.id, {new_cols});\nEND"
+        ),
+    })
+
+    if not exists:
+        conn.execute("INSERT INTO procurements_fts(procurements_fts) VALUES ('rebuild')")
+
+
+def _has_search_index(conn) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'procurements_fts'"
+    ).fetchone()
+    return row is not None
+
+
+def rebuild_search_index() -> int:
+    """Rebuild the FTS index from the procurements table. Returns indexed rows."""
+    with transaction() as conn:
+        if not _has_search_index(conn):
+            _init_search_index(conn)
+        else:
+            conn.execute("INSERT INTO procurements_fts(procurements_fts) VALUES ('rebuild')")
+        conn.execute("INSERT INTO procurements_fts(procurements_fts) VALUES ('optimize')")
+        return conn.execute("SELECT COUNT(*) FROM procurements").fetchone()[0]
+
+
+def _fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query: every word as a quoted prefix term."""
+    terms = re.findall(r"\w+", text.lower())
+    return " ".join(f'"{t}"*' for t in terms)
+
+
+# =====================================================================
+# Materialized counters
+# =====================================================================
+
+class CounterSpec(NamedTuple):
+    """One rollup kept in the counters table by triggers on *table*.
+
+    SQL expressions use ``{r}`` for the row: NEW/OLD in triggers, the table
+    alias when recomputing. Every row matching *where* adds *value* to the
+    counter (*name*, *key*).
+    """
+    table: str
+    name: str
+    value: str = "1"
+    where: str = "1"
+    key: str = "''"
+
+
+_FILLED_FIELDS = ["title", "buyer", "geography", "deadline", "description", "cpv_codes", "estimated_value"]
+
+COUNTER_SPECS = [
+    CounterSpec("procurements", "procurements"),
+    CounterSpec("procurements", "by_source", key="{r}.source"),
+    CounterSpec("procurements", "scored", where="{r}.score IS NOT NULL"),
+    CounterSpec("procurements", "score_sum", value="{r}.score", where="{r}.score IS NOT NULL"),
+    CounterSpec("procurements", "high_fit", where="{r}.score >= 60"),
+    CounterSpec("procurements", "assessed", where="{r}.ai_relevance IS NOT NULL"),
+    CounterSpec("procurements", "open", where="{r}.status != 'expired'"),
+    CounterSpec("procurements", "expired", where="{r}.status = 'expired'"),
+    CounterSpec("procurements", "no_deadline", where="{r}.deadline IS NULL"),
+    CounterSpec("procurements", "by_account", key="CAST({r}.account_id AS TEXT)", where="{r}.account_id IS NOT NULL"),
+    *[
+        CounterSpec("procurements", "filled", key=f"'{f}'",
+                    where=f"{{r}}.{f} > 0" if f == "estimated_value" else f"{{r}}.{f} != ''")
+        for f in _FILLED_FIELDS
+    ],
+    CounterSpec("labels", "labels"),
+    CounterSpec("labels", "by_label", key="{r}.label"),
+    CounterSpec("pipeline", "pipeline"),
+    CounterSpec("pipeline", "stage_count", key="{r}.stage"),
+    CounterSpec("pipeline", "stage_weighted", key="{r}.stage",
+                value="COALESCE(COALESCE({r}.estimated_value, 0) * {r}.probability / 100.0, 0)"),
+    CounterSpec("pipeline", "stage_value", key="{r}.stage", value="COALESCE({r}.estimated_value, 0)"),
+    CounterSpec("pipeline", "user_stage_count", key="{r}.assigned_to || '/' || {r}.stage",
+                where="{r}.assigned_to IS NOT NULL"),
+    CounterSpec("pipeline", "user_stage_weighted", key="{r}.assigned_to || '/' || {r}.stage",
+                value="COALESCE(COALESCE({r}.estimated_value, 0) * {r}.probability / 100.0, 0)",
+                where="{r}.assigned_to IS NOT NULL"),
+    CounterSpec("watch_list", "active_watches", where="{r}.active = 1"),
+    CounterSpec("calendar_events", "calendar_events"),
+]
+
+
+def _counter_columns(specs: list[CounterSpec]) -> list[str]:
+    """Columns the specs read, in first-use order."""
+    cols: list[str] = []
+    for spec in specs:
+        for part in (spec.value, spec.where, spec.key):
+            for col in re.findall(r"\{r\}\.(\w+)", part):
+                if col not in cols:
+                    cols.append(col)
+    return cols
+
+
+def _counter_triggers(table: str) -> dict[str, str]:
+    """Return {trigger name: CREATE TRIGGER sql} maintaining *table*'s counters."""
+    specs = [s for s in COUNTER_SPECS if s.table == table]
+
+    def apply(row: str, sign: str) -> str:
+        return "".join(
+            f"\n    INSERT INTO counters (name, key, value)"
+            f" SELECT '{s.name}', {s.key.format(r=row)}, {sign}({s.value.format(r=row)})"
+            f" WHERE {s.where.format(r=row)}"
+            f" ON CONFLICT(name, key) DO UPDATE SET value = value + excluded.value;"
+            for s in specs
+        )
+
+    triggers = {
+        f"counters_{table}_ai": f"CREATE TRIGGER counters_{table}_ai AFTER INSERT ON {table} BEGIN{apply('NEW', '+')}\nEND",
+        f"counters_{table}_ad": f"CREATE TRIGGER counters_{table}_ad AFTER DELETE ON {table} BEGIN{apply('OLD', '-')}\nEND",
+    }
+    # Updates only matter when a column the specs read actually changes
+    cols = _counter_columns(specs)
+    if cols:
+        changed = " OR ".join(f"OLD.{c} IS NOT NEW.{c}" for c in cols)
+        triggers[f"counters_{table}_au"] = (
+            f"CREATE TRIGGER counters_{table}_au AFTER UPDATE OF {', '.join(cols)} ON {table}"
+            f" WHEN {changed} BEGIN{apply('OLD', '-')}{apply('NEW', '+')}\nEND"
+        )
+    return triggers
+
+
+def _init_counters(conn):
+    """Create the counters table and triggers; recompute if the specs changed."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS counters (
+            name TEXT NOT NULL,
+            key TEXT NOT NULL DEFAULT '',
+            value NUMERIC NOT NULL DEFAULT 0,
+            PRIMARY KEY (name, key)
+        ) WITHOUT ROWID
+    """)
+    wanted: dict[str, str] = {}
+    for table in dict.fromkeys(s.table for s in COUNTER_SPECS):
+        wanted.update(_counter_triggers(table))
+    if _sync_triggers(conn, "counters_", wanted):
+        _rebuild_counters(conn)
+
+
+def _compute_counters(conn) -> dict[tuple[str, str], float]:
+    """Recompute every counter from the base tables."""
+    result: dict[tuple[str, str], float] = {}
+    for s in COUNTER_SPECS:
+        rows = conn.execute(
+            f"SELECT {s.key.format(r='t')} AS k, SUM({s.value.format(r='t')}) AS v"
+            f" FROM {s.table} t WHERE {s.where.format(r='t')} GROUP BY k"
+        )
+        for key, value in rows:
+            result[(s.name, key)] = value
+    return result
+
+
+def _rebuild_counters(conn):
+    conn.execute("DELETE FROM counters")
+    conn.executemany(
+        "INSERT INTO counters (name, key, value) VALUES (?, ?, ?)",
+        [(name, key, value) for (name, key), value in _compute_counters(conn).items()],
+    )
+
+
+def _read_counters(conn, *names: str) -> dict[str, dict[str, float]]:
+    """Return {name: {key: value}} for the given counters (zero rows dropped)."""
+    result: dict[str, dict[str, float]] = {name: {} for name in names}
+    rows = conn.execute(
+        f"SELECT name, key, value FROM counters WHERE name IN ({', '.join('?' * len(names))}) AND value != 0",
+        names,
+    )
+    for name, key, value in rows:
+        result[name][key] = value
+    return result
+
+
+def rebuild_counters() -> int:
+    """Recompute all counters from scratch. Returns the number of counters."""
+    with transaction() as conn:
+        _rebuild_counters(conn)
+        return conn.execute("SELECT COUNT(*) FROM counters").fetchone()[0]
+
+
+def check_counters() -> dict[tuple[str, str], tuple[float, float]]:
+    """Diff stored counters against a full recompute.
+
+    Returns {(name, key): (stored, actual)} for every counter that differs;
+    an empty dict means the rollups are consistent. Sums of REAL values are
+    compared with a small tolerance.
+    """
+    conn = get_connection()
+    actual = _compute_counters(conn)
+    stored = {(r[0], r[1]): r[2] for r in conn.execute("SELECT name, key, value FROM counters")}
+    conn.close()
+    diffs = {}
+    for k in stored.keys() | actual.keys():
+        s, a = stored.get(k, 0), actual.get(k, 0)
+        if abs(s - a) > 1e-6 * max(1.0, abs(a)):
+            diffs[k] = (s, a)
+    return diffs
+
+
+# =====================================================================
+# Data versions
+# =====================================================================
+
+# Per-table change counters, bumped by triggers on every inserted, updated
+# or deleted row, so any writer (pages, scrapers, the writer queue) is
+# covered. PRAGMA data_version is not usable here: it only reports
+# commits made by *other* connections, and pooled connections are shared.
+VERSIONED_TABLES = [
+    "procurements", "analyses", "procurement_blobs", "labels", "users", "pipeline",
+    "procurement_notes", "accounts", "user_dashboard", "contacts", "watch_list",
+    "contract_timeline", "messages", "calendar_events", "notifications",
+]
+
+
+def _init_table_versions(conn):
+    """Create the table_versions table and its bump triggers."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS table_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    """)
+    conn.executemany(
+        "INSERT OR IGNORE INTO table_versions (name) VALUES (?)",
+        [(t,) for t in VERSIONED_TABLES],
+    )
+    wanted = {}
+    for table in VERSIONED_TABLES:
+        for suffix, event in (("ai", "INSERT"), ("au", "UPDATE"), ("ad", "DELETE")):
+            name = f"table_versions_{table}_{suffix}"
+            wanted[name] = (
+                f"CREATE TRIGGER {name} AFTER {event} ON {table} BEGIN\n"
+                f"    UPDATE table_versions SET version = version + 1 WHERE name = '{table}';\nEND"
+            )
+    _sync_triggers(conn, "table_versions_", wanted)
+
+
+def get_table_versions(*tables: str) -> dict[str, int]:
+    """Return {table: version} for *tables* (default: every versioned table).
+
+    A version only ever increases; any write to the table bumps it.
+    """
+    tables = tables or tuple(VERSIONED_TABLES)
+    conn = get_connection()
+    rows = conn.execute(
+        f"SELECT name, version FROM table_versions WHERE name IN ({', '.join('?' * len(tables))})",
+        tables,
+    ).fetchall()
+    conn.close()
+    versions = {r["name"]: r["version"] for r in rows}
+    unknown = set(tables) - versions.keys()
+    if unknown:
+        raise ValueError(f"Unversioned table(s): {', '.join(sorted(unknown))}")
+    return versions
+
+
+def get_data_version(*tables: str) -> int:
+    """Return one number that changes whenever *tables* (default: all) change.
+
+    Cheap enough to call on every Streamlit rerun; key caches on it.
+    """
+    return sum(get_table_versions(*tables).values())
+
+
+def versioned_cache(*tables: str, maxsize: int = 16):
+    """Memoize a read function until one of *tables* changes.
+
+    The cache key is the function arguments plus get_data_version(*tables),
+    so a write to any listed table invalidates every entry. Results are
+    shared between callers (and sessions), so they must not be mutated.
+    The wrapper has cache_clear().
+    """
+    def decorator(fn):
+        cache: OrderedDict = OrderedDict()
+        lock = threading.Lock()
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (str(DB_PATH), get_data_version(*tables), args, tuple(sorted(kwargs.items())))
+            with lock:
+                if key in cache:
+                    cache.move_to_end(key)
+                    return cache[key]
+            value = fn(*args, **kwargs)
+            with lock:
+                cache[key] = value
+                while len(cache) > maxsize:
+                    cache.popitem(last=False)
+            return value
+
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    return decorator
+
+
+# =====================================================================
+# Compressed blob storage
+# =====================================================================
+
+# Large text that is only read one procurement at a time (full notice
+# text, score breakdowns, descriptions past the preview) lives compressed
+# in procurement_blobs, so procurements and analyses rows stay small and
+# list scans touch fewer pages. zstd is used when the zstandard package is
+# installed, zlib otherwise; the codec is stored per row.
+try:
+    import zstandard as _zstd
+except ImportError:
+    _zstd = None
+
+# procurements.description keeps this much inline for lists, FTS and scoring
+DESCRIPTION_PREVIEW_CHARS = 2000
+
+# Below this, compression saves less than it costs to decode
+_BLOB_MIN_COMPRESS = 256
+
+
+def _encode_blob(text: str) -> tuple[str, bytes]:
+    """Compress *text*, returning (codec, data)."""
+    raw = text.encode("utf-8")
+    if len(raw) < _BLOB_MIN_COMPRESS:
+        return "raw", raw
+    if _zstd is not None:
+        return "zstd", _zstd.ZstdCompressor(level=9).compress(raw)
+    return "zlib", zlib.compress(raw, 6)
+
+
+def _decode_blob(codec: str, data: bytes) -> str:
+    """Inverse of _encode_blob()."""
+    if codec == "raw":
+        raw = data
+    elif codec == "zlib":
+        raw = zlib.decompress(data)
+    elif codec == "zstd":
+        if _zstd is None:
+            raise RuntimeError("Blob is zstd-compressed but the zstandard package is not installed")
+        raw = _zstd.ZstdDecompressor().decompress(data)
+    else:
+        raise ValueError(f"Unknown blob codec: {codec}")
+    return raw.decode("utf-8")
+
+
+_PUT_BLOB_SQL = """
+    INSERT INTO procurement_blobs (procurement_id, field, codec, data)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(procurement_id, field) DO UPDATE SET
+        codec = excluded.codec, data = excluded.data
+"""
+
+
+def _put_blob(conn, procurement_id: int, field: str, text: str | None):
+    """Store *text* as the *field* blob of a procurement; None deletes it."""
+    if text is None:
+        conn.execute(
+            "DELETE FROM procurement_blobs WHERE procurement_id = ? AND field = ?",
+            (procurement_id, field),
+        )
+        return
+    codec, data = _encode_blob(text)
+    conn.execute(_PUT_BLOB_SQL, (procurement_id, field, codec, data))
+
+
+def _get_blobs(conn, procurement_id: int, *fields: str) -> dict[str, str]:
+    """Return the decoded *fields* blobs that exist for a procurement."""
+    rows = conn.execute(
+        f"SELECT field, codec, data FROM procurement_blobs"
+        f" WHERE procurement_id = ? AND field IN ({', '.join('?' * len(fields))})",
+        (procurement_id, *fields),
+    ).fetchall()
+    return {r["field"]: _decode_blob(r["codec"], r["data"]) for r in rows}
+
+
+def move_large_text_to_blobs() -> dict[str, int]:
+    """Move legacy inline large text into procurement_blobs.
+
+    Copies procurements.score_breakdown and analyses.full_notice_text into
+    compressed blobs and drops those columns, and moves any description
+    longer than the preview out of the row. Safe to run again.
+    Returns {field: rows moved}.
+    """
+    moved = {}
+    with transaction() as conn:
+        for table, key, field in (("procurements", "id", "score_breakdown"),
+                                  ("analyses", "procurement_id", "full_notice_text")):
+            if field not in {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}:
+                moved[field] = 0
+                continue
+            rows = conn.execute(f"SELECT {key}, {field} FROM {table} WHERE {field} IS NOT NULL").fetchall()
+            for pid, text in rows:
+                _put_blob(conn, pid, field, text)
+            conn.execute(f"ALTER TABLE {table} DROP COLUMN {field}")
+            moved[field] = len(rows)
+
+        rows = conn.execute(
+            "SELECT id, description FROM procurements WHERE length(description) > ?",
+            (DESCRIPTION_PREVIEW_CHARS,),
+        ).fetchall()
+        for pid, text in rows:
+            _put_blob(conn, pid, "description", text)
+            conn.execute(
+                "UPDATE procurements SET description = ? WHERE id = ?",
+                (text[:DESCRIPTION_PREVIEW_CHARS], pid),
+            )
+        moved["description"] = len(rows)
+    return moved
+
+
 def archive_expired_procurements() -> int:
     """Mark procurements with passed deadline as 'expired'. Returns count."""
     conn = get_connection()
@@ -281,39 +1145,48 @@ def archive_expired_procurements() -> int:
     return count
 
 
+def _delete_procurements(conn, ids, params=()) -> int:
+    """Delete procurements by id; child rows go via ON DELETE CASCADE.
+
+    *ids* is either a SELECT returning the ids (run with *params*) or an
+    iterable of ids. They are staged in a temp table and deleted with one
+    join, so the batch size is not bounded by SQLite's variable limit.
+    On a database not yet migrated to v4, children in tables without the
+    cascade are deleted explicitly first. Runs in the caller's transaction.
+    Returns the number of rows deleted.
+    """
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS doomed_procurements (id INTEGER PRIMARY KEY)")
+    conn.execute("DELETE FROM doomed_procurements")
+    if isinstance(ids, str):
+        conn.execute(f"INSERT OR IGNORE INTO doomed_procurements (id) {ids}", params)
+    else:
+        conn.executemany("INSERT OR IGNORE INTO doomed_procurements (id) VALUES (?)", ((i,) for i in ids))
+    for table in tables_without_cascade(conn):
+        conn.execute(f"DELETE FROM {table} WHERE procurement_id IN (SELECT id FROM doomed_procurements)")
+    count = conn.execute(
+        "DELETE FROM procurements WHERE id IN (SELECT id FROM doomed_procurements)"
+    ).rowcount
+    conn.execute("DELETE FROM doomed_procurements")
+    return count
+
+
 def purge_old_expired(days: int = 180) -> int:
     """Delete procurements that have been expired for >days days.
 
-    Also cascades to analyses, labels, and pipeline.
-    Returns number of deleted procurements.
+    Analyses, labels, pipeline entries and notes go with them (ON DELETE
+    CASCADE). Returns number of deleted procurements.
     """
     conn = get_connection()
-    cutoff = (datetime.now(timezone.utc) - __import__("datetime").timedelta(days=days)).strftime("%Y-%m-%d")
-
-    # Find old expired IDs
-    rows = conn.execute("""
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).strftime("%Y-%m-%d")
+    count = _delete_procurements(conn, """
         SELECT id FROM procurements
         WHERE status = 'expired'
           AND deadline IS NOT NULL
           AND deadline < ?
-    """, (cutoff,)).fetchall()
-
-    if not rows:
-        conn.close()
-        return 0
-
-    ids = [r["id"] for r in rows]
-    placeholders = ",".join("?" * len(ids))
-
-    conn.execute(f"DELETE FROM analyses WHERE procurement_id IN ({placeholders})", ids)
-    conn.execute(f"DELETE FROM labels WHERE procurement_id IN ({placeholders})", ids)
-    conn.execute(f"DELETE FROM pipeline WHERE procurement_id IN ({placeholders})", ids)
-    conn.execute(f"DELETE FROM procurement_notes WHERE procurement_id IN ({placeholders})", ids)
-    conn.execute(f"DELETE FROM procurements WHERE id IN ({placeholders})", ids)
-
+    """, (cutoff,))
     conn.commit()
     conn.close()
-    return len(ids)
+    return count
 
 
 def cross_source_deduplicate() -> int:
@@ -381,16 +1254,18 @@ def cross_source_deduplicate() -> int:
                     f"UPDATE procurements SET {set_clause}, updated_at = datetime('now') WHERE id = ?",
                     [*updates.values(), keeper["id"]],
                 )
+                if "description" in updates:
+                    # The full text moves with the preview, before the cascade drops it
+                    conn.execute(
+                        "UPDATE OR REPLACE procurement_blobs SET procurement_id = ?"
+                        " WHERE procurement_id = ? AND field = 'description'",
+                        (keeper["id"], dupe["id"]),
+                    )
 
             deleted_ids.append(dupe["id"])
 
     if deleted_ids:
-        placeholders = ",".join("?" * len(deleted_ids))
-        conn.execute(f"DELETE FROM analyses WHERE procurement_id IN ({placeholders})", deleted_ids)
-        conn.execute(f"DELETE FROM labels WHERE procurement_id IN ({placeholders})", deleted_ids)
-        conn.execute(f"DELETE FROM pipeline WHERE procurement_id IN ({placeholders})", deleted_ids)
-        conn.execute(f"DELETE FROM procurement_notes WHERE procurement_id IN ({placeholders})", deleted_ids)
-        conn.execute(f"DELETE FROM procurements WHERE id IN ({placeholders})", deleted_ids)
+        _delete_procurements(conn, deleted_ids)
 
     conn.commit()
     conn.close()
@@ -405,139 +1280,183 @@ def deduplicate_procurements() -> int:
     """
     conn = get_connection()
     # Find groups with duplicate (source, title, buyer) and pick the keeper (latest published_date, highest id as tiebreaker)
-    dupes = conn.execute("""
-        SELECT id FROM procurements
-        WHERE id NOT IN (
-            SELECT id FROM (
-                SELECT id,
-                       ROW_NUMBER() OVER (
-                           PARTITION BY source, title, buyer
-                           ORDER BY published_date DESC, id DESC
-                       ) AS rn
-                FROM procurements
-            )
-            WHERE rn = 1
+    deleted = _delete_procurements(conn, """
+        SELECT id FROM (
+            SELECT id,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY source, title, buyer
+                       ORDER BY published_date DESC, id DESC
+                   ) AS rn
+            FROM procurements
         )
-    """).fetchall()
-
-    deleted = len(dupes)
-    if deleted > 0:
-        ids = [row["id"] for row in dupes]
-        placeholders = ",".join("?" * len(ids))
-        conn.execute(f"DELETE FROM analyses WHERE procurement_id IN ({placeholders})", ids)
-        conn.execute(f"DELETE FROM labels WHERE procurement_id IN ({placeholders})", ids)
-        conn.execute(f"DELETE FROM procurements WHERE id IN ({placeholders})", ids)
-        conn.commit()
-
+        WHERE rn > 1
+    """)
+    conn.commit()
     conn.close()
     return deleted
 
 
-def upsert_procurement(data) -> int:
-    """Insert or update a procurement. Returns the row id.
+_UPSERT_COLUMNS = [
+    "source", "source_id", "title", "buyer", "geography", "cpv_codes",
+    "procedure_type", "published_date", "deadline", "estimated_value",
+    "currency", "status", "url", "description", "score", "score_rationale",
+]
 
-    Accepts a dict or a TenderRecord (converted via to_db_dict()).
+# The conditional DO UPDATE makes re-upserting an unchanged record a no-op:
+# no write, no updated_at bump, no triggers, and no RETURNING row.
+_UPSERT_SQL = f"""
+    INSERT INTO procurements ({", ".join(_UPSERT_COLUMNS)}, content_hash, created_at, updated_at)
+    VALUES ({", ".join(":" + c for c in _UPSERT_COLUMNS)}, :content_hash, :now, :now)
+    ON CONFLICT(source, source_id) DO UPDATE SET
+        {", ".join(f"{c} = excluded.{c}" for c in _UPSERT_COLUMNS[2:])},
+        content_hash = excluded.content_hash,
+        updated_at = excluded.updated_at
+    WHERE procurements.content_hash IS NOT excluded.content_hash
+    RETURNING id
+"""
+
+
+class UpsertResult(dict):
+    """Mapping from source_id to row id, plus the ids actually written.
+
+    *changed* lists the rows that were inserted or whose content differed,
+    in input order; downstream stages only need to revisit those.
     """
+
+    def __init__(self):
+        super().__init__()
+        self.changed: list[int] = []
+
+
+def _content_hash(params: dict) -> str:
+    """Fingerprint of every upserted field (full description included)."""
+    payload = json.dumps([params[c] for c in _UPSERT_COLUMNS[2:]], ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def _upsert_params(data, now: str) -> dict:
+    """Normalize a dict or TenderRecord into named upsert parameters."""
     # Support TenderRecord objects
     if hasattr(data, "to_db_dict"):
         data = data.to_db_dict()
-    conn = get_connection()
+    params = {c: data.get(c) for c in _UPSERT_COLUMNS}
+    params["source"] = data["source"]
+    params["source_id"] = data["source_id"]
+    params["title"] = data["title"]
+    params["score"] = data.get("score", 0)
+    params["content_hash"] = _content_hash(params)
+    params["now"] = now
+    return params
+
+
+def upsert_procurements(records) -> UpsertResult:
+    """Insert or update many procurements in one transaction.
+
+    Accepts an iterable of dicts or TenderRecords. Uses
+    INSERT ... ON CONFLICT(source, source_id) DO UPDATE ... RETURNING id,
+    so each record costs one statement and the batch one commit. Rows
+    whose content_hash is unchanged are left untouched.
+    Descriptions longer than DESCRIPTION_PREVIEW_CHARS keep a preview
+    inline and the full text in procurement_blobs.
+    Returns an UpsertResult mapping source_id to row id.
+    """
     now = datetime.now(timezone.utc).isoformat()
+    result = UpsertResult()
+    with transaction() as conn:
+        # executemany() discards RETURNING rows, so execute the cached
+        # statement per record inside the single transaction instead.
+        for data in records:
+            params = _upsert_params(data, now)
+            full = params["description"]
+            if full and len(full) > DESCRIPTION_PREVIEW_CHARS:
+                params["description"] = full[:DESCRIPTION_PREVIEW_CHARS]
+            else:
+                full = None
+            row = conn.execute(_UPSERT_SQL, params).fetchone()
+            if row is None:
+                pid = conn.execute(
+                    "SELECT id FROM procurements WHERE source = ? AND source_id = ?",
+                    (params["source"], params["source_id"]),
+                ).fetchone()[0]
+            else:
+                pid = row[0]
+                _put_blob(conn, pid, "description", full)
+                result.changed.append(pid)
+            result[params["source_id"]] = pid
+    return result
 
-    # Try insert first
-    try:
-        cur = conn.execute("""
-            INSERT INTO procurements
-                (source, source_id, title, buyer, geography, cpv_codes,
-                 procedure_type, published_date, deadline, estimated_value,
-                 currency, status, url, description, score, score_rationale,
-                 created_at, updated_at)
-            VALUES
-                (:source, :source_id, :title, :buyer, :geography, :cpv_codes,
-                 :procedure_type, :published_date, :deadline, :estimated_value,
-                 :currency, :status, :url, :description, :score, :score_rationale,
-                 :created_at, :updated_at)
-        """, {
-            "source": data["source"],
-            "source_id": data["source_id"],
-            "title": data["title"],
-            "buyer": data.get("buyer"),
-            "geography": data.get("geography"),
-            "cpv_codes": data.get("cpv_codes"),
-            "procedure_type": data.get("procedure_type"),
-            "published_date": data.get("published_date"),
-            "deadline": data.get("deadline"),
-            "estimated_value": data.get("estimated_value"),
-            "currency": data.get("currency"),
-            "status": data.get("status"),
-            "url": data.get("url"),
-            "description": data.get("description"),
-            "score": data.get("score", 0),
-            "score_rationale": data.get("score_rationale"),
-            "created_at": now,
-            "updated_at": now,
-        })
-        row_id = cur.lastrowid
-    except sqlite3.IntegrityError:
-        # Already exists — update
-        conn.execute("""
-            UPDATE procurements SET
-                title = :title,
-                buyer = :buyer,
-                geography = :geography,
-                cpv_codes = :cpv_codes,
-                procedure_type = :procedure_type,
-                published_date = :published_date,
-                deadline = :deadline,
-                estimated_value = :estimated_value,
-                currency = :currency,
-                status = :status,
-                url = :url,
-                description = :description,
-                score = :score,
-                score_rationale = :score_rationale,
-                updated_at = :updated_at
-            WHERE source = :source AND source_id = :source_id
-        """, {
-            "source": data["source"],
-            "source_id": data["source_id"],
-            "title": data["title"],
-            "buyer": data.get("buyer"),
-            "geography": data.get("geography"),
-            "cpv_codes": data.get("cpv_codes"),
-            "procedure_type": data.get("procedure_type"),
-            "published_date": data.get("published_date"),
-            "deadline": data.get("deadline"),
-            "estimated_value": data.get("estimated_value"),
-            "currency": data.get("currency"),
-            "status": data.get("status"),
-            "url": data.get("url"),
-            "description": data.get("description"),
-            "score": data.get("score", 0),
-            "score_rationale": data.get("score_rationale"),
-            "updated_at": now,
-        })
-        cur = conn.execute(
-            "SELECT id FROM procurements WHERE source = ? AND source_id = ?",
-            (data["source"], data["source_id"]),
-        )
-        row_id = cur.fetchone()["id"]
 
-    conn.commit()
-    conn.close()
-    return row_id
+def upsert_procurement(data) -> int:
+    """Insert or update a procurement. Returns the row id.
+
+    Accepts a dict or a TenderRecord (converted via to_db_dict()).
+    """
+    return next(iter(upsert_procurements([data]).values()))
 
 
 def update_score(procurement_id: int, score: int, rationale: str, breakdown: dict | None = None):
     """Update the lead score for a procurement."""
-    conn = get_connection()
-    breakdown_json = json.dumps(breakdown, ensure_ascii=False) if breakdown else None
-    conn.execute(
-        "UPDATE procurements SET score = ?, score_rationale = ?, score_breakdown = ?, updated_at = ? WHERE id = ?",
-        (score, rationale, breakdown_json, datetime.now(timezone.utc).isoformat(), procurement_id),
-    )
-    conn.commit()
-    conn.close()
+    update_scores([(procurement_id, score, rationale, breakdown)])
+
+
+def update_scores(rows, ruleset: str | None = None) -> int:
+    """Update many lead scores in one transaction.
+
+    *rows* is an iterable of (procurement_id, score, rationale, breakdown)
+    or (..., breakdown, content_hash), consumed lazily: it is staged in a
+    temp table by one executemany(), so a generator never has to hold
+    every row in memory. Each row records *ruleset* and the content_hash
+    it was scored from (None for scores not from the scorer). Set-based
+    statements then only touch rows where something differs, so rescoring
+    unchanged rows writes nothing; updated_at moves only when the score
+    or rationale does. Returns the number of rows scored.
+    """
+    def staged():
+        for procurement_id, score, rationale, breakdown, *content_hash in rows:
+            codec, data = _encode_blob(json.dumps(breakdown, ensure_ascii=False)) if breakdown else (None, None)
+            yield procurement_id, score, rationale, codec, data, next(iter(content_hash), None)
+
+    with transaction() as conn:
+        conn.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS new_scores (
+                id INTEGER PRIMARY KEY, score INTEGER, rationale TEXT, codec TEXT, data BLOB,
+                content_hash TEXT
+            )
+        """)
+        conn.execute("DELETE FROM new_scores")
+        conn.executemany("INSERT OR REPLACE INTO new_scores VALUES (?, ?, ?, ?, ?, ?)", staged())
+        count = conn.execute("SELECT COUNT(*) FROM new_scores").fetchone()[0]
+        conn.execute("""
+            UPDATE procurements SET
+                updated_at = CASE
+                    WHEN (score, score_rationale) IS NOT
+                         (SELECT score, rationale FROM new_scores WHERE id = procurements.id)
+                    THEN :now ELSE updated_at END,
+                (score, score_rationale, scored_content_hash) =
+                    (SELECT score, rationale, content_hash FROM new_scores WHERE id = procurements.id),
+                scored_ruleset = :ruleset
+            WHERE id IN (
+                SELECT n.id FROM new_scores n JOIN procurements p ON p.id = n.id
+                WHERE p.score IS NOT n.score OR p.score_rationale IS NOT n.rationale
+                   OR p.scored_ruleset IS NOT :ruleset OR p.scored_content_hash IS NOT n.content_hash
+            )
+        """, {"now": datetime.now(timezone.utc).isoformat(), "ruleset": ruleset})
+        conn.execute("""
+            INSERT INTO procurement_blobs (procurement_id, field, codec, data)
+            SELECT n.id, 'score_breakdown', n.codec, n.data
+            FROM new_scores n
+            LEFT JOIN procurement_blobs b ON b.procurement_id = n.id AND b.field = 'score_breakdown'
+            WHERE n.data IS NOT NULL AND (b.data IS NOT n.data OR b.codec IS NOT n.codec)
+            ON CONFLICT(procurement_id, field) DO UPDATE SET
+                codec = excluded.codec, data = excluded.data
+        """)
+        conn.execute("""
+            DELETE FROM procurement_blobs
+            WHERE field = 'score_breakdown'
+              AND procurement_id IN (SELECT id FROM new_scores WHERE data IS NULL)
+        """)
+        conn.execute("DELETE FROM new_scores")
+    return count
 
 
 def update_ai_relevance(procurement_id: int, relevance: str, reasoning: str):
@@ -559,50 +1478,308 @@ def get_all_procurements() -> list[dict]:
     return [dict(r) for r in rows]
 
 
+def get_procurements(ids) -> list[dict]:
+    """Return the procurements with the given ids, in id order."""
+    conn = get_connection()
+    rows = conn.execute(
+        "SELECT * FROM procurements WHERE id IN (SELECT value FROM json_each(?)) ORDER BY id",
+        (json.dumps(list(ids)),),
+    ).fetchall()
+    conn.close()
+    return [dict(r) for r in rows]
+
+
+def get_score_inputs(ids=None, ruleset: str | None = None) -> dict[str, list]:
+    """Return the scorer's input columns for every procurement, or *ids*.
+
+    With *ruleset*, only rows not yet scored by that ruleset from their
+    current content_hash. Columnar, {"id": [...], "title": [...],
+    "description": [...], "buyer": [...], "cpv_codes": [...],
+    "content_hash": [...]}, ready for scorer.score_many().
+    """
+    columns = ("id", "title", "description", "buyer", "cpv_codes", "content_hash")
+    where, params = [], []
+    if ids is not None:
+        where.append("id IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps(list(ids)))
+    if ruleset is not None:
+        where.append("(scored_ruleset IS NOT ? OR scored_content_hash IS NOT content_hash)")
+        params.append(ruleset)
+    sql = f"SELECT {', '.join(columns)} FROM procurements"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    conn = get_connection()
+    rows = conn.execute(sql + " ORDER BY id", params).fetchall()
+    conn.close()
+    return {c: [r[i] for r in rows] for i, c in enumerate(columns)}
+
+
+def get_unassessed_procurements(min_score: int = 1) -> list[dict]:
+    """Return procurements awaiting the AI prefilter, highest score first.
+
+    Only rows that passed the sector gate (score >= min_score) and have no
+    ai_relevance yet; served by the idx_procurements_unassessed partial index.
+    """
+    conn = get_connection()
+    rows = conn.execute(
+        "SELECT * FROM procurements WHERE ai_relevance IS NULL AND score >= ? ORDER BY score DESC",
+        (min_score,),
+    ).fetchall()
+    conn.close()
+    return [dict(r) for r in rows]
+
+
 def get_procurement(procurement_id: int) -> dict | None:
+    """Return one procurement with its full description and score_breakdown."""
     conn = get_connection()
     row = conn.execute("SELECT * FROM procurements WHERE id = ?", (procurement_id,)).fetchone()
+    if row is None:
+        conn.close()
+        return None
+    proc = dict(row)
+    blobs = _get_blobs(conn, procurement_id, "description", "score_breakdown")
+    conn.close()
+    if "description" in blobs:
+        proc["description"] = blobs["description"]
+    # Always from the blob: a pre-v5 database still has a stale inline column
+    proc["score_breakdown"] = blobs.get("score_breakdown")
+    return proc
+
+
+# ---------------------------------------------------------------------------
+# Incremental scraping state
+# ---------------------------------------------------------------------------
+def get_scrape_state(source: str) -> dict | None:
+    """Return the scrape_state row for a source, or None before its first run.
+
+    watermark is the latest published_date (YYYY-MM-DD) seen from the source.
+    """
+    conn = get_connection()
+    row = conn.execute("SELECT * FROM scrape_state WHERE source = ?", (source,)).fetchone()
     conn.close()
     return dict(row) if row else None
 
 
-def search_procurements(
-    query: str = "",
+def update_scrape_state(source: str, watermark: str | None, full: bool = False):
+    """Record a completed scrape. The watermark only moves forward."""
+    conn = get_connection()
+    conn.execute("""
+        INSERT INTO scrape_state (source, watermark, last_run_at, last_full_sync_at)
+        VALUES (:source, :watermark, datetime('now'), CASE WHEN :full THEN datetime('now') END)
+        ON CONFLICT(source) DO UPDATE SET
+            watermark = MAX(COALESCE(watermark, ''), COALESCE(excluded.watermark, '')),
+            last_run_at = excluded.last_run_at,
+            last_full_sync_at = COALESCE(excluded.last_full_sync_at, last_full_sync_at)
+    """, {"source": source, "watermark": watermark, "full": full})
+    conn.commit()
+    conn.close()
+
+
+def get_known_source_ids(source: str) -> set[str]:
+    """Return the source_ids already stored for a source."""
+    conn = get_connection()
+    rows = conn.execute("SELECT source_id FROM procurements WHERE source = ?", (source,)).fetchall()
+    conn.close()
+    return {r[0] for r in rows}
+
+
+# ---------------------------------------------------------------------------
+# Projected, keyset-paginated procurement queries
+# ---------------------------------------------------------------------------
+PROCUREMENT_COLUMNS = frozenset({
+    "id", "source", "source_id", "title", "buyer", "geography", "cpv_codes",
+    "procedure_type", "published_date", "deadline", "estimated_value",
+    "currency", "status", "url", "description", "score", "score_rationale",
+    "created_at", "updated_at", "ai_relevance", "ai_relevance_reasoning",
+    "account_id",
+})
+
+# Computed per row, so list views don't need a lookup per card
+DERIVED_COLUMNS = {
+    "label": "(SELECT l.label FROM labels l WHERE l.procurement_id = p.id ORDER BY l.id DESC LIMIT 1)",
+    "has_analysis": "EXISTS (SELECT 1 FROM analyses a WHERE a.procurement_id = p.id)",
+    "description_preview": "substr(p.description, 1, 160)",
+}
+
+# Sort keys per ordering; the last key must be unique (id) so cursors are stable
+_PAGE_ORDERS = {
+    "score": ["p.score", "COALESCE(p.published_date, '')", "p.id"],
+    "published": ["COALESCE(p.published_date, '')", "p.id"],
+}
+
+
+def _select_list(columns: list[str] | None) -> str:
+    """Build the SELECT list for *columns* (None = every stored column)."""
+    if not columns:
+        return "p.*"
+    parts = []
+    for col in columns:
+        if col in PROCUREMENT_COLUMNS:
+            parts.append(f"p.{col}")
+        elif col in DERIVED_COLUMNS:
+            parts.append(f"{DERIVED_COLUMNS[col]} AS {col}")
+        else:
+            raise ValueError(f"Unknown procurement column: {col!r}")
+    return ", ".join(parts)
+
+
+def _procurement_filters(
     source: str = "",
     min_score: int = 0,
     max_score: int = 100,
     geography: str = "",
     ai_relevance: str = "",
-) -> list[dict]:
-    """Search procurements with optional filters.
+) -> tuple[list[str], list]:
+    """Return WHERE clauses and params for the shared procurement filters.
 
-    ai_relevance: "relevant", "irrelevant", "unassessed", or "" (all).
+    ai_relevance: "relevant", "irrelevant", "unassessed", "not_irrelevant"
+    or "" (all).
     """
-    conn = get_connection()
-    sql = "SELECT * FROM procurements WHERE score BETWEEN ? AND ?"
+    clauses = ["p.score BETWEEN ? AND ?"]
     params: list = [min_score, max_score]
 
-    if query:
-        sql += " AND (title LIKE ? OR description LIKE ? OR buyer LIKE ?)"
-        like = f"%{query}%"
-        params.extend([like, like, like])
-
     if source:
-        sql += " AND source = ?"
+        clauses.append("p.source = ?")
         params.append(source)
 
     if geography:
-        sql += " AND geography LIKE ?"
+        clauses.append("p.geography LIKE ?")
         params.append(f"%{geography}%")
 
     if ai_relevance == "relevant":
-        sql += " AND ai_relevance = 'relevant'"
+        clauses.append("p.ai_relevance = 'relevant'")
     elif ai_relevance == "irrelevant":
-        sql += " AND ai_relevance = 'irrelevant'"
+        clauses.append("p.ai_relevance = 'irrelevant'")
     elif ai_relevance == "unassessed":
-        sql += " AND ai_relevance IS NULL"
+        clauses.append("p.ai_relevance IS NULL")
+    elif ai_relevance == "not_irrelevant":
+        clauses.append("(p.ai_relevance IS NULL OR p.ai_relevance != 'irrelevant')")
+
+    return clauses, params
+
+
+def query_procurements(
+    columns: list[str] | None = None,
+    *,
+    after: tuple | None = None,
+    limit: int = 50,
+    order_by: str = "score",
+    **filters,
+) -> tuple[list[dict], tuple | None]:
+    """Return one page of procurements and the cursor for the next page.
+
+    columns: stored columns and/or DERIVED_COLUMNS to fetch (None = all
+        stored columns). Fetch only what the view renders.
+    after: cursor returned by the previous call (None = first page).
+    order_by: "score" (score, published_date, id — all descending) or
+        "published" (published_date, id — descending).
+    filters: see _procurement_filters().
+
+    The next cursor is None when there are no more rows. Paging uses the
+    sort key rather than OFFSET, so every page costs the same.
+    """
+    if order_by not in _PAGE_ORDERS:
+        raise ValueError(f"Unknown order_by: {order_by!r}")
+    keys = _PAGE_ORDERS[order_by]
+
+    clauses, params = _procurement_filters(**filters)
+    if after is not None:
+        if len(after) != len(keys):
+            raise ValueError("Cursor does not match order_by")
+        clauses.append(f"({', '.join(keys)}) < ({', '.join('?' * len(keys))})")
+        params.extend(after)
+
+    # Cursor values are selected under private aliases so the caller's
+    # projection stays exactly as requested
+    cursor_cols = ", ".join(f"{k} AS _k{i}" for i, k in enumerate(keys))
+    sql = (
+        f"SELECT {_select_list(columns)}, {cursor_cols} FROM procurements p"
+        f" WHERE {' AND '.join(clauses)}"
+        f" ORDER BY {', '.join(k + ' DESC' for k in keys)} LIMIT ?"
+    )
+    params.append(limit + 1)
+
+    conn = get_connection()
+    rows = conn.execute(sql, params).fetchall()
+    conn.close()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    page = []
+    for r in rows:
+        item = dict(r)
+        for i in range(len(keys)):
+            item.pop(f"_k{i}")
+        page.append(item)
+    next_cursor = tuple(rows[-1][f"_k{i}"] for i in range(len(keys))) if has_more else None
+    return page, next_cursor
+
+
+def count_procurements(**filters) -> int:
+    """Count procurements matching the query_procurements() filters."""
+    clauses, params = _procurement_filters(**filters)
+    conn = get_connection()
+    count = conn.execute(
+        f"SELECT COUNT(*) FROM procurements p WHERE {' AND '.join(clauses)}", params,
+    ).fetchone()[0]
+    conn.close()
+    return count
 
-    sql += " ORDER BY score DESC, published_date DESC"
+
+def search_procurements(
+    query: str = "",
+    source: str = "",
+    min_score: int = 0,
+    max_score: int = 100,
+    geography: str = "",
+    ai_relevance: str = "",
+    limit: int | None = None,
+    columns: list[str] | None = None,
+) -> list[dict]:
+    """Search procurements with optional filters.
+
+    A free-text query goes through the FTS5 index (prefix match on every
+    word, diacritics folded). Matches are ranked by bm25 weighted by lead
+    score and carry a ``snippet`` with the matching passage.
+
+    ai_relevance: "relevant", "irrelevant", "unassessed", or "" (all).
+    limit: cap on the number of rows returned (None = all matches).
+    columns: as for query_procurements() (None = every stored column).
+    """
+    conn = get_connection()
+    fts_query = _fts_query(query) if query else ""
+    use_fts = bool(fts_query) and _has_search_index(conn)
+    clauses, params = _procurement_filters(
+        source=source, min_score=min_score, max_score=max_score,
+        geography=geography, ai_relevance=ai_relevance,
+    )
+    select = _select_list(columns)
+
+    if use_fts:
+        sql = f"""
+            SELECT {select}, snippet(procurements_fts, -1, '«', '»', '…', 16) AS snippet
+            FROM procurements_fts
+            JOIN procurements p ON p.id = procurements_fts.rowid
+            WHERE procurements_fts MATCH ?
+        """
+        params.insert(0, fts_query)
+    else:
+        sql = f"SELECT {select} FROM procurements p WHERE 1"
+        if query:
+            clauses.append("(p.title LIKE ? OR p.description LIKE ? OR p.buyer LIKE ?)")
+            like = f"%{query}%"
+            params.extend([like, like, like])
+
+    sql += "".join(f" AND {c}" for c in clauses)
+
+    if use_fts:
+        # bm25 is negative (lower is better); scale it up by the lead score
+        sql += f" ORDER BY bm25(procurements_fts, {_FTS_WEIGHTS}) * (1 + p.score / 100.0), p.id DESC"
+    else:
+        sql += " ORDER BY p.score DESC, p.published_date DESC"
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
     rows = conn.execute(sql, params).fetchall()
     conn.close()
     return [dict(r) for r in rows]
@@ -613,11 +1790,10 @@ def save_analysis(procurement_id: int, analysis: dict):
     conn = get_connection()
     conn.execute("""
         INSERT INTO analyses
-            (procurement_id, full_notice_text, kravsammanfattning, matchningsanalys,
+            (procurement_id, kravsammanfattning, matchningsanalys,
              prisstrategi, anbudshjalp, model, input_tokens, output_tokens)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         ON CONFLICT(procurement_id) DO UPDATE SET
-            full_notice_text = excluded.full_notice_text,
             kravsammanfattning = excluded.kravsammanfattning,
             matchningsanalys = excluded.matchningsanalys,
             prisstrategi = excluded.prisstrategi,
@@ -628,7 +1804,6 @@ def save_analysis(procurement_id: int, analysis: dict):
             created_at = datetime('now')
     """, (
         procurement_id,
-        analysis.get("full_notice_text"),
         analysis.get("kravsammanfattning"),
         analysis.get("matchningsanalys"),
         analysis.get("prisstrategi"),
@@ -637,6 +1812,7 @@ def save_analysis(procurement_id: int, analysis: dict):
         analysis.get("input_tokens"),
         analysis.get("output_tokens"),
     ))
+    _put_blob(conn, procurement_id, "full_notice_text", analysis.get("full_notice_text"))
     conn.commit()
     conn.close()
 
@@ -647,8 +1823,15 @@ def get_analysis(procurement_id: int) -> dict | None:
     row = conn.execute(
         "SELECT * FROM analyses WHERE procurement_id = ?", (procurement_id,)
     ).fetchone()
+    if row is None:
+        conn.close()
+        return None
+    analysis = dict(row)
+    blobs = _get_blobs(conn, procurement_id, "full_notice_text")
     conn.close()
-    return dict(row) if row else None
+    # Always from the blob: a pre-v5 database still has a stale inline column
+    analysis["full_notice_text"] = blobs.get("full_notice_text")
+    return analysis
 
 
 def save_label(procurement_id: int, label: str, reason: str = "") -> int:
@@ -689,40 +1872,35 @@ def get_all_labels() -> list[dict]:
 
 
 def get_label_stats() -> dict:
-    """Return label statistics."""
+    """Return label statistics (from the materialized counters)."""
     conn = get_connection()
-    total = conn.execute("SELECT COUNT(*) as c FROM labels").fetchone()["c"]
-    relevant = conn.execute(
-        "SELECT COUNT(*) as c FROM labels WHERE label = 'relevant'"
-    ).fetchone()["c"]
-    irrelevant = conn.execute(
-        "SELECT COUNT(*) as c FROM labels WHERE label = 'irrelevant'"
-    ).fetchone()["c"]
+    c = _read_counters(conn, "labels", "by_label")
     conn.close()
-    return {"total": total, "relevant": relevant, "irrelevant": irrelevant}
+    return {
+        "total": c["labels"].get("", 0),
+        "relevant": c["by_label"].get("relevant", 0),
+        "irrelevant": c["by_label"].get("irrelevant", 0),
+    }
 
 
 def get_stats() -> dict:
-    """Return dashboard statistics."""
+    """Return dashboard statistics (from the materialized counters)."""
     conn = get_connection()
-    total = conn.execute("SELECT COUNT(*) as c FROM procurements").fetchone()["c"]
-    avg_score = conn.execute("SELECT AVG(score) as a FROM procurements").fetchone()["a"] or 0
-    high_fit = conn.execute("SELECT COUNT(*) as c FROM procurements WHERE score >= 60").fetchone()["c"]
-    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    c = _read_counters(conn, "procurements", "scored", "score_sum", "high_fit", "by_source")
+    now = datetime.now(timezone.utc)
     new_today = conn.execute(
-        "SELECT COUNT(*) as c FROM procurements WHERE created_at LIKE ?",
-        (f"{today}%",),
+        "SELECT COUNT(*) as c FROM procurements WHERE created_at >= ? AND created_at < ?",
+        (now.strftime("%Y-%m-%d"), (now + timedelta(days=1)).strftime("%Y-%m-%d")),
     ).fetchone()["c"]
-    by_source = {}
-    for row in conn.execute("SELECT source, COUNT(*) as c FROM procurements GROUP BY source"):
-        by_source[row["source"]] = row["c"]
     conn.close()
+    scored = c["scored"].get("", 0)
+    avg_score = c["score_sum"].get("", 0) / scored if scored else 0
     return {
-        "total": total,
+        "total": c["procurements"].get("", 0),
         "avg_score": round(avg_score, 1),
-        "high_fit": high_fit,
+        "high_fit": c["high_fit"].get("", 0),
         "new_today": new_today,
-        "by_source": by_source,
+        "by_source": c["by_source"],
     }
 
 
@@ -868,39 +2046,67 @@ def get_pipeline_item(procurement_id: int) -> dict | None:
 def get_pipeline_summary() -> dict:
     """Return pipeline summary: count and weighted value per stage."""
     conn = get_connection()
-    rows = conn.execute("""
-        SELECT stage,
-               COUNT(*) as count,
-               SUM(COALESCE(estimated_value, 0) * probability / 100.0) as weighted_value,
-               SUM(COALESCE(estimated_value, 0)) as total_value
-        FROM pipeline
-        GROUP BY stage
-    """).fetchall()
+    c = _read_counters(conn, "stage_count", "stage_weighted", "stage_value")
     conn.close()
-    return {row["stage"]: {"count": row["count"], "weighted_value": row["weighted_value"] or 0,
-                           "total_value": row["total_value"] or 0} for row in rows}
+    return {stage: {"count": count, "weighted_value": c["stage_weighted"].get(stage, 0),
+                    "total_value": c["stage_value"].get(stage, 0)}
+            for stage, count in c["stage_count"].items()}
 
 
 def get_pipeline_summary_by_user() -> dict:
     """Return pipeline summary grouped by assigned_to."""
     conn = get_connection()
-    rows = conn.execute("""
-        SELECT assigned_to, stage, COUNT(*) as count,
-               SUM(COALESCE(estimated_value, 0) * probability / 100.0) as weighted_value
-        FROM pipeline
-        WHERE assigned_to IS NOT NULL
-        GROUP BY assigned_to, stage
-    """).fetchall()
+    c = _read_counters(conn, "user_stage_count", "user_stage_weighted")
     conn.close()
     result: dict = {}
-    for row in rows:
-        user = row["assigned_to"]
-        if user not in result:
-            result[user] = {}
-        result[user][row["stage"]] = {"count": row["count"], "weighted_value": row["weighted_value"] or 0}
+    for key, count in c["user_stage_count"].items():
+        user, stage = key.rsplit("/", 1)
+        result.setdefault(user, {})[stage] = {
+            "count": count, "weighted_value": c["user_stage_weighted"].get(key, 0),
+        }
     return result
 
 
+def get_status_counts() -> dict:
+    """Return the admin status figures, mostly from the materialized counters.
+
+    Active/expired depend on today's date: rows not yet archived but past
+    their deadline are counted through the open-deadline partial index.
+    """
+    conn = get_connection()
+    c = _read_counters(conn, "procurements", "assessed", "open", "expired", "no_deadline",
+                       "by_source", "by_account", "filled", "pipeline", "active_watches",
+                       "calendar_events")
+    overdue = conn.execute(
+        "SELECT COUNT(*) FROM procurements WHERE deadline < date('now') AND status != 'expired'"
+    ).fetchone()[0]
+    accounts_total = conn.execute("SELECT COUNT(*) FROM accounts").fetchone()[0]
+    users = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+    contacts = conn.execute("SELECT COUNT(*) FROM contacts").fetchone()[0]
+    conn.close()
+
+    total = c["procurements"].get("", 0)
+    return {
+        "total": total,
+        "analyzed": c["assessed"].get("", 0),
+        "active": c["open"].get("", 0) - overdue,
+        "expired": c["expired"].get("", 0) + overdue,
+        "no_deadline": c["no_deadline"].get("", 0),
+        "by_source": dict(sorted(c["by_source"].items(), key=lambda kv: kv[1], reverse=True)),
+        "pipeline": c["pipeline"].get("", 0),
+        "accounts_total": accounts_total,
+        "accounts_linked": len(c["by_account"]),
+        "users": users,
+        "contacts": contacts,
+        "watches": c["active_watches"].get("", 0),
+        "calendar_events": c["calendar_events"].get("", 0),
+        "completeness": {
+            f: round(c["filled"].get(f, 0) / total * 100, 1) if total > 0 else 0
+            for f in _FILLED_FIELDS
+        },
+    }
+
+
 # =====================================================================
 # Procurement notes CRUD
 # =====================================================================
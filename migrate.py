@@ -1,16 +1,26 @@
 #!/usr/bin/env python3
 """Database migration handler.
 
-Manages schema upgrades from Fas1 (version 1) to Fas2 (version 2).
+Manages schema upgrades from Fas1 (version 1) to Fas2 (version 2) and
+later schema versions.
 
 Usage:
     python migrate.py              # Apply all pending migrations
     python migrate.py --status     # Show current version
+    python migrate.py --rebuild-fts  # Rebuild the full-text search index
+    python migrate.py --check-counters    # Diff dashboard counters against a recompute
+    python migrate.py --rebuild-counters  # Recompute dashboard counters from scratch
 """
 
 import argparse
+import re
+import sys
 
-from db import get_connection, init_db, ensure_pipeline_entry, get_all_procurements, seed_accounts
+from db import (
+    get_connection, init_db, ensure_pipeline_entry, get_all_procurements, seed_accounts,
+    rebuild_search_index, check_counters, rebuild_counters, tables_without_cascade,
+    move_large_text_to_blobs,
+)
 
 
 def get_schema_version() -> int:
@@ -107,9 +117,105 @@ def migrate_v2_to_v3():
     print("Migration v2 → v3 klar!")
 
 
+def migrate_v3_to_v4():
+    """Migrate from v3 to v4 — ON DELETE CASCADE on procurement child tables.
+
+    SQLite cannot alter a foreign key, so each table is rebuilt from its own
+    CREATE statement with the cascade added, following the documented
+    12-step procedure. Orphaned rows (pointing at deleted procurements) are
+    dropped on the way.
+    """
+    print("Migrerar v3 → v4...")
+    init_db()
+
+    conn = get_connection()
+    conn.commit()
+    # Must be off outside the transaction, or DROP TABLE would cascade
+    conn.execute("PRAGMA foreign_keys = OFF")
+    try:
+        conn.execute("BEGIN")
+        for table in tables_without_cascade(conn):
+            sql = conn.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+            ).fetchone()["sql"]
+            new_sql = re.sub(
+                r"REFERENCES\s+procurements\s*\(\s*id\s*\)(\s+ON\s+DELETE\s+\w+(\s+\w+)?)?",
+                "REFERENCES procurements(id) ON DELETE CASCADE", sql, flags=re.IGNORECASE,
+            )
+            new_sql = re.sub(rf"^CREATE TABLE\s+(IF NOT EXISTS\s+)?\"?{table}\"?",
+                             f"CREATE TABLE {table}_new", new_sql, flags=re.IGNORECASE)
+            cols = ", ".join(r["name"] for r in conn.execute(f"PRAGMA table_info({table})"))
+
+            conn.execute(new_sql)
+            orphans = conn.execute(f"""
+                SELECT COUNT(*) FROM {table}
+                WHERE procurement_id NOT IN (SELECT id FROM procurements)
+            """).fetchone()[0]
+            conn.execute(f"""
+                INSERT INTO {table}_new ({cols})
+                SELECT {cols} FROM {table}
+                WHERE procurement_id IN (SELECT id FROM procurements)
+            """)
+            conn.execute(f"DROP TABLE {table}")
+            conn.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+            print(f"  {table}: ON DELETE CASCADE, {orphans} föräldralösa rader borttagna")
+
+        problems = conn.execute("PRAGMA foreign_key_check").fetchall()
+        if problems:
+            raise RuntimeError(f"Foreign key check failed: {[tuple(p) for p in problems]}")
+        conn.execute("INSERT OR REPLACE INTO schema_version (version) VALUES (4)")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.close()
+
+    # Recreates the indexes and counter triggers dropped with the old tables
+    init_db()
+    print("Migration v3 → v4 klar!")
+
+
+def _db_size(conn) -> int:
+    """Database size in bytes (allocated pages, excluding the WAL)."""
+    return conn.execute("PRAGMA page_count").fetchone()[0] * conn.execute("PRAGMA page_size").fetchone()[0]
+
+
+def migrate_v4_to_v5():
+    """Migrate from v4 to v5 — large text moved to compressed procurement_blobs.
+
+    score_breakdown and full_notice_text leave their tables, and the freed
+    pages are reclaimed with VACUUM. Prints the database size before and after.
+    """
+    print("Migrerar v4 → v5...")
+    init_db()
+
+    conn = get_connection()
+    before = _db_size(conn)
+    conn.close()
+
+    moved = move_large_text_to_blobs()
+    for field, count in moved.items():
+        print(f"  {field}: {count} rader komprimerade")
+
+    conn = get_connection()
+    conn.execute("INSERT OR REPLACE INTO schema_version (version) VALUES (5)")
+    conn.commit()
+    conn.execute("VACUUM")
+    after = _db_size(conn)
+    conn.close()
+
+    print(f"  Databasstorlek: {before / 1e6:.1f} MB → {after / 1e6:.1f} MB")
+    print("Migration v4 → v5 klar!")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Databasmigrering")
     parser.add_argument("--status", action="store_true", help="Visa nuvarande schemaversion")
+    parser.add_argument("--rebuild-fts", action="store_true", help="Bygg om fulltextindexet (FTS5)")
+    parser.add_argument("--check-counters", action="store_true", help="Jämför räknare mot full omräkning")
+    parser.add_argument("--rebuild-counters", action="store_true", help="Räkna om alla räknare från grunden")
     args = parser.parse_args()
 
     if args.status:
@@ -117,6 +223,25 @@ def main():
         print(f"Schemaversion: {version}")
         return
 
+    if args.rebuild_fts:
+        count = rebuild_search_index()
+        print(f"Fulltextindex ombyggt: {count} upphandlingar indexerade")
+        return
+
+    if args.check_counters:
+        init_db()
+        diffs = check_counters()
+        for (name, key), (stored, actual) in sorted(diffs.items()):
+            print(f"  {name}[{key}]: lagrat {stored}, faktiskt {actual}")
+        print(f"Räknare: {len(diffs)} avvikelser" if diffs else "Räknare: OK")
+        sys.exit(1 if diffs else 0)
+
+    if args.rebuild_counters:
+        init_db()
+        count = rebuild_counters()
+        print(f"Räknare omräknade: {count}")
+        return
+
     current = get_schema_version()
     print(f"Nuvarande schemaversion: {current}")
 
@@ -125,6 +250,12 @@ def main():
         current = 2
     if current < 3:
         migrate_v2_to_v3()
+        current = 3
+    if current < 4:
+        migrate_v3_to_v4()
+        current = 4
+    if current < 5:
+        migrate_v4_to_v5()
     else:
         print("Databasen är redan uppdaterad.")
 
@@ -54,10 +54,11 @@ class TenderRecord(BaseModel):
 
     @field_validator("description", mode="before")
     @classmethod
-    def truncate_description(cls, v: str | None) -> str | None:
+    def strip_description(cls, v: str | None) -> str | None:
+        # Not truncated: db keeps a preview inline and the full text compressed
         if isinstance(v, str):
             v = v.strip()
-            return v[:2000] if v else None
+            return v if v else None
         return v
 
     @field_validator("estimated_value", mode="before")
@@ -10,6 +10,7 @@ from db import (
     get_contracts, add_contract, get_user_dashboard, add_to_dashboard,
     remove_from_dashboard, add_watch, get_watches, remove_watch,
     get_pipeline_item, STAGE_LABELS,
+    submit_write,
 )
 
 
@@ -288,11 +289,11 @@ def _render_account_detail(account: dict, username: str):
                     st.markdown(f"Bevakning aktiv sedan {w['created_at'][:10]}")
                 with c2:
                     if st.button("Avbryt", key=f"rm_watch_{w['id']}"):
-                        remove_watch(w["id"])
+                        submit_write(remove_watch, w["id"]).result()
                         st.rerun()
         else:
             if st.button("Bevaka detta konto", key=f"watch_acc_{account_id}"):
-                add_watch(username, "account", account_id=account_id)
+                submit_write(add_watch, username, "account", account_id=account_id).result()
                 st.success("Bevakning aktiverad!")
                 st.rerun()
 
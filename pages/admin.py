@@ -3,7 +3,7 @@
 import streamlit as st
 from db import (
     get_connection, get_all_procurements, get_stats, get_pipeline_summary,
-    get_all_accounts, deduplicate_procurements, init_db,
+    get_all_accounts, deduplicate_procurements, init_db, get_status_counts,
 )
 
 
@@ -51,31 +51,35 @@ def _render_fetch_section():
         options=["ted", "kommers", "eavrop"],
         default=["ted", "kommers", "eavrop"],
     )
+    full = st.checkbox(
+        "Fullstandig omsynk",
+        help="Ignorera vattenmarken och hamta om hela tidsfonstret fran varje kalla",
+    )
 
     col1, col2 = st.columns(2)
     with col1:
         if st.button("Hamta upphandlingar", use_container_width=True):
-            _run_scrape(sources)
+            _run_scrape(sources, full)
 
     with col2:
         if st.button("Kor hela pipelinen", use_container_width=True):
-            _run_full_pipeline(sources)
+            _run_full_pipeline(sources, full)
 
 
-def _run_scrape(sources: list[str]):
+def _run_scrape(sources: list[str], full: bool = False):
     from run_scrapers import scrape_sources, run_dedup
     with st.status("Hamtar upphandlingar...", expanded=True) as status:
         def on_progress(msg: str):
             st.write(msg)
 
-        counts = scrape_sources(sources or None, on_progress=on_progress)
+        counts = scrape_sources(sources or None, on_progress=on_progress, full=full)
         dedup_removed = run_dedup(on_progress=on_progress)
 
         total = sum(counts.values())
         status.update(label=f"Klart — {total} hamtade, {dedup_removed} dubbletter borttagna", state="complete")
 
 
-def _run_full_pipeline(sources: list[str]):
+def _run_full_pipeline(sources: list[str], full: bool = False):
     from run_scrapers import (
         scrape_sources, run_dedup, score_all, run_ai_prefilter,
         run_deep_analysis, create_pipeline_entries, link_accounts,
@@ -88,7 +92,7 @@ def _run_full_pipeline(sources: list[str]):
             st.write(msg)
 
         on_progress("Steg 1/10: Hamtar upphandlingar...")
-        scrape_sources(sources or None, on_progress=on_progress)
+        scrape_sources(sources or None, on_progress=on_progress, full=full)
 
         on_progress("Steg 2/10: Deduplicerar (inom kalla)...")
         run_dedup(on_progress=on_progress)
@@ -144,7 +148,7 @@ def _render_analysis_section():
             with st.status("Scorar...", expanded=True) as status:
                 def on_progress(msg: str):
                     st.write(msg)
-                count = score_all(on_progress=on_progress)
+                count = score_all(on_progress=on_progress, rescore_all=True)
                 status.update(label=f"Scorade {count} upphandlingar", state="complete")
 
     with col2:
@@ -170,6 +174,52 @@ def _render_analysis_section():
             except Exception as e:
                 status.update(label=f"Fel: {e}", state="error")
 
+    st.markdown("---")
+    _render_ruleset_section()
+
+
+def _render_ruleset_section():
+    from scorer import RULESET_PATH, RulesetError, activate_ruleset, active_ruleset, refresh_ruleset, validate_ruleset
+
+    st.markdown("**Scoringregler**")
+    try:
+        refresh_ruleset()
+    except RulesetError as e:
+        st.error(f"{RULESET_PATH.name} ar ogiltig, tidigare regler anvands: {e}")
+    st.caption(f"Aktiv version {active_ruleset()['version']} fran config/{RULESET_PATH.name}. "
+               "Hoj version vid varje andring.")
+
+    text = st.text_area("Regelfil (YAML eller JSON)", value=RULESET_PATH.read_text(encoding="utf-8"),
+                        height=400, key="ruleset_text")
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("Validera", use_container_width=True):
+            try:
+                rules = validate_ruleset(text)
+                st.success(f"Reglerna ar giltiga (version {rules['version']})")
+            except RulesetError as e:
+                for error in e.errors:
+                    st.error(error)
+    with col2:
+        if st.button("Aktivera och scora om", use_container_width=True):
+            from run_scrapers import rescore_in_background
+            try:
+                rules = activate_ruleset(text)
+                st.session_state["rescore_future"] = rescore_in_background()
+                st.success(f"Version {rules['version']} aktiverad, omscoring startad i bakgrunden")
+            except RulesetError as e:
+                for error in e.errors:
+                    st.error(error)
+
+    future = st.session_state.get("rescore_future")
+    if future is not None:
+        if not future.done():
+            st.info("Omscoring pagar i bakgrunden...")
+        elif future.exception():
+            st.error(f"Omscoring misslyckades: {future.exception()}")
+        else:
+            st.success(f"Omscoring klar — {future.result()} upphandlingar scorade")
+
 
 # ---------------------------------------------------------------------------
 # Section 3 — Data cleanup
@@ -281,48 +331,11 @@ def _render_users_section():
 def _render_status_section():
     st.subheader("Systemstatus")
 
-    conn = get_connection()
+    status = get_status_counts()
+    total = status["total"]
 
-    # Per-source counts
-    source_rows = conn.execute(
-        "SELECT source, COUNT(*) as c FROM procurements GROUP BY source ORDER BY c DESC"
-    ).fetchall()
-
-    # Analysis counts
-    total = conn.execute("SELECT COUNT(*) as c FROM procurements").fetchone()["c"]
-    analyzed = conn.execute(
-        "SELECT COUNT(*) as c FROM procurements WHERE ai_relevance IS NOT NULL"
-    ).fetchone()["c"]
-
-    # Active vs expired
-    active = conn.execute(
-        "SELECT COUNT(*) as c FROM procurements WHERE (deadline IS NULL OR deadline >= date('now')) AND status != 'expired'"
-    ).fetchone()["c"]
-    expired = conn.execute(
-        "SELECT COUNT(*) as c FROM procurements WHERE status = 'expired' OR (deadline IS NOT NULL AND deadline < date('now'))"
-    ).fetchone()["c"]
-
-    # Missing deadlines
-    no_deadline = conn.execute(
-        "SELECT COUNT(*) as c FROM procurements WHERE deadline IS NULL"
-    ).fetchone()["c"]
-
-    # Pipeline
-    pipeline_count = conn.execute("SELECT COUNT(*) as c FROM pipeline").fetchone()["c"]
-
-    # Accounts with linked procurements
-    accounts_total = conn.execute("SELECT COUNT(*) as c FROM accounts").fetchone()["c"]
-    accounts_linked = conn.execute(
-        "SELECT COUNT(DISTINCT account_id) as c FROM procurements WHERE account_id IS NOT NULL"
-    ).fetchone()["c"]
-
-    # Users, contacts, watches
-    users_count = conn.execute("SELECT COUNT(*) as c FROM users").fetchone()["c"]
-    contacts_count = conn.execute("SELECT COUNT(*) as c FROM contacts").fetchone()["c"]
-    watches_count = conn.execute("SELECT COUNT(*) as c FROM watch_list WHERE active = 1").fetchone()["c"]
-    calendar_count = conn.execute("SELECT COUNT(*) as c FROM calendar_events").fetchone()["c"]
-
-    # Duplicate groups (within source)
+    # Duplicate groups (within source) — a data-quality probe, not a rollup
+    conn = get_connection()
     dupe_groups = conn.execute("""
         SELECT COUNT(*) as c FROM (
             SELECT source, title, buyer
@@ -331,47 +344,36 @@ def _render_status_section():
             HAVING COUNT(*) > 1
         )
     """).fetchone()["c"]
-
-    # Field completeness
-    fields = ["title", "buyer", "geography", "deadline", "description", "cpv_codes", "estimated_value"]
-    completeness = {}
-    for field in fields:
-        if field == "estimated_value":
-            filled = conn.execute(f"SELECT COUNT(*) as c FROM procurements WHERE {field} IS NOT NULL AND {field} > 0").fetchone()["c"]
-        else:
-            filled = conn.execute(f"SELECT COUNT(*) as c FROM procurements WHERE {field} IS NOT NULL AND {field} != ''").fetchone()["c"]
-        completeness[field] = round(filled / total * 100, 1) if total > 0 else 0
-
     conn.close()
 
     # Display metrics
     c1, c2, c3, c4 = st.columns(4)
     c1.metric("Totalt upphandlingar", total)
-    c2.metric("Analyserade", f"{analyzed}/{total}")
-    c3.metric("Aktiva", active)
-    c4.metric("Utan deadline", no_deadline)
+    c2.metric("Analyserade", f"{status['analyzed']}/{total}")
+    c3.metric("Aktiva", status["active"])
+    c4.metric("Utan deadline", status["no_deadline"])
 
     c5, c6, c7, c8 = st.columns(4)
-    c5.metric("Pipeline-poster", pipeline_count)
-    c6.metric("Konton", f"{accounts_linked}/{accounts_total} lankade")
+    c5.metric("Pipeline-poster", status["pipeline"])
+    c6.metric("Konton", f"{status['accounts_linked']}/{status['accounts_total']} lankade")
     c7.metric("Duplikatgrupper", dupe_groups)
-    c8.metric("Expired", expired)
+    c8.metric("Expired", status["expired"])
 
     c9, c10, c11, c12 = st.columns(4)
-    c9.metric("Anvandare", users_count)
-    c10.metric("Kontakter", contacts_count)
-    c11.metric("Bevakningar", watches_count)
-    c12.metric("Kalenderhandelser", calendar_count)
+    c9.metric("Anvandare", status["users"])
+    c10.metric("Kontakter", status["contacts"])
+    c11.metric("Bevakningar", status["watches"])
+    c12.metric("Kalenderhandelser", status["calendar_events"])
 
     # Per-source breakdown
     st.markdown("---")
     st.markdown("**Upphandlingar per kalla**")
-    for row in source_rows:
-        st.text(f"  {row['source']}: {row['c']}")
+    for source, count in status["by_source"].items():
+        st.text(f"  {source}: {count}")
 
     # Field completeness
     st.markdown("**Datakvalitet — faltifyllnad**")
-    for field, pct in completeness.items():
+    for field, pct in status["completeness"].items():
         bar_filled = int(pct / 5)
         bar = "#" * bar_filled + "-" * (20 - bar_filled)
         st.text(f"  {field:20s} [{bar}] {pct}%")
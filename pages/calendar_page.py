@@ -6,6 +6,7 @@ from datetime import datetime, timedelta
 from db import (
     get_calendar_events, add_calendar_event, delete_calendar_event,
     get_all_procurements, get_all_contracts, get_pipeline_items,
+    submit_write,
 )
 
 
@@ -142,10 +143,11 @@ def render_calendar():
 
         if st.form_submit_button("Lägg till"):
             if ev_title.strip():
-                add_calendar_event(
+                submit_write(
+                    add_calendar_event,
                     username, ev_title.strip(), str(ev_date),
                     event_type=ev_type, description=ev_desc,
-                )
+                ).result()
                 st.success("Händelse tillagd!")
                 st.rerun()
 
@@ -162,5 +164,5 @@ def render_calendar():
             )
         with c2:
             if st.button("Ta bort", key=f"del_ev_{ev['id']}"):
-                delete_calendar_event(ev["id"])
+                submit_write(delete_calendar_event, ev["id"]).result()
                 st.rerun()
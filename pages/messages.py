@@ -7,6 +7,7 @@ import streamlit as st
 from db import (
     send_message, get_messages, get_conversations,
     mark_messages_read, get_unread_count,
+    submit_write,
 )
 
 
@@ -90,7 +91,7 @@ def render_messages():
 
         # Mark messages as read
         if not is_broadcast:
-            mark_messages_read(username, from_user=chat_with)
+            submit_write(mark_messages_read, username, from_user=chat_with).result()
 
         # Get messages
         if is_broadcast:
@@ -123,7 +124,7 @@ def render_messages():
         new_msg = st.chat_input("Skriv ett meddelande...")
         if new_msg:
             to_user = None if is_broadcast else chat_with
-            send_message(username, new_msg, to_user=to_user)
+            submit_write(send_message, username, new_msg, to_user=to_user).result()
             st.rerun()
 
 
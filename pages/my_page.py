@@ -7,9 +7,8 @@ from datetime import datetime
 import streamlit as st
 
 from db import (
-    get_all_procurements,
-    get_analysis,
-    get_label,
+    count_procurements,
+    query_procurements,
     get_calendar_events,
     get_all_contracts,
     get_pipeline_items,
@@ -19,6 +18,7 @@ from db import (
     get_unread_notification_count,
     create_notification,
     send_message,
+    submit_write,
 )
 from pages.procurements import show_procurement_dialog
 
@@ -231,14 +231,13 @@ def render_my_page():
     username = current_user["username"]
     is_chef = current_user["role"] == "saljchef"
 
-    all_procs = get_all_procurements()
-    visible = [
-        p for p in all_procs
-        if (p.get("score") or 0) > 0 and p.get("ai_relevance") != "irrelevant"
-    ]
-    # Top 3 by score
-    visible.sort(key=lambda p: p.get("score") or 0, reverse=True)
-    top3 = visible[:3]
+    # Top 3 by score among scored, not AI-irrelevant procurements
+    visible_filters = {"min_score": 1, "ai_relevance": "not_irrelevant"}
+    top3, _ = query_procurements(
+        ["id", "title", "source", "buyer", "deadline", "score", "label", "has_analysis"],
+        limit=3, **visible_filters,
+    )
+    visible_count = count_procurements(**visible_filters)
 
     # Build pure-HTML widgets
     w_cal = _build_calendar_html(username, is_chef)
@@ -255,7 +254,7 @@ def render_my_page():
     col_proc, col_cal = st.columns(2)
 
     with col_proc:
-        badge = f'<span class="wh-badge">{len(visible)} relevanta</span>' if visible else ""
+        badge = f'<span class="wh-badge">{visible_count} relevanta</span>' if visible_count else ""
         st.markdown(
             f'<div class="widget"><div class="widget-head"><span>Upphandlingar</span>{badge}</div>'
             f'<div class="widget-body">',
@@ -275,12 +274,12 @@ def render_my_page():
                 deadline = (p.get("deadline") or "")[:10]
 
                 indicators = ""
-                label = get_label(p["id"])
+                label = p.get("label")
                 if label:
-                    lc = "#4ade80" if label["label"] == "relevant" else "#f87171"
-                    lt = "R" if label["label"] == "relevant" else "IR"
+                    lc = "#4ade80" if label == "relevant" else "#f87171"
+                    lt = "R" if label == "relevant" else "IR"
                     indicators += f'<span style="font-size:9px;font-weight:700;color:{lc};margin-left:4px">{lt}</span>'
-                if get_analysis(p["id"]):
+                if p.get("has_analysis"):
                     indicators += '<span style="font-size:9px;font-weight:700;color:#60a5fa;margin-left:4px">AI</span>'
 
                 tags = f'<span class="pcard-tag" style="background:var(--orange-dim);color:var(--orange-light);border:1px solid rgba(249,115,22,0.2)">{source}</span>'
@@ -344,6 +343,6 @@ def render_my_page():
             chatt_msg = st.text_area("Meddelande", height=80, key="chatt_msg")
             if st.button("Skicka", key="chatt_send", use_container_width=True):
                 if chatt_msg.strip():
-                    send_message(username, chatt_msg.strip(), to_user=chatt_till)
+                    submit_write(send_message, username, chatt_msg.strip(), to_user=chatt_till).result()
                     st.success("Meddelande skickat!")
                     st.rerun()
@@ -7,6 +7,7 @@ import streamlit as st
 from db import (
     get_notifications, get_unread_notification_count,
     mark_notification_read, mark_all_notifications_read,
+    submit_write,
 )
 
 
@@ -50,7 +51,7 @@ def render_notifications():
     with c2:
         if unread > 0:
             if st.button("Markera alla som lästa"):
-                mark_all_notifications_read(username)
+                submit_write(mark_all_notifications_read, username).result()
                 st.rerun()
 
     # Filter
@@ -96,5 +97,5 @@ def render_notifications():
         with c2:
             if not is_read:
                 if st.button("Läst", key=f"read_{notif['id']}"):
-                    mark_notification_read(notif["id"])
+                    submit_write(mark_notification_read, notif["id"]).result()
                     st.rerun()
@@ -8,6 +8,7 @@ from db import (
     update_pipeline_assignment, update_pipeline_details,
     ensure_pipeline_entry, get_procurement, get_procurement_notes,
     add_procurement_note, PIPELINE_STAGES, STAGE_LABELS, STAGE_PROBABILITIES,
+    submit_write,
 )
 
 
@@ -110,7 +111,7 @@ def render_pipeline():
                         item = item_lookup[key]
                         old_stage = item.get("stage", "bevakad")
                         if old_stage != stage:
-                            update_pipeline_stage(item["id"], stage, updated_by=username)
+                            submit_write(update_pipeline_stage, item["id"], stage, updated_by=username).result()
                             st.toast(f"Flyttade till {STAGE_LABELS[stage]}")
                             st.rerun()
 
@@ -182,7 +183,7 @@ def render_pipeline():
                     key=f"stage_{item['id']}",
                 )
                 if new_stage != stage:
-                    update_pipeline_stage(item["id"], new_stage, updated_by=username)
+                    submit_write(update_pipeline_stage, item["id"], new_stage, updated_by=username).result()
                     st.rerun()
 
             with ec2:
@@ -193,11 +194,12 @@ def render_pipeline():
                         key=f"assign_{item['id']}",
                     )
                     if new_assigned != (item.get("assigned_to") or ""):
-                        update_pipeline_assignment(
+                        submit_write(
+                            update_pipeline_assignment,
                             item["id"],
                             new_assigned if new_assigned else None,
                             updated_by=username,
-                        )
+                        ).result()
                         st.rerun()
 
             with ec3:
@@ -228,5 +230,5 @@ def render_pipeline():
             )
             if st.button("Spara anteckning", key=f"save_note_{item['id']}"):
                 if new_note.strip():
-                    add_procurement_note(item["id"], username, new_note.strip())
+                    submit_write(add_procurement_note, item["id"], username, new_note.strip()).result()
                     st.rerun()
@@ -8,10 +8,11 @@ import pandas as pd
 import json
 
 from db import (
-    get_all_procurements, search_procurements, get_procurement,
+    query_procurements, count_procurements, search_procurements, get_procurement,
     get_stats, get_analysis, save_label, get_label, get_all_labels, get_label_stats,
     get_pipeline_item, ensure_pipeline_entry, add_procurement_note, get_procurement_notes,
     STAGE_LABELS,
+    submit_write,
 )
 
 
@@ -195,7 +196,7 @@ def show_procurement_dialog(proc_id: int):
     # --- Add to pipeline ---
     if not pipeline_item:
         if st.button("Lägg till i pipeline", key=f"add_pipe_{proc_id}"):
-            ensure_pipeline_entry(proc_id, assigned_to=current_user["username"])
+            submit_write(ensure_pipeline_entry, proc_id, assigned_to=current_user["username"]).result()
             st.rerun()
 
     # --- Notes ---
@@ -215,7 +216,7 @@ def show_procurement_dialog(proc_id: int):
     new_note = st.text_input("Ny anteckning", key=f"dlg_note_{proc_id}", placeholder="Skriv en anteckning...")
     if st.button("Spara", key=f"dlg_save_note_{proc_id}"):
         if new_note.strip():
-            add_procurement_note(proc_id, current_user["username"], new_note.strip())
+            submit_write(add_procurement_note, proc_id, current_user["username"], new_note.strip()).result()
             st.rerun()
 
     # --- Feedback ---
@@ -236,9 +237,9 @@ def show_procurement_dialog(proc_id: int):
         btn_irr = st.button("Inte relevant", key=f"dlg_irr_{proc_id}", use_container_width=True)
 
     if btn_rel:
-        save_label(proc_id, "relevant", fb_reason)
+        submit_write(save_label, proc_id, "relevant", fb_reason).result()
     if btn_irr:
-        save_label(proc_id, "irrelevant", fb_reason)
+        submit_write(save_label, proc_id, "irrelevant", fb_reason).result()
 
     existing_label = get_label(proc_id)
     if existing_label:
@@ -326,6 +327,12 @@ def render_procurements():
 # ---------------------------------------------------------------------------
 # Kanban tab — Fas1 3-column layout
 # ---------------------------------------------------------------------------
+KANBAN_CARD_COLUMNS = [
+    "id", "title", "buyer", "source", "published_date", "deadline", "estimated_value",
+    "currency", "score", "ai_relevance", "description_preview", "label", "has_analysis",
+]
+
+
 def _render_kanban():
     """Fas1 kanban: 3 columns by score (Hög / Medel / Låg) with cards."""
     stats = get_stats()
@@ -335,9 +342,7 @@ def _render_kanban():
     c3.metric("Snitt score", stats["avg_score"])
     c4.metric("Hög fit (60+)", stats["high_fit"])
 
-    all_procs = get_all_procurements()
-
-    if not all_procs:
+    if not stats["total"]:
         st.markdown(
             '<div class="empty"><h3>Ingen data ännu</h3>'
             '<p>Kör <code>python run_scrapers.py</code> för att hämta upphandlingar.</p></div>',
@@ -345,22 +350,32 @@ def _render_kanban():
         )
         return
 
-    # Filter: only scored (>0) and not AI-irrelevant, sort by newest
-    visible = [p for p in all_procs if (p.get("score") or 0) > 0 and p.get("ai_relevance") != "irrelevant"]
-    visible.sort(key=lambda p: p.get("published_date") or "", reverse=True)
-    high = [p for p in visible if (p.get("score") or 0) >= 60]
-    med = [p for p in visible if 30 <= (p.get("score") or 0) < 60]
-    low = [p for p in visible if 1 <= (p.get("score") or 0) < 30]
-
     col_h, col_m, col_l = st.columns(3)
 
-    def _render_column(col, title: str, accent: str, items: list, max_show: int = 50):
+    def _render_column(col, key: str, title: str, accent: str, min_score: int, max_score: int,
+                       page_size: int = 50):
+        # Only scored (>0) and not AI-irrelevant, newest first
+        filters = {"min_score": min_score, "max_score": max_score, "ai_relevance": "not_irrelevant"}
+        total = count_procurements(**filters)
+
+        # "Visa fler" follows the keyset cursor one page at a time
+        pages_key = f"kb_pages_{key}"
+        pages = st.session_state.get(pages_key, 1)
+        items, cursor = [], None
+        for _ in range(pages):
+            page, cursor = query_procurements(
+                KANBAN_CARD_COLUMNS, after=cursor, limit=page_size, order_by="published", **filters,
+            )
+            items.extend(page)
+            if cursor is None:
+                break
+
         with col:
             st.markdown(
                 f'<div style="background:var(--bg-1);border:1px solid var(--border);border-radius:var(--r);padding:14px 18px;'
                 f'display:flex;align-items:center;justify-content:space-between;margin-bottom:8px">'
                 f'<span style="font-weight:700;font-size:12px;text-transform:uppercase;letter-spacing:0.8px;color:{accent}">{title}</span>'
-                f'<span class="kb-count">{len(items)}</span>'
+                f'<span class="kb-count">{total}</span>'
                 f'</div>',
                 unsafe_allow_html=True,
             )
@@ -369,16 +384,16 @@ def _render_kanban():
                     '<div style="padding:24px;text-align:center;color:var(--text-3);font-size:12px">Inga upphandlingar</div>',
                     unsafe_allow_html=True,
                 )
-            for p in items[:max_show]:
+            for p in items:
                 _s = p.get("score", 0) or 0
                 _title = esc((p.get("title") or "Utan titel")[:90])
                 _buyer = esc(p.get("buyer") or "")
                 _source = esc((p.get("source") or "").upper())
                 _published = (p.get("published_date") or "")[:10]
                 _deadline = (p.get("deadline") or "")[:10]
-                _desc = esc((p.get("description") or "")[:120])
+                _desc = esc((p.get("description_preview") or "")[:120])
                 _value = fmt_value(p.get("estimated_value"), p.get("currency"))
-                _label = get_label(p["id"])
+                _label = p.get("label")
 
                 tags = f'<span class="tag tag-src">{_source}</span>'
                 if _published:
@@ -390,16 +405,15 @@ def _render_kanban():
 
                 label_indicator = ""
                 if _label:
-                    _lc = "#4ade80" if _label["label"] == "relevant" else "#f87171"
-                    _lt = "R" if _label["label"] == "relevant" else "IR"
+                    _lc = "#4ade80" if _label == "relevant" else "#f87171"
+                    _lt = "R" if _label == "relevant" else "IR"
                     label_indicator = (
                         f'<span style="display:inline-block;padding:2px 6px;border-radius:4px;font-size:9px;'
                         f'font-weight:700;color:{_lc};border:1px solid {_lc}30;margin-left:4px">{_lt}</span>'
                     )
 
-                cached_ai = get_analysis(p["id"])
                 ai_indicator = ""
-                if cached_ai:
+                if p.get("has_analysis"):
                     ai_indicator = (
                         '<span style="display:inline-block;padding:2px 6px;border-radius:4px;font-size:9px;'
                         'font-weight:700;color:#60a5fa;border:1px solid #60a5fa30;margin-left:4px">AI</span>'
@@ -428,17 +442,23 @@ def _render_kanban():
                 if st.button("Visa", key=f"kb_{p['id']}", use_container_width=True):
                     show_procurement_dialog(p["id"])
 
-            if len(items) > max_show:
-                st.caption(f"+{len(items) - max_show} till")
+            if cursor is not None:
+                st.caption(f"+{total - len(items)} till")
+                if st.button("Visa fler", key=f"kb_more_{key}", use_container_width=True):
+                    st.session_state[pages_key] = pages + 1
+                    st.rerun()
 
-    _render_column(col_h, "Hög prioritet", "#f97316", high)
-    _render_column(col_m, "Medel", "#eab308", med)
-    _render_column(col_l, "Låg", "#52525b", low, max_show=20)
+    _render_column(col_h, "high", "Hög prioritet", "#f97316", 60, 100)
+    _render_column(col_m, "med", "Medel", "#eab308", 30, 59)
+    _render_column(col_l, "low", "Låg", "#52525b", 1, 29, page_size=20)
 
 
 # ---------------------------------------------------------------------------
 # Sök & Filter tab
 # ---------------------------------------------------------------------------
+SEARCH_LIMIT = 500
+
+
 def _render_search():
     """Search and filter procurements."""
     current_user = st.session_state["current_user"]
@@ -458,19 +478,29 @@ def _render_search():
     source_val = "" if source_filter == "Alla" else source_filter
     ai_val_map = {"Alla": "", "Relevant": "relevant", "Inte relevant": "irrelevant", "Ej bedömd": "unassessed"}
     ai_val = ai_val_map[ai_filter]
+    cols = ["id", "title", "buyer", "score", "source", "published_date", "deadline", "geography"]
     results = search_procurements(
         query=query, source=source_val,
         min_score=score_range[0], max_score=score_range[1],
         geography=geography_filter,
         ai_relevance=ai_val,
+        limit=SEARCH_LIMIT,
+        columns=cols,
     )
 
-    st.markdown(f"**{len(results)}** resultat")
+    if len(results) == SEARCH_LIMIT:
+        st.markdown(f"Visar de **{SEARCH_LIMIT}** första resultaten — förfina sökningen för att se fler")
+    else:
+        st.markdown(f"**{len(results)}** resultat")
 
     if results:
-        df = pd.DataFrame(results)[["id", "title", "buyer", "score", "source", "published_date", "deadline", "geography"]]
-        df = df.rename(columns={"published_date": "Publicerad", "deadline": "Deadline"})
-        df = df.sort_values("Publicerad", ascending=False, na_position="last")
+        if query:
+            # Ranked by relevance — keep the FTS order and show the match
+            cols = cols + ["snippet"]
+        df = pd.DataFrame(results)[[c for c in cols if c in results[0]]]
+        df = df.rename(columns={"published_date": "Publicerad", "deadline": "Deadline", "snippet": "Träff"})
+        if not query:
+            df = df.sort_values("Publicerad", ascending=False, na_position="last")
         st.dataframe(df, use_container_width=True, hide_index=True)
 
         # Quick add to pipeline
@@ -482,7 +512,7 @@ def _render_search():
                 show_procurement_dialog(int(sel_id))
         with sc2:
             if st.button("Lägg till i pipeline", key="search_add_pipe"):
-                ensure_pipeline_entry(int(sel_id), assigned_to=current_user["username"])
+                submit_write(ensure_pipeline_entry, int(sel_id), assigned_to=current_user["username"]).result()
                 st.success("Tillagd i pipeline!")
     else:
         st.markdown(
@@ -3,14 +3,16 @@
 from datetime import datetime
 from collections import defaultdict
 
-from db import get_all_procurements, get_all_accounts
+from db import get_all_procurements, get_all_accounts, versioned_cache
 
 
+@versioned_cache("procurements", "accounts")
 def predict_reprocurements() -> list[dict]:
     """Analyze historical procurement patterns to predict future reprocurements.
 
     Logic: Group procurements by buyer/account, find repeated similar procurements,
     calculate average interval, predict next occurrence.
+    Cached until procurements or accounts change.
     """
     procurements = get_all_procurements()
     accounts = get_all_accounts()
@@ -8,19 +8,21 @@ Usage:
 """
 
 import argparse
+import copy
 from datetime import datetime, timedelta
 
 from db import (
     init_db, get_pipeline_items, get_pipeline_summary,
     get_pipeline_summary_by_user, get_all_procurements,
-    get_recent_activity, STAGE_LABELS,
+    get_recent_activity, versioned_cache, STAGE_LABELS,
 )
 
 
 def generate_report(week: str | None = None) -> dict:
     """Generate a weekly pipeline report.
 
-    Returns dict with report sections ready for display or email.
+    Returns dict with report sections ready for display or email. It is
+    the caller's own copy; the cached report behind it is not touched.
     """
     init_db()
 
@@ -31,7 +33,13 @@ def generate_report(week: str | None = None) -> dict:
     else:
         now = datetime.now()
         start = now - timedelta(days=now.weekday())
-    start = start.replace(hour=0, minute=0, second=0)
+    start = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    return copy.deepcopy(_weekly_report(start))
+
+
+@versioned_cache("pipeline", "procurements", "procurement_notes")
+def _weekly_report(start: datetime) -> dict:
+    """Build the report for the week starting at *start* (cached until data changes)."""
     end = start + timedelta(days=7)
 
     start_str = start.strftime("%Y-%m-%d")
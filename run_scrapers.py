@@ -2,22 +2,51 @@
 """CLI-skript för att köra alla scrapers, lagra resultat och scora leads."""
 
 import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+from collections.abc import Iterable
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from typing import Callable
 
+import httpx
+
 from db import (
-    init_db, upsert_procurement, get_all_procurements, update_score,
+    init_db, upsert_procurements, get_all_procurements, get_score_inputs, update_scores,
     deduplicate_procurements, ensure_pipeline_entry, seed_accounts,
     auto_link_procurements_to_accounts, get_all_active_watches, create_notification,
     archive_expired_procurements, cross_source_deduplicate, create_deadline_calendar_events,
+    submit_write, get_scrape_state, update_scrape_state, get_known_source_ids,
 )
-from scorer import score_procurement
+from scorer import SCORE_COLUMNS, active_ruleset, init_score_worker, refresh_ruleset, ruleset_hash, score_rows
 from scrapers import ALL_SCRAPERS
-
-
-def scrape_sources(sources: list[str] | None = None, on_progress: Callable[[str], None] | None = None) -> dict[str, int]:
-    """Run scrapers and upsert results. Returns {source: count}."""
+from scrapers.base import BaseScraper, make_async_client
+from scrapers.http_cache import get_cache
+
+logger = logging.getLogger(__name__)
+
+# Records per upsert while a source streams; each batch is committed as it fills
+UPSERT_BATCH = 50
+# Procurements per scoring chunk in score_all, the unit sent to a worker
+SCORE_BATCH = 2000
+
+
+def scrape_sources(sources: list[str] | None = None, on_progress: Callable[[str], None] | None = None,
+                   full: bool = False, transport: httpx.AsyncBaseTransport | None = None) -> dict[str, int]:
+    """Run scrapers concurrently and upsert results. Returns {source: count}.
+
+    All sources share one AsyncClient. Records are upserted in batches of
+    UPSERT_BATCH while each source streams, so a source that fails keeps
+    the pages stored before the error and does not affect the others.
+    Counts are the records stored per source. Unless *full*, each
+    source resumes from its scrape_state watermark and stops at notices
+    already stored. *transport* replaces the network, e.g. a
+    scrapers.cassette replay. Scoring does not need to be told what
+    changed: score_all() compares each row's content_hash itself.
+    """
     init_db()
-    result_counts: dict[str, int] = {}
+    scrapers: list[BaseScraper] = []
 
     for scraper_cls in ALL_SCRAPERS:
         scraper = scraper_cls()
@@ -25,31 +54,92 @@ def scrape_sources(sources: list[str] | None = None, on_progress: Callable[[str]
             if on_progress:
                 on_progress(f"Hoppar över {scraper.name} (ej vald)")
             continue
+        if not full:
+            state = get_scrape_state(scraper.name)
+            scraper.since = state["watermark"] if state else None
+            scraper.known_ids = frozenset(get_known_source_ids(scraper.name))
+        scrapers.append(scraper)
+
+    get_cache().reset_stats()
+    counts = asyncio.run(_scrape_all(scrapers, on_progress, full, transport))
+    _report_cache(on_progress)
+    return counts
+
+
+def _report_cache(on_progress: Callable[[str], None] | None):
+    """Report the HTTP cache hit ratio since the last reset."""
+    stats = get_cache().stats
+    if not stats.requests:
+        return
+    msg = f"HTTP-cache: {stats}"
+    if on_progress:
+        on_progress(msg)
+    else:
+        print(msg)
+
+
+async def _scrape_all(scrapers: list[BaseScraper], on_progress: Callable[[str], None] | None,
+                      full: bool = False, transport: httpx.AsyncBaseTransport | None = None) -> dict[str, int]:
+    async with make_async_client(transport=transport) as client:
+        counts = await asyncio.gather(*(_scrape_one(s, client, on_progress, full) for s in scrapers))
+    return {s.name: count for s, count in zip(scrapers, counts)}
 
+
+async def _scrape_one(scraper: BaseScraper, client, on_progress: Callable[[str], None] | None,
+                      full: bool = False) -> int:
+    if on_progress:
+        on_progress(f"Hämtar från {scraper.name}...")
+    else:
+        print(f"\n{'='*50}\nKör {scraper.name} scraper...\n{'='*50}")
+
+    count = written = 0
+    watermark = None
+    batch = []
+
+    async def flush():
+        nonlocal count, written
+        # The writer thread serializes the sources' upserts; awaiting each
+        # batch keeps at most UPSERT_BATCH records per source in memory
+        result = await asyncio.wrap_future(submit_write(upsert_procurements, batch))
+        # Records, not distinct source_ids: a listing may repeat a notice
+        count += len(batch)
+        written += len(result.changed)
+        batch.clear()
+
+    try:
+        async for record in scraper.aiter_fetch(client):
+            batch.append(record)
+            if record.published_date and (watermark is None or record.published_date > watermark):
+                watermark = record.published_date
+            if len(batch) >= UPSERT_BATCH:
+                await flush()
+        if batch:
+            await flush()
+        if scraper.complete:
+            await asyncio.wrap_future(submit_write(update_scrape_state, scraper.name, watermark, full))
         if on_progress:
-            on_progress(f"Hämtar från {scraper.name}...")
+            on_progress(f"{scraper.name}: {count} upphandlingar hämtade, {written} nya eller ändrade")
         else:
-            print(f"\n{'='*50}\nKör {scraper.name} scraper...\n{'='*50}")
-
-        try:
-            items = scraper.fetch()
-            count = 0
-            for item in items:
-                upsert_procurement(item)
-                count += 1
-            result_counts[scraper.name] = count
-            if on_progress:
-                on_progress(f"{scraper.name}: {count} upphandlingar hämtade")
-            else:
-                print(f"[{scraper.name}] {count} upphandlingar lagrade/uppdaterade")
-        except Exception as e:
-            if on_progress:
-                on_progress(f"{scraper.name}: Fel — {e}")
-            else:
-                print(f"[{scraper.name}] Failed: {e}")
-            result_counts[scraper.name] = 0
-
-    return result_counts
+            print(f"[{scraper.name}] {count} upphandlingar hämtade, {written} nya eller ändrade")
+        return count
+    except Exception as e:
+        # Never advance this source's watermark past a failed run
+        scraper.complete = False
+        unsaved = 0
+        if batch:
+            # Records parsed before the error are still valid
+            try:
+                await flush()
+            except Exception as flush_error:
+                unsaved = len(batch)
+                logger.error("[%s] %d records could not be stored: %s", scraper.name, unsaved, flush_error)
+        if on_progress:
+            lost = f", {unsaved} kunde inte sparas" if unsaved else ""
+            on_progress(f"{scraper.name}: Fel — {e} ({count} lagrade före felet{lost})")
+        else:
+            lost = f", {unsaved} could not be stored" if unsaved else ""
+            print(f"[{scraper.name}] Failed: {e} ({count} stored before the error{lost})")
+        return count
 
 
 def run_dedup(on_progress: Callable[[str], None] | None = None) -> int:
@@ -67,30 +157,67 @@ def run_dedup(on_progress: Callable[[str], None] | None = None) -> int:
     return removed
 
 
-def score_all(on_progress: Callable[[str], None] | None = None) -> int:
-    """Score all procurements. Returns count scored."""
+def score_all(on_progress: Callable[[str], None] | None = None, ids: Iterable[int] | None = None,
+              rescore_all: bool = False, workers: int = 1) -> int:
+    """Score procurements not yet scored by the current ruleset. Returns count scored.
+
+    The ruleset file is reloaded first if it changed. A row is rescored
+    when scorer.ruleset_hash() or its content_hash differs from what its
+    score was computed from; *rescore_all* scores
+    every row regardless, and *ids* limits the candidates. Rows are scored
+    in chunks of SCORE_BATCH tuples, across *workers* processes when more
+    than one, and streamed back in order into update_scores(), which
+    writes them all in one transaction from this process.
+    """
     init_db()
+    what = "alla upphandlingar" if rescore_all else "nya och ändrade upphandlingar"
     if on_progress:
-        on_progress("Scorar alla upphandlingar...")
+        on_progress(f"Scorar {what}...")
     else:
-        print("\nScorar alla upphandlingar...")
-    procurements = get_all_procurements()
-    for i, p in enumerate(procurements):
-        score, rationale, breakdown = score_procurement(
-            title=p.get("title", ""),
-            description=p.get("description", ""),
-            buyer=p.get("buyer", ""),
-            cpv_codes=p.get("cpv_codes", ""),
-        )
-        update_score(p["id"], score, rationale, breakdown)
-        if on_progress and (i + 1) % 50 == 0:
-            on_progress(f"Scorat {i + 1}/{len(procurements)}...")
-    msg = f"Scorade {len(procurements)} upphandlingar"
+        print(f"\nScorar {what}...")
+    refresh_ruleset()
+    ruleset = ruleset_hash()
+    inputs = get_score_inputs(ids, ruleset=None if rescore_all else ruleset)
+    total = len(inputs["id"])
+    columns = [inputs[c] for c in SCORE_COLUMNS]
+    chunks = [list(zip(*(col[i:i + SCORE_BATCH] for col in columns))) for i in range(0, total, SCORE_BATCH)]
+
+    def scored(results):
+        done = 0
+        for result in results:
+            ids_, hashes = inputs["id"][done:done + len(result)], inputs["content_hash"][done:done + len(result)]
+            yield from ((pid, *r, h) for pid, r, h in zip(ids_, result, hashes))
+            done += len(result)
+            if on_progress and total > SCORE_BATCH:
+                on_progress(f"Scorat {done}/{total}...")
+
+    if workers > 1 and len(chunks) > 1:
+        # spawn, not fork: the caller may be a threaded Streamlit process
+        with ProcessPoolExecutor(min(workers, len(chunks)), mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=init_score_worker, initargs=(active_ruleset(),)) as pool:
+            update_scores(scored(pool.map(score_rows, chunks)), ruleset=ruleset)
+    else:
+        update_scores(scored(map(score_rows, chunks)), ruleset=ruleset)
+    msg = f"Scorade {total} upphandlingar"
     if on_progress:
         on_progress(msg)
     else:
         print(msg)
-    return len(procurements)
+    return total
+
+
+# One background rescore at a time; later requests queue behind it
+_rescore_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rescore")
+
+
+def rescore_in_background() -> Future:
+    """Queue an incremental score_all() on a background thread.
+
+    Used after activating a new scoring ruleset, so the admin page does
+    not block while every affected row is rescored. Returns a Future with
+    the number of rows scored.
+    """
+    return _rescore_pool.submit(score_all, on_progress=lambda msg: None)
 
 
 def run_ai_prefilter(ollama_model: str = "Ministral-3-14B-Instruct-2512-Q4_K_M.gguf", on_progress: Callable[[str], None] | None = None):
@@ -114,7 +241,9 @@ def run_deep_analysis(min_score: int = 1, force: bool = False, ollama_model: str
     else:
         print(f"\n{msg}")
     from analyzer import analyze_all_relevant
+    get_cache().reset_stats()
     analyze_all_relevant(min_score=min_score, force=force, model=ollama_model)
+    _report_cache(on_progress)
     if on_progress:
         on_progress("Djupanalys klar")
 
@@ -216,11 +345,12 @@ def check_watch_lists(on_progress: Callable[[str], None] | None = None) -> int:
 
 def run(sources: list[str] | None = None, skip_scoring: bool = False,
         ollama_model: str = "Ministral-3-14B-Instruct-2512-Q4_K_M.gguf",
-        skip_analysis: bool = False, on_progress: Callable[[str], None] | None = None):
+        skip_analysis: bool = False, on_progress: Callable[[str], None] | None = None,
+        full: bool = False, rescore_all: bool = False):
     """Kör scrapers och scora resultat."""
     init_db()
 
-    scrape_sources(sources, on_progress=on_progress)
+    scrape_sources(sources, on_progress=on_progress, full=full)
     run_dedup(on_progress=on_progress)
 
     # Cross-source dedup
@@ -250,7 +380,8 @@ def run(sources: list[str] | None = None, skip_scoring: bool = False,
         print(msg)
 
     if not skip_scoring:
-        score_all(on_progress=on_progress)
+        # Rows scored by this ruleset from unchanged content keep their score
+        score_all(on_progress=on_progress, rescore_all=rescore_all)
 
     run_ai_prefilter(ollama_model=ollama_model, on_progress=on_progress)
 
@@ -308,15 +439,39 @@ def main():
         action="store_true",
         help="Hoppa över Ollama-djupanalys",
     )
+    parser.add_argument(
+        "--rescore-all",
+        action="store_true",
+        help="Scora om alla upphandlingar, även de som redan scorats med aktuella regler",
+    )
+    parser.add_argument(
+        "--backfill-score",
+        action="store_true",
+        help="Bara scora, parallellt över alla kärnor (för stora historiska laddningar)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Antal processer för --backfill-score (standard: antal kärnor)",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Ignorera vattenmärken och gör en fullständig omsynk av alla källor",
+    )
     args = parser.parse_args()
 
-    if args.score_only:
-        score_all()
+    if args.backfill_score:
+        score_all(rescore_all=args.rescore_all, workers=args.workers)
+    elif args.score_only:
+        score_all(rescore_all=args.rescore_all)
         run_ai_prefilter(ollama_model=args.ollama_model)
         if not args.skip_analysis:
             run_deep_analysis(ollama_model=args.ollama_model)
     else:
-        run(sources=args.sources, skip_scoring=args.skip_scoring, ollama_model=args.ollama_model, skip_analysis=args.skip_analysis)
+        run(sources=args.sources, skip_scoring=args.skip_scoring, ollama_model=args.ollama_model, skip_analysis=args.skip_analysis,
+            full=args.full, rescore_all=args.rescore_all)
 
 
 if __name__ == "__main__":
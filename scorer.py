@@ -6,228 +6,353 @@ personaleffektivitet, executive coaching, seminarier och AI-workshops.
 Scoring:
 1. Sector gate — blockera irrelevanta sektorer (bygg, medicin, IT-drift etc)
 2. Utbildningsrelevans — matchar det HAST:s tjänsteområden?
+
+Regeltabellerna (nyckelord, vikter, CPV-bonusar, blockerade sektorer och
+köpare) läses från config/scoring_rules.yaml och kompileras en gång till en
+Aho-Corasick-automat (pyahocorasick) som hittar varje träff i ett enda svep
+över texten. refresh_ruleset() läser in filen igen när den ändrats.
 """
 
 from __future__ import annotations
 
+import hashlib
+import importlib.util
+import json
 import re
+import threading
+from pathlib import Path
+from typing import NamedTuple
 
-# ---------------------------------------------------------------------------
-# Stage 1: Utbildnings-/utvecklingsgate — unambiguous signals
-# ---------------------------------------------------------------------------
-EDUCATION_GATE_KEYWORDS: list[str] = [
-    # Utbildning & utveckling
-    "utbildning", "ledarskapsutbildning", "ledarskapsutveckling",
-    "chefsutveckling", "chefsutbildning", "kompetensutveckling",
-    "kompetensförsörjning", "organisationsutveckling",
-    "teamutveckling", "grupputveckling", "medarbetarutveckling",
-    "personalutveckling", "personlig utveckling",
-    "kommunikationsutbildning", "kommunikationsträning",
-    # Coaching
-    "coaching", "executive coaching", "chefscoaching", "handledning",
-    "mentorskap", "mentor", "coachning",
-    # Seminarier & workshops
-    "seminarium", "workshop", "inspirationsföreläsning",
-    "föreläsning", "konferens", "kunskapsseminarium",
-    # Ledarskap & organisation
-    "ledarskap", "ledarskapsprogram", "chefsprogram",
-    "arbetsmiljö", "organisationsförändring", "förändringsledning",
-    "förändringsarbete", "arbetskultur", "medarbetarskap",
-    # HR & kompetens
-    "hr-tjänster", "personaleffektivitet", "stresshantering",
-    "konflikthantering", "feedbackkultur", "gruppdynamik",
-    "teambuilding", "team building",
-    # Ramavtal utbildning
-    "ramavtal utbildning", "konsulttjänster utbildning",
-    "managementkonsult", "organisationskonsult",
-]
+import yaml
 
 # ---------------------------------------------------------------------------
-# Stage 2: HAST-specifika relevance keywords med vikter
+# Ruleset file
 # ---------------------------------------------------------------------------
-HIGH_WEIGHT_KEYWORDS: dict[str, int] = {
-    # HAST kärnkompetens
-    "ledarskapsutbildning": 25,
-    "ledarskapsutveckling": 25,
-    "chefsutveckling": 25,
-    "chefsutbildning": 25,
-    "ledarskapsprogram": 25,
-    "chefsprogram": 20,
-    "executive coaching": 30,
-    "chefscoaching": 25,
-    "teamutveckling": 25,
-    "grupputveckling": 25,
-    "organisationsutveckling": 20,
-    "kommunikationsutbildning": 25,
-    "kommunikationsträning": 20,
-    "personaleffektivitet": 20,
-    "förändringsledning": 20,
+# Keyword tables, weights, CPV bonuses, blocked sectors and known buyers live
+# in this YAML (or JSON) file so they can be tuned without a deploy. Its
+# tables are bound to the module names below by _apply_ruleset().
+RULESET_PATH = Path(__file__).parent / "config" / "scoring_rules.yaml"
+
+# Bump when the scoring logic changes in a way the ruleset file does not show
+SCORER_VERSION = 1
+
+RULESET_VERSION: int
+EDUCATION_GATE_KEYWORDS: list[str]
+HIGH_WEIGHT_KEYWORDS: dict[str, int]
+MEDIUM_WEIGHT_KEYWORDS: dict[str, int]
+BASE_WEIGHT_KEYWORDS: dict[str, int]
+BUYER_BONUS: int
+BLOCKED_SECTORS: dict[str, list[str]]
+HAST_CPV_CODES: dict[str, int]
+EDUCATION_CPV_PREFIXES: list[str]
+KNOWN_BUYERS: list[str]
+ALL_KEYWORDS: dict[str, int]
+
+
+class RulesetError(ValueError):
+    """A scoring ruleset that does not validate; *errors* lists every problem."""
+
+    def __init__(self, errors: list[str]):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+def _check_int(name, value, errors):
+    if not isinstance(value, int) or isinstance(value, bool):
+        errors.append(f"{name}: ska vara ett heltal")
+
+
+def _check_keywords(name, value, errors):
+    if not isinstance(value, list) or not all(isinstance(kw, str) and kw.strip() for kw in value):
+        errors.append(f"{name}: ska vara en lista med nyckelord")
+        return
+    errors.extend(f"{name}: '{kw}' ska skrivas med gemener" for kw in value if kw != kw.lower())
+
+
+def _check_weights(name, value, errors):
+    if not isinstance(value, dict):
+        errors.append(f"{name}: ska vara nyckelord: vikt")
+        return
+    _check_keywords(name, list(value), errors)
+    for kw, weight in value.items():
+        _check_int(f"{name}.{kw}", weight, errors)
+
+
+def _check_sectors(name, value, errors):
+    if not isinstance(value, dict):
+        errors.append(f"{name}: ska vara sektor: lista med nyckelord")
+        return
+    for sector, keywords in value.items():
+        _check_keywords(f"{name}.{sector}", keywords, errors)
+
+
+def _check_cpv_codes(name, value, errors):
+    if not isinstance(value, dict):
+        errors.append(f"{name}: ska vara CPV-kod: bonus")
+        return
+    _check_cpv_prefixes(name, list(value), errors)
+    for code, bonus in value.items():
+        _check_int(f"{name}.{code}", bonus, errors)
+
+
+def _check_cpv_prefixes(name, value, errors):
+    if not isinstance(value, list):
+        errors.append(f"{name}: ska vara en lista med CPV-koder")
+        return
+    # YAML reads an unquoted 80532000 as a number (and 03000000 as octal)
+    errors.extend(f"{name}: {code!r} ska vara en citerad sträng med siffror, t.ex. \"80532000\""
+                  for code in value if not (isinstance(code, str) and code.isdigit()))
+
+
+# Ruleset file key -> check, in file order
+_RULESET_SCHEMA = {
+    "version": _check_int,
+    "education_gate_keywords": _check_keywords,
+    "high_weight_keywords": _check_weights,
+    "medium_weight_keywords": _check_weights,
+    "base_weight_keywords": _check_weights,
+    "buyer_bonus": _check_int,
+    "blocked_sectors": _check_sectors,
+    "hast_cpv_codes": _check_cpv_codes,
+    "education_cpv_prefixes": _check_cpv_prefixes,
+    "known_buyers": _check_keywords,
 }
 
-MEDIUM_WEIGHT_KEYWORDS: dict[str, int] = {
-    "coaching": 15,
-    "coachning": 15,
-    "handledning": 12,
-    "mentorskap": 12,
-    "kompetensutveckling": 15,
-    "kompetensförsörjning": 12,
-    "medarbetarutveckling": 15,
-    "personalutveckling": 12,
-    "organisationsförändring": 12,
-    "förändringsarbete": 12,
-    "arbetsmiljö": 10,
-    "stresshantering": 15,
-    "konflikthantering": 15,
-    "feedbackkultur": 12,
-    "gruppdynamik": 15,
-    "teambuilding": 12,
-    "seminarium": 10,
-    "workshop": 10,
-    "föreläsning": 8,
-    "inspirationsföreläsning": 12,
-    "ledarskap": 10,
-    "medarbetarskap": 10,
-    "arbetskultur": 10,
-}
 
-BASE_WEIGHT_KEYWORDS: dict[str, int] = {
-    "utbildning": 5,
-    "hr-tjänster": 5,
-    "managementkonsult": 8,
-    "organisationskonsult": 8,
-    "konsulttjänster": 3,
-    "ramavtal": 3,
-}
+def validate_ruleset(text: str | bytes) -> dict:
+    """Parse a ruleset file's YAML or JSON contents and check every table.
+
+    Returns the tables keyed as in the file; raises RulesetError listing
+    all problems found.
+    """
+    try:
+        rules = yaml.safe_load(text)
+    except yaml.YAMLError as e:
+        raise RulesetError([f"Kan inte läsa regelfilen: {e}"]) from e
+    if not isinstance(rules, dict):
+        raise RulesetError(["Regelfilen ska vara en mappning från tabellnamn till tabeller"])
+    errors = [f"{key}: okänd tabell" for key in rules if key not in _RULESET_SCHEMA]
+    for key, check in _RULESET_SCHEMA.items():
+        if key not in rules:
+            errors.append(f"{key}: saknas")
+        else:
+            check(key, rules[key], errors)
+    if not errors and rules["version"] < 1:
+        errors.append("version: ska vara 1 eller högre")
+    if errors:
+        raise RulesetError(errors)
+    return rules
+
+
+def active_ruleset() -> dict:
+    """The tables scoring currently uses, keyed as in the ruleset file."""
+    return {
+        "version": RULESET_VERSION,
+        "education_gate_keywords": EDUCATION_GATE_KEYWORDS,
+        "high_weight_keywords": HIGH_WEIGHT_KEYWORDS,
+        "medium_weight_keywords": MEDIUM_WEIGHT_KEYWORDS,
+        "base_weight_keywords": BASE_WEIGHT_KEYWORDS,
+        "buyer_bonus": BUYER_BONUS,
+        "blocked_sectors": BLOCKED_SECTORS,
+        "hast_cpv_codes": HAST_CPV_CODES,
+        "education_cpv_prefixes": EDUCATION_CPV_PREFIXES,
+        "known_buyers": KNOWN_BUYERS,
+    }
 
-# ---------------------------------------------------------------------------
-# Blocked sectors — hard gate
-# ---------------------------------------------------------------------------
-BLOCKED_SECTORS: dict[str, list[str]] = {
-    "Medicinsk/vård": [
-        "ekg", "journal", "antikoagulantia", "medicinsk programvara",
-        "läkemedel", "laboratori", "röntgen", "patologi", "klinisk",
-        "tandvård", "tandvårdssystem", "ambulans", "patient",
-        "sjukvård", "vårdmöten", "egenmonitorering", "medicintekn",
-        "bildhanteringssystem", "frikort", "veterinär",
-    ],
-    "VA/vatten": [
-        "ultrafilter", "reningsverk", "avlopp", "vattenledning", "vattenverk",
-    ],
-    "Bygg/anläggning": [
-        "totalentreprenad", "markentreprenad", "betongarbeten",
-        "asfaltering", "rivning", "schakt", "byggnation",
-        "tekniska konsulter", "ingenjörstjänster",
-    ],
-    "IT-drift/system": [
-        "serverdrift", "nätverksdrift", "hårdvara", "licenser",
-        "systemdrift", "it-infrastruktur", "cyberhot", "mdr-tjänst",
-        "bokningssystem", "biljettsystem", "biljett-",
-        "bibliotekssystem", "lagerförvaltning", "kassasystem",
-    ],
-    "Transport/drift": [
-        "busstrafik", "linjetrafik", "tågtrafik", "färjetrafik",
-        "taxitjänst", "godstransport", "bränsle", "skolskjuts",
-        "yrkesförare", "körkortsutbildning", "snöskoter",
-        "skogsbrandsbevakning", "avfallstransport", "åkeritjänster",
-        "tredjepartslogistik", "3pl", "hemkörning",
-        "realtidsinformation", "passagerarinformation",
-        "kollektivtrafik", "färdtjänst",
-    ],
-    "Material/varor": [
-        "kontorsmaterial", "möbler", "livsmedel", "tryckeri",
-        "städ", "tvätt", "fordon", "maskiner", "dagligvaror",
-    ],
-    "Infrastruktur": [
-        "fyra spår", "infrastrukturprojekt", "terminologitjänst",
-        "patientkallelse", "larm", "passerkontroll",
-    ],
-    "Rekrytering/bemanning": [
-        "bemanningstjänster", "personaluthyrning", "inhyrning av läkare",
-        "inhyrning av sjukskötersk", "förmedling av vårdpersonal",
-        "förmedling av läkare", "sjukskötersketjänster",
-        "rekryteringstjänster", "second opinion vid rekrytering",
-    ],
-    "Juridik/finans": [
-        "inkasso", "påminnelsetjänster", "juridisk rådgivning",
-        "advokatbyråtjänster", "revisionstjänster",
-    ],
-    "Marknadsföring/reklam": [
-        "reklam och marknadsföring", "kommunikationsbyrå",
-        "profilprodukter", "presenter och priser",
-        "korrekturläsning", "proofreading",
-    ],
-    "Undersökning/analys": [
-        "undersökningstjänster", "marknadsundersökning",
-        "telefonnummersättning", "statistisk",
-    ],
-}
 
-# ---------------------------------------------------------------------------
-# CPV-koder relevanta för HAST:s tjänsteområden
-# ---------------------------------------------------------------------------
-HAST_CPV_CODES: dict[str, int] = {
-    # Kärnkoder — exakt match, hög bonus
-    "80532000": 20,  # Chefsutbildning
-    "79633000": 20,  # Personalutveckling
-    "79632000": 18,  # Utbildning av personal
-    "80511000": 18,  # Personalutbildning
-    "79998000": 20,  # Coachning
-    "80570000": 18,  # Utbildning i personlig utveckling
-    # Relevanta koder — mellannivå
-    "79414000": 12,  # Managementkonsulttjänster
-    "79411100": 10,  # Rådgivning rörande utveckling
-    "79411000": 10,  # Allmän managementrådgivning
-    "79410000": 8,   # Företags- och organisationsrådgivning
-    "80590000": 10,  # Handledning
-    "80521000": 8,   # Utbildningsprogram
-    "79600000": 5,   # Rekryteringstjänster (HR-angränsande)
-    # Breda koder — låg bonus (gate-signal)
-    "80500000": 5,   # Utbildningstjänster (bred)
-    "80530000": 5,   # Yrkesutbildning (bred)
-    "80000000": 3,   # Undervisning och utbildning (mycket bred)
-}
+def ruleset_hash() -> str:
+    """Stable hash of the active ruleset: every table plus SCORER_VERSION.
+
+    Table order is part of the hash, since it decides which blocked keyword
+    is reported and the order of keyword matches.
+    """
+    ruleset = {"scorer_version": SCORER_VERSION, **active_ruleset()}
+    encoded = json.dumps(ruleset, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
 
-# Gate-prefix: CPV-koder som indikerar utbildnings-/konsultrelevans
-EDUCATION_CPV_PREFIXES = ["8053", "8051", "8057", "8059", "7963", "7941", "7999"]
 
 # ---------------------------------------------------------------------------
-# Known relevant buyers — offentliga organisationer som upphandlar utbildning
+# Keyword automaton
 # ---------------------------------------------------------------------------
-KNOWN_BUYERS = [
-    "region", "kommun", "landsting", "länsstyrelse",
-    "myndighet", "verk", "styrelse", "nämnd",
-    "polisen", "försvarsmakten", "trafikverket",
-    "arbetsförmedlingen", "skatteverket", "försäkringskassan",
-    "sida", "folkhälsomyndigheten",
-]
+# pyahocorasick is a C Aho-Corasick automaton. Without it, scoring falls back
+# to one substring test per keyword, which a pure-Python automaton does not
+# beat; both backends give the same matches.
+MATCHER_BACKENDS = (["pyahocorasick"] if importlib.util.find_spec("ahocorasick") else []) + ["substring"]
+
+
+class KeywordMatcher:
+    """Multi-keyword matcher over a fixed set of lowercase keywords.
+
+    find() returns every occurrence, overlapping ones included, as
+    (start, end, keyword); with pyahocorasick in one pass over the text.
+    """
+
+    def __init__(self, keywords, backend: str | None = None):
+        self.keywords = sorted(set(keywords))
+        self.max_len = max(map(len, self.keywords), default=0)
+        self.backend = backend or MATCHER_BACKENDS[0]
+        if self.backend == "pyahocorasick":
+            import ahocorasick
+            self._automaton = ahocorasick.Automaton()
+            for kw in self.keywords:
+                self._automaton.add_word(kw, kw)
+            if self.keywords:
+                self._automaton.make_automaton()
+
+    def find(self, text: str) -> list[tuple[int, int, str]]:
+        """Return (start, end, keyword) for every keyword occurrence in *text*."""
+        if not self.keywords:
+            return []
+        if self.backend == "pyahocorasick":
+            return [(i + 1 - len(kw), i + 1, kw) for i, kw in self._automaton.iter(text)]
+        found = []
+        for kw in self.keywords:
+            start = text.find(kw)
+            while start >= 0:
+                found.append((start, start + len(kw), kw))
+                start = text.find(kw, start + 1)
+        return found
+
+
+def _compile_matcher() -> KeywordMatcher:
+    keywords = set(EDUCATION_GATE_KEYWORDS) | set(ALL_KEYWORDS) | set(KNOWN_BUYERS)
+    for sector_keywords in BLOCKED_SECTORS.values():
+        keywords.update(sector_keywords)
+    return KeywordMatcher(keywords)
 
-ALL_KEYWORDS = {**HIGH_WEIGHT_KEYWORDS, **MEDIUM_WEIGHT_KEYWORDS, **BASE_WEIGHT_KEYWORDS}
 
-
-def sector_gate(
-    title: str = "",
-    description: str = "",
-    buyer: str = "",
-    cpv_codes: str = "",
-) -> tuple[bool, str]:
-    """Hard sector gate — blocks irrelevant sectors before scoring."""
-    text = f"{title} {description}".lower()
-    buyer_lower = (buyer or "").lower()
-    cpv_lower = (cpv_codes or "").lower()
-    full_text = f"{text} {buyer_lower} {cpv_lower}"
-
-    # Check blocked sectors
+# ---------------------------------------------------------------------------
+# Active ruleset
+# ---------------------------------------------------------------------------
+def _apply_ruleset(rules: dict) -> None:
+    """Bind validated ruleset tables to the module names and recompile the matcher."""
+    global RULESET_VERSION, EDUCATION_GATE_KEYWORDS, HIGH_WEIGHT_KEYWORDS, MEDIUM_WEIGHT_KEYWORDS
+    global BASE_WEIGHT_KEYWORDS, BUYER_BONUS, BLOCKED_SECTORS, HAST_CPV_CODES, EDUCATION_CPV_PREFIXES
+    global KNOWN_BUYERS, ALL_KEYWORDS, _MATCHER
+    RULESET_VERSION = rules["version"]
+    EDUCATION_GATE_KEYWORDS = rules["education_gate_keywords"]
+    HIGH_WEIGHT_KEYWORDS = rules["high_weight_keywords"]
+    MEDIUM_WEIGHT_KEYWORDS = rules["medium_weight_keywords"]
+    BASE_WEIGHT_KEYWORDS = rules["base_weight_keywords"]
+    BUYER_BONUS = rules["buyer_bonus"]
+    BLOCKED_SECTORS = rules["blocked_sectors"]
+    HAST_CPV_CODES = rules["hast_cpv_codes"]
+    EDUCATION_CPV_PREFIXES = rules["education_cpv_prefixes"]
+    KNOWN_BUYERS = rules["known_buyers"]
+    ALL_KEYWORDS = {**HIGH_WEIGHT_KEYWORDS, **MEDIUM_WEIGHT_KEYWORDS, **BASE_WEIGHT_KEYWORDS}
+    _MATCHER = _compile_matcher()
+
+
+# (path, mtime_ns, size) of the ruleset file last checked, and the sha256 of
+# the contents compiled into the active tables
+_ruleset_stat: tuple | None = None
+_ruleset_digest: str | None = None
+_ruleset_lock = threading.Lock()
+
+
+def refresh_ruleset(path: str | Path | None = None) -> bool:
+    """Load the ruleset file if it changed since the last call.
+
+    A file whose mtime and size are unchanged is not read; one that was
+    rewritten with the same contents is read but not recompiled. Returns
+    True when new tables were activated. Raises RulesetError, keeping the
+    previous tables, if the file does not validate.
+    """
+    global _ruleset_stat, _ruleset_digest
+    path = Path(path or RULESET_PATH)
+    stat = path.stat()
+    key = (str(path), stat.st_mtime_ns, stat.st_size)
+    if key == _ruleset_stat:
+        return False
+    with _ruleset_lock:
+        if key == _ruleset_stat:
+            return False
+        raw = path.read_bytes()
+        digest = hashlib.sha256(raw).hexdigest()
+        changed = digest != _ruleset_digest
+        if changed:
+            _apply_ruleset(validate_ruleset(raw))
+            _ruleset_digest = digest
+        _ruleset_stat = key
+    return changed
+
+
+def activate_ruleset(text: str, path: str | Path | None = None) -> dict:
+    """Validate *text* as a ruleset, write it to the ruleset file and load it.
+
+    Its version must be higher than the active one; the file it replaces
+    is kept beside it as <name>.v<version><suffix>. Returns the new tables;
+    raises RulesetError without touching the file if *text* is invalid.
+    Rows are rescored on the next score_all(), as the ruleset hash changed.
+    """
+    rules = validate_ruleset(text)
+    path = Path(path or RULESET_PATH)
+    try:
+        refresh_ruleset(path)
+    except RulesetError:
+        pass  # a broken file on disk is what the new text replaces
+    if rules["version"] <= RULESET_VERSION:
+        raise RulesetError([f"version: ska vara högre än den aktiva ({RULESET_VERSION})"])
+    path.with_name(f"{path.stem}.v{RULESET_VERSION}{path.suffix}").write_bytes(path.read_bytes())
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    tmp.replace(path)
+    refresh_ruleset(path)
+    return rules
+
+
+refresh_ruleset()
+
+
+class _Scan:
+    """Keyword occurrences in one procurement, split by where they were found.
+
+    The text is scanned once as "{title description} {buyer} {cpv}", the
+    string the sector gate has always searched. Scoring searches
+    "{title description} {cpv}" and the buyer on its own; those hit sets
+    are taken from the same pass by position, plus a short rescan of the
+    title/CPV junction for keywords that span it once the buyer is removed.
+    On the substring backend the three strings stand in for the hit sets.
+    """
+
+    __slots__ = ("cpv_lower", "gate", "scored", "buyer")
+
+    def __init__(self, title: str, description: str, buyer: str, cpv_codes: str):
+        text = f"{title} {description}".lower()
+        buyer_lower = (buyer or "").lower()
+        self.cpv_lower = (cpv_codes or "").lower()
+        gate_text = f"{text} {buyer_lower} {self.cpv_lower}"
+        if _MATCHER.backend == "substring":
+            # `kw in text` answers the same membership tests as the hit sets
+            self.gate, self.buyer, self.scored = gate_text, buyer_lower, f"{text} {self.cpv_lower}"
+            return
+        matches = _MATCHER.find(gate_text)
+        text_end = len(text)
+        buyer_end = text_end + 1 + len(buyer_lower)
+
+        self.gate = {kw for _, _, kw in matches}
+        self.buyer = {kw for start, end, kw in matches if start > text_end and end <= buyer_end}
+        self.scored = {kw for start, end, kw in matches if end <= text_end + 1 or start >= buyer_end}
+        if self.cpv_lower:
+            reach = _MATCHER.max_len - 1
+            junction = f"{text[-reach:]} {self.cpv_lower[:reach]}"
+            space = min(reach, text_end)
+            self.scored.update(kw for start, end, kw in _MATCHER.find(junction) if start < space < end - 1)
+
+
+def _gate(scan: _Scan) -> tuple[bool, str]:
+    # Check blocked sectors, reporting the first hit in table order
     for sector, keywords in BLOCKED_SECTORS.items():
         for kw in keywords:
-            if kw in full_text:
+            if kw in scan.gate:
                 return False, f"Blockerad sektor ({sector}): {kw}"
 
     # Must have education/development signal
-    has_signal = any(kw in full_text for kw in EDUCATION_GATE_KEYWORDS)
+    has_signal = any(kw in scan.gate for kw in EDUCATION_GATE_KEYWORDS)
 
     if not has_signal:
         # Education CPV counts as signal — check each individual CPV code prefix
-        has_signal = _has_cpv_prefix(cpv_lower, EDUCATION_CPV_PREFIXES)
+        has_signal = _has_cpv_prefix(scan.cpv_lower, EDUCATION_CPV_PREFIXES)
 
     if not has_signal:
         return False, "Ingen utbildnings-/utvecklingssignal"
@@ -235,6 +360,16 @@ def sector_gate(
     return True, "Passerade sector gate"
 
 
+def sector_gate(
+    title: str = "",
+    description: str = "",
+    buyer: str = "",
+    cpv_codes: str = "",
+) -> tuple[bool, str]:
+    """Hard sector gate — blocks irrelevant sectors before scoring."""
+    return _gate(_Scan(title, description, buyer, cpv_codes))
+
+
 def _has_cpv_prefix(cpv_string: str, prefixes: list[str]) -> bool:
     """Check if any individual CPV code starts with one of the given prefixes."""
     if not cpv_string:
@@ -254,7 +389,8 @@ def score_procurement(
     cpv_codes: str = "",
 ) -> tuple[int, str, dict]:
     """Score a procurement for HAST relevance. Returns (score, rationale, breakdown)."""
-    gate_passed, gate_reason = sector_gate(title, description, buyer, cpv_codes)
+    scan = _Scan(title, description, buyer, cpv_codes)
+    gate_passed, gate_reason = _gate(scan)
     if not gate_passed:
         breakdown = {
             "gate_passed": False,
@@ -266,10 +402,7 @@ def score_procurement(
         }
         return 0, gate_reason, breakdown
 
-    text = f"{title} {description}".lower()
-    cpv_lower = (cpv_codes or "").lower()
-    full_text = f"{text} {cpv_lower}"
-    buyer_lower = (buyer or "").lower()
+    cpv_lower = scan.cpv_lower
 
     total = 0
     matched: list[str] = []
@@ -277,19 +410,17 @@ def score_procurement(
 
     matched.append("Utbildning/utveckling")
     for keyword, weight in ALL_KEYWORDS.items():
-        if keyword in full_text:
+        if keyword in scan.scored:
             total += weight
             matched.append(f"{keyword} (+{weight})")
             keyword_matches.append({"keyword": keyword, "weight": weight})
 
     # Buyer bonus — offentlig sektor
     buyer_bonus = 0
-    for known in KNOWN_BUYERS:
-        if known in buyer_lower:
-            buyer_bonus = 8
-            total += buyer_bonus
-            matched.append(f"offentlig köpare (+8)")
-            break
+    if any(known in scan.buyer for known in KNOWN_BUYERS):
+        buyer_bonus = BUYER_BONUS
+        total += buyer_bonus
+        matched.append(f"offentlig köpare (+{buyer_bonus})")
 
     # CPV bonus — per-code match with HAST-specific weights
     cpv_bonus = 0
@@ -320,3 +451,54 @@ def score_procurement(
     }
 
     return total, rationale, breakdown
+
+
+# ---------------------------------------------------------------------------
+# Batch scoring
+# ---------------------------------------------------------------------------
+SCORE_COLUMNS = ("title", "description", "buyer", "cpv_codes")
+
+
+class ScoredBatch(NamedTuple):
+    scores: list[int]
+    rationales: list[str]
+    breakdowns: list[dict]
+
+
+def _text(value) -> str:
+    # None from SQLite, NaN from pandas
+    return value if isinstance(value, str) else ""
+
+
+def score_rows(rows) -> list[tuple[int, str, dict]]:
+    """Score (title, description, buyer, cpv_codes) tuples, nulls as empty.
+
+    Returns one (score, rationale, breakdown) tuple per row. This is the
+    unit of work sent to score worker processes, so rows and results stay
+    plain tuples that pickle cheaply.
+    """
+    return [score_procurement(_text(t), _text(d), _text(b), _text(c)) for t, d, b, c in rows]
+
+
+def score_many(batch) -> ScoredBatch:
+    """Score a columnar batch of procurements.
+
+    *batch* maps SCORE_COLUMNS to equal-length sequences: a pandas
+    DataFrame, or a dict of lists or arrays. Missing columns and null
+    values count as empty. Returns scores, rationales and breakdowns in
+    row order, each as score_procurement() gives it for that row.
+    """
+    columns = {c: batch[c] for c in SCORE_COLUMNS if c in batch}
+    n = len(next(iter(columns.values()), ()))
+    rows = zip(*(columns[c] if c in columns else [""] * n for c in SCORE_COLUMNS))
+    return ScoredBatch(*map(list, zip(*score_rows(rows)))) if n else ScoredBatch([], [], [])
+
+
+def init_score_worker(rules: dict) -> None:
+    """Process-pool initializer: score with the parent's active_ruleset().
+
+    Compiles the keyword matcher once per worker from the tables the
+    parent scores with, so the rows are stored under the right ruleset
+    hash even if the ruleset file changes while the pool runs.
+    """
+    _apply_ruleset(rules)
@@ -2,12 +2,16 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import random
 import time
-from typing import Callable, TypeVar
+from typing import Awaitable, Callable, TypeVar
 
 import httpx
 
+from .ratelimit import get_limiter, retry_after
+
 logger = logging.getLogger(__name__)
 
 T = TypeVar("T")
@@ -15,6 +19,14 @@ T = TypeVar("T")
 RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
 
 
+def _retry_delay(exc: Exception, attempt: int, base_delay: float) -> float:
+    """Full-jitter exponential delay, or the server's Retry-After if longer."""
+    delay = random.uniform(0, base_delay * (2 ** attempt))
+    if isinstance(exc, httpx.HTTPStatusError):
+        delay = max(delay, retry_after(exc.response) or 0.0)
+    return delay
+
+
 def with_backoff(
     fn: Callable[[], T],
     max_retries: int = 3,
@@ -23,7 +35,8 @@ def with_backoff(
     """Call *fn* with exponential backoff on retryable HTTP errors.
 
     Retries on httpx.HTTPStatusError with status 429 or 5xx,
-    and on httpx.TransportError (connection errors, timeouts).
+    and on httpx.TransportError (connection errors, timeouts). Delays are
+    jittered and never shorter than the response's Retry-After.
 
     Raises the last exception if all retries are exhausted.
     """
@@ -40,7 +53,7 @@ def with_backoff(
             last_exc = exc
 
         if attempt < max_retries:
-            delay = base_delay * (2 ** attempt)
+            delay = _retry_delay(last_exc, attempt, base_delay)
             logger.warning(
                 "Attempt %d/%d failed (%s), retrying in %.1fs...",
                 attempt + 1, max_retries + 1, last_exc, delay,
@@ -48,3 +61,63 @@ def with_backoff(
             time.sleep(delay)
 
     raise last_exc  # type: ignore[misc]
+
+
+async def with_backoff_async(
+    fn: Callable[[], Awaitable[T]],
+    max_retries: int = 3,
+    base_delay: float = 1.0,
+) -> T:
+    """Async variant of with_backoff(): awaits *fn* and sleeps without blocking."""
+    last_exc: Exception | None = None
+
+    for attempt in range(max_retries + 1):
+        try:
+            return await fn()
+        except httpx.HTTPStatusError as exc:
+            if exc.response.status_code not in RETRYABLE_STATUS_CODES:
+                raise
+            last_exc = exc
+        except httpx.TransportError as exc:
+            last_exc = exc
+
+        if attempt < max_retries:
+            delay = _retry_delay(last_exc, attempt, base_delay)
+            logger.warning(
+                "Attempt %d/%d failed (%s), retrying in %.1fs...",
+                attempt + 1, max_retries + 1, last_exc, delay,
+            )
+            await asyncio.sleep(delay)
+
+    raise last_exc  # type: ignore[misc]
+
+
+def _check(resp: httpx.Response) -> httpx.Response:
+    # 304 answers a conditional request; only 4xx/5xx are errors
+    if resp.is_error:
+        resp.raise_for_status()
+    return resp
+
+
+def request(client: httpx.Client, method: str, url: str, **kwargs) -> httpx.Response:
+    """Send a request with *client* under the host's rate limit, raising for error status, with backoff."""
+    limiter = get_limiter(httpx.URL(url).host)
+
+    def _send():
+        limiter.wait()
+        r = client.request(method, url, **kwargs)
+        limiter.record(r)
+        return _check(r)
+    return with_backoff(_send)
+
+
+async def arequest(client: httpx.AsyncClient, method: str, url: str, **kwargs) -> httpx.Response:
+    """Async request(): awaits the rate limit and backoff without blocking."""
+    limiter = get_limiter(httpx.URL(url).host)
+
+    async def _send():
+        await limiter.acquire()
+        r = await client.request(method, url, **kwargs)
+        limiter.record(r)
+        return _check(r)
+    return await with_backoff_async(_send)
@@ -1,20 +1,121 @@
 """Base scraper interface."""
 
 from __future__ import annotations
+
+import asyncio
+import importlib.util
+import weakref
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Iterator
+from typing import Callable, TypeVar
+
+import httpx
 
+from .http_cache import cached_aget
 from models import TenderRecord
 
+T = TypeVar("T")
+
+# HTTP/2 needs the optional h2 package (httpx[http2]); fall back to HTTP/1.1
+HTTP2 = importlib.util.find_spec("h2") is not None
+
+# Detail pages fetched at once per host, shared by everything using a client
+DETAIL_CONCURRENCY = 4
+
+_host_limits: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def make_async_client(**kwargs) -> httpx.AsyncClient:
+    """Create the AsyncClient shared by all scrapers in a run.
+
+    HTTP/2 when h2 is installed, otherwise keep-alive HTTP/1.1 connections
+    reused across requests to the same host.
+    """
+    kwargs.setdefault("timeout", 30)
+    kwargs.setdefault("follow_redirects", True)
+    kwargs.setdefault("limits", httpx.Limits(max_connections=20, max_keepalive_connections=10))
+    return httpx.AsyncClient(http2=HTTP2, **kwargs)
+
+
+def _host_limit(client: httpx.AsyncClient, host: str) -> asyncio.Semaphore:
+    limits = _host_limits.setdefault(client, {})
+    if host not in limits:
+        limits[host] = asyncio.Semaphore(DETAIL_CONCURRENCY)
+    return limits[host]
+
+
+async def fetch_details(
+    client: httpx.AsyncClient, urls: list[str], parse: Callable[[str], T],
+) -> list[T | None]:
+    """GET every URL concurrently and return parse(html) for each, in order.
+
+    Pages go through the persistent HTTP cache. At most DETAIL_CONCURRENCY
+    requests per host are in flight at a time. A page that fails to
+    download or parse gives None.
+    """
+    async def one(url: str) -> T | None:
+        try:
+            async with _host_limit(client, httpx.URL(url).host):
+                resp = await cached_aget(client, url, timeout=15)
+            return parse(resp.text)
+        except Exception:
+            return None
+
+    return await asyncio.gather(*(one(url) for url in urls))
+
 
 class BaseScraper(ABC):
-    """Common interface for all procurement scrapers."""
+    """Common interface for all procurement scrapers.
+
+    Scrapers implement aiter_fetch() on a shared httpx.AsyncClient so that
+    run_scrapers can run all sources concurrently and store records while
+    pages are still arriving. iter_fetch() and fetch() are the blocking
+    equivalents with a private client, for scripts and tests.
+
+    For incremental runs run_scrapers sets *since* (the source's
+    publication-date watermark) and *known_ids* (source_ids already stored)
+    before fetching; left at their defaults the scraper does a full sync.
+    A scraper clears *complete* when an error or page cap may have left
+    notices out, so the watermark is not advanced past them.
+    """
 
     name: str = "base"
+    since: str | None = None
+    known_ids: frozenset[str] = frozenset()
+    complete: bool = True
 
     @abstractmethod
+    def aiter_fetch(self, client: httpx.AsyncClient) -> AsyncIterator[TenderRecord]:
+        """Yield TenderRecord objects as each listing page is parsed."""
+        ...
+
+    async def afetch(self, client: httpx.AsyncClient) -> list[TenderRecord]:
+        """Fetch procurements using *client* and return them as a list."""
+        return [record async for record in self.aiter_fetch(client)]
+
+    def iter_fetch(self) -> Iterator[TenderRecord]:
+        """Yield TenderRecord objects as they are parsed, driving aiter_fetch() on a private loop."""
+        loop = asyncio.new_event_loop()
+        client = make_async_client()
+        records = self.aiter_fetch(client)
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(anext(records))
+                except StopAsyncIteration:
+                    return
+        finally:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.run_until_complete(client.aclose())
+            loop.close()
+
     def fetch(self) -> list[TenderRecord]:
         """Fetch procurements and return a list of TenderRecord objects."""
-        ...
+        return list(self.iter_fetch())
+
+    def _all_known(self, records: list[TenderRecord]) -> bool:
+        """True when an incremental run has stored every record on a listing page."""
+        return bool(self.known_ids) and all(r.source_id in self.known_ids for r in records)
 
     def __repr__(self):
         return f"<{self.__class__.__name__}>"
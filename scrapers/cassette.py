@@ -0,0 +1,144 @@
+"""Record and replay scraper HTTP sessions for offline runs.
+
+RecordingTransport wraps a real transport and keeps every request and
+response of a scrape run, including pagination postbacks and detail
+pages; save() writes them to a cassette file (JSON, gzipped when the name
+ends in .gz). ReplayTransport answers from a cassette without touching the
+network, sleeping either a fixed latency or the time each response took
+when it was recorded, so whole scrape runs can be timed offline.
+
+Requests are matched on method, URL and body. A request whose body has
+drifted since recording (the TED query embeds today's date window) falls
+back to the next unused interaction for the same method and URL.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import gzip
+import hashlib
+import json
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+
+import httpx
+
+CASSETTE_DIR = Path(__file__).parent.parent / "tests" / "fixtures" / "cassettes"
+
+# The body is stored decoded; framing headers would no longer describe it
+_DROPPED_HEADERS = ("content-encoding", "content-length", "transfer-encoding", "connection")
+
+
+class CassetteMiss(LookupError):
+    """A replayed request that the cassette has no response for."""
+
+
+def _body_key(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()[:16]
+
+
+def _encode(content: bytes) -> dict:
+    try:
+        return {"text": content.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(content).decode("ascii")}
+
+
+def _decode(body: dict) -> bytes:
+    if "base64" in body:
+        return base64.b64decode(body["base64"])
+    return body["text"].encode("utf-8")
+
+
+def load_cassette(path: str | Path) -> list[dict]:
+    """Return the recorded interactions in *path*, in request order."""
+    path = Path(path)
+    raw = gzip.decompress(path.read_bytes()) if path.suffix == ".gz" else path.read_bytes()
+    return json.loads(raw)["interactions"]
+
+
+def save_cassette(path: str | Path, interactions: list[dict]) -> None:
+    """Write *interactions* to *path*, creating the directory if needed."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    raw = json.dumps({"interactions": interactions}, ensure_ascii=False, indent=1).encode("utf-8")
+    path.write_bytes(gzip.compress(raw) if path.suffix == ".gz" else raw)
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Pass requests to *transport* and keep every exchange for save()."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport | None = None):
+        self.transport = transport or httpx.AsyncHTTPTransport(retries=0)
+        self.interactions: list[dict] = []
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        content = await request.aread()
+        t0 = time.perf_counter()
+        response = await self.transport.handle_async_request(request)
+        body = await response.aread()
+        elapsed = time.perf_counter() - t0
+        await response.aclose()
+        headers = [(k, v) for k, v in response.headers.multi_items() if k.lower() not in _DROPPED_HEADERS]
+        self.interactions.append({
+            "method": request.method,
+            "url": str(request.url),
+            "body": _body_key(content),
+            "status": response.status_code,
+            "headers": headers,
+            "content": _encode(body),
+            "elapsed": round(elapsed, 4),
+        })
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+    def save(self, path: str | Path) -> None:
+        save_cassette(path, self.interactions)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Answer requests from a cassette, never from the network.
+
+    *latency* is the simulated seconds per request; None replays the
+    time each response took when recorded. Each interaction is served
+    once, so repeated identical requests get their responses in order.
+    """
+
+    def __init__(self, cassette: str | Path | list[dict], latency: float | None = 0.0):
+        interactions = load_cassette(cassette) if isinstance(cassette, (str, Path)) else cassette
+        self.latency = latency
+        self.requests = 0
+        self._exact: dict[tuple, deque] = defaultdict(deque)
+        self._by_url: dict[tuple, deque] = defaultdict(deque)
+        for i in interactions:
+            entry = dict(i)
+            self._exact[(i["method"], i["url"], i["body"])].append(entry)
+            self._by_url[(i["method"], i["url"])].append(entry)
+
+    def _take(self, method: str, url: str, body: str) -> dict:
+        exact = self._exact.get((method, url, body))
+        while exact:
+            entry = exact.popleft()
+            if not entry.get("used"):
+                entry["used"] = True
+                return entry
+        by_url = self._by_url.get((method, url))
+        while by_url:
+            entry = by_url.popleft()
+            if not entry.get("used"):
+                entry["used"] = True
+                return entry
+        raise CassetteMiss(f"{method} {url} finns inte i kassetten")
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        entry = self._take(request.method, str(request.url), _body_key(await request.aread()))
+        self.requests += 1
+        delay = entry.get("elapsed", 0.0) if self.latency is None else self.latency
+        if delay:
+            await asyncio.sleep(delay)
+        return httpx.Response(entry["status"], headers=entry["headers"],
+                              content=_decode(entry["content"]), request=request)
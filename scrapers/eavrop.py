@@ -1,4 +1,4 @@
-"""e-Avrop scraper using httpx + BeautifulSoup.
+"""e-Avrop scraper using httpx + BeautifulSoup (see scrapers.parsing).
 
 Scrapes the public procurement listing at e-avrop.com/e-upphandling/Default.aspx.
 ASP.NET WebForms with ViewState-based pagination.
@@ -9,11 +9,14 @@ from __future__ import annotations
 
 import logging
 import re
+from collections.abc import AsyncIterator
+
 import httpx
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 
-from .base import BaseScraper
-from .backoff import with_backoff
+from .base import BaseScraper, fetch_details
+from .backoff import arequest
+from .parsing import make_soup
 from models import TenderRecord
 
 logger = logging.getLogger(__name__)
@@ -22,48 +25,53 @@ LIST_URL = "https://www.e-avrop.com/e-upphandling/Default.aspx"
 BASE_URL = "https://www.e-avrop.com"
 MAX_PAGES = 6
 
+# Parse only the results grid / the form inputs of a listing page
+_GRID_ONLY = SoupStrainer("table", id=lambda x: x and "tenderGridView" in x)
+_INPUTS_ONLY = SoupStrainer("input")
+
 
 class EAvropScraper(BaseScraper):
     name = "eavrop"
 
-    def fetch(self) -> list[TenderRecord]:
-        all_results: list[TenderRecord] = []
+    async def aiter_fetch(self, client: httpx.AsyncClient) -> AsyncIterator[TenderRecord]:
+        count = 0
         try:
-            with httpx.Client(timeout=30, follow_redirects=True) as client:
-                def _get_initial():
-                    r = client.get(LIST_URL)
-                    r.raise_for_status()
-                    return r
-                resp = with_backoff(_get_initial)
-
-                page_results = self._parse_listing(resp.text, client)
-                all_results.extend(page_results)
+            resp = await arequest(client, "GET", LIST_URL)
+            page_results = self._parse_listing(resp.text)
+
+            page_num = 1
+            while page_results:
+                # Listing is newest first; a page of stored notices means we are caught up
+                if self._all_known(page_results):
+                    break
+                await self._add_details(client, page_results)
+                for record in page_results:
+                    yield record
+                count += len(page_results)
 
                 # Paginate using ASP.NET PostBack
-                for page_num in range(2, MAX_PAGES + 1):
-                    form_data = self._build_postback(resp.text, page_num)
-                    if not form_data:
-                        break
-                    def _post_page(data=form_data):
-                        r = client.post(LIST_URL, data=data)
-                        r.raise_for_status()
-                        return r
-                    resp = with_backoff(_post_page)
-                    page_results = self._parse_listing(resp.text, client)
-                    if not page_results:
-                        break
-                    all_results.extend(page_results)
+                page_num += 1
+                if page_num > MAX_PAGES:
+                    # The grid does not say whether more pages exist; assume so,
+                    # so the watermark does not move past unfetched notices
+                    self.complete = False
+                    break
+                form_data = self._build_postback(resp.text, page_num)
+                if not form_data:
+                    break
+                resp = await arequest(client, "POST", LIST_URL, data=form_data)
+                page_results = self._parse_listing(resp.text)
 
         except Exception as e:
+            self.complete = False
             print(f"[e-Avrop] Fetch error: {e}")
 
         # No client-side filtering — return all results, scorer handles relevance
-        print(f"[e-Avrop] Fetched {len(all_results)} notices")
-        return all_results
+        print(f"[e-Avrop] Fetched {count} notices")
 
-    def _parse_listing(self, html: str, client: httpx.Client | None = None) -> list[TenderRecord]:
+    def _parse_listing(self, html: str) -> list[TenderRecord]:
         """Parse all rows from the ASP.NET GridView table."""
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html, _GRID_ONLY)
         table = (
             soup.find("table", id="ctl00_mainContent_tenderGridView")
             or soup.find("table", {"id": lambda x: x and "tenderGridView" in x})
@@ -78,7 +86,7 @@ class EAvropScraper(BaseScraper):
             if row.find("th"):
                 continue
             try:
-                proc = self._parse_listing_row(row, client)
+                proc = self._parse_listing_row(row)
                 if proc:
                     notices.append(proc)
             except Exception as e:
@@ -86,7 +94,7 @@ class EAvropScraper(BaseScraper):
                 continue
         return notices
 
-    def _parse_listing_row(self, row, client: httpx.Client | None = None) -> TenderRecord | None:
+    def _parse_listing_row(self, row) -> TenderRecord | None:
         """Extract procurement data from a single table row."""
         cells = row.select("td")
         if len(cells) < 5:
@@ -111,12 +119,6 @@ class EAvropScraper(BaseScraper):
         cpv_codes = cells[3].get_text(strip=True) or None
         deadline = self._extract_date(cells[4].get_text(strip=True))
 
-        # Fetch description and geography from detail page
-        description = None
-        geography = None
-        if client and url:
-            description, geography = self._fetch_detail(client, url)
-
         # Flag as needs_review if title is suspiciously short
         status = "published"
         if len(title) < 5:
@@ -129,7 +131,7 @@ class EAvropScraper(BaseScraper):
                 source_id=f"EA-{source_id}",
                 title=title,
                 buyer=buyer,
-                geography=geography,
+                geography=None,  # From the detail page, see _add_details()
                 cpv_codes=cpv_codes,
                 procedure_type=None,
                 published_date=published_date,
@@ -138,57 +140,53 @@ class EAvropScraper(BaseScraper):
                 currency="SEK",
                 status=status,
                 url=url,
-                description=description,
+                description=None,
             )
         except Exception as e:
             logger.warning("[e-Avrop] Failed to create TenderRecord for EA-%s: %s", source_id, e)
             return None
 
+    async def _add_details(self, client: httpx.AsyncClient, records: list[TenderRecord]):
+        """Fill in description and geography of each record from its detail page."""
+        with_url = [r for r in records if r.url]
+        details = await fetch_details(client, [r.url for r in with_url], self._parse_detail)
+        for record, detail in zip(with_url, details):
+            record.description, record.geography = detail or (None, None)
+
     @staticmethod
-    def _fetch_detail(client: httpx.Client, detail_url: str) -> tuple[str | None, str | None]:
-        """Fetch description and geography from the detail page.
+    def _parse_detail(html: str) -> tuple[str | None, str | None]:
+        """Extract (description, geography) from a detail page."""
+        soup = make_soup(html)
 
-        Returns (description, geography).
-        """
-        try:
-            def _get():
-                r = client.get(detail_url, timeout=15)
-                r.raise_for_status()
-                return r
-            resp = with_backoff(_get)
-            soup = BeautifulSoup(resp.text, "html.parser")
-
-            # Extract description
-            description = None
-            for label_text in ["Beskrivning", "Beskrivning av upphandlingen", "Varugrupp"]:
-                label = soup.find(string=re.compile(label_text, re.IGNORECASE))
-                if label:
-                    parent = label.find_parent(["dt", "th", "label", "strong", "b", "div", "td"])
-                    if parent:
-                        sibling = parent.find_next_sibling(["dd", "td", "span", "div", "p"])
-                        if sibling:
-                            text = sibling.get_text(strip=True)
-                            if text and len(text) > 10:
-                                description = text[:2000]
-                                break
-
-            # Extract geography
-            geography = None
-            for label_text in ["Leveransort", "Ort", "Kommun", "Region", "NUTS"]:
-                label = soup.find(string=re.compile(label_text, re.IGNORECASE))
-                if label:
-                    parent = label.find_parent(["dt", "th", "label", "strong", "b", "div", "td"])
-                    if parent:
-                        sibling = parent.find_next_sibling(["dd", "td", "span", "div"])
-                        if sibling:
-                            text = sibling.get_text(strip=True)
-                            if text and len(text) > 1:
-                                geography = text
-                                break
-
-            return description, geography
-        except Exception:
-            return None, None
+        # Extract description
+        description = None
+        for label_text in ["Beskrivning", "Beskrivning av upphandlingen", "Varugrupp"]:
+            label = soup.find(string=re.compile(label_text, re.IGNORECASE))
+            if label:
+                parent = label.find_parent(["dt", "th", "label", "strong", "b", "div", "td"])
+                if parent:
+                    sibling = parent.find_next_sibling(["dd", "td", "span", "div", "p"])
+                    if sibling:
+                        text = sibling.get_text(strip=True)
+                        if text and len(text) > 10:
+                            description = text
+                            break
+
+        # Extract geography
+        geography = None
+        for label_text in ["Leveransort", "Ort", "Kommun", "Region", "NUTS"]:
+            label = soup.find(string=re.compile(label_text, re.IGNORECASE))
+            if label:
+                parent = label.find_parent(["dt", "th", "label", "strong", "b", "div", "td"])
+                if parent:
+                    sibling = parent.find_next_sibling(["dd", "td", "span", "div"])
+                    if sibling:
+                        text = sibling.get_text(strip=True)
+                        if text and len(text) > 1:
+                            geography = text
+                            break
+
+        return description, geography
 
     @staticmethod
     def _extract_date(text: str | None) -> str | None:
@@ -201,7 +199,7 @@ class EAvropScraper(BaseScraper):
     @staticmethod
     def _build_postback(html: str, page_num: int) -> dict | None:
         """Build ASP.NET PostBack form data for pagination."""
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html, _INPUTS_ONLY)
 
         viewstate = soup.find("input", {"name": "__VIEWSTATE"})
         if not viewstate:
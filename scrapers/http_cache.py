@@ -0,0 +1,234 @@
+"""Persistent HTTP cache for detail pages and notice documents.
+
+Responses are stored in a small SQLite file keyed by URL, with the body
+zlib-compressed. A cached page is served without a request until its
+host's TTL runs out; after that it is revalidated with If-None-Match /
+If-Modified-Since, and a 304 refreshes the entry without downloading the
+body again. The file is bounded by MAX_BYTES and evicts least recently
+used pages first.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import NamedTuple
+
+import httpx
+
+from .backoff import arequest, request
+
+CACHE_PATH = Path(__file__).parent.parent / "http_cache.db"
+MAX_BYTES = 200 * 1024 * 1024
+
+HOUR = 3600
+DEFAULT_TTL = 6 * HOUR
+# Seconds a cached page is used without revalidation, per source host.
+# Published TED notices are immutable; Kommers/e-Avrop pages get corrections.
+HOST_TTLS = {
+    "ted.europa.eu": 30 * 24 * HOUR,
+    "www.kommersannons.se": 12 * HOUR,
+    "www.e-avrop.com": 12 * HOUR,
+}
+
+_KEPT_HEADERS = ("content-type", "etag", "last-modified")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS http_cache (
+    url TEXT PRIMARY KEY,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_http_cache_last_used ON http_cache(last_used);
+"""
+
+
+class CachedPage(NamedTuple):
+    headers: dict[str, str]
+    body: bytes
+    expires_at: float
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    def validators(self) -> dict[str, str]:
+        """Conditional request headers for revalidating this page."""
+        out = {}
+        if "etag" in self.headers:
+            out["If-None-Match"] = self.headers["etag"]
+        if "last-modified" in self.headers:
+            out["If-Modified-Since"] = self.headers["last-modified"]
+        return out
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    revalidated: int = 0
+    misses: int = 0
+
+    @property
+    def requests(self) -> int:
+        return self.hits + self.revalidated + self.misses
+
+    @property
+    def hit_ratio(self) -> float:
+        """Share of lookups answered without downloading the body."""
+        return (self.hits + self.revalidated) / self.requests if self.requests else 0.0
+
+    def __str__(self):
+        return (f"{self.hits} träffar, {self.revalidated} revaliderade, {self.misses} missar "
+                f"({self.hit_ratio:.0%} träffkvot)")
+
+
+def ttl_for(url: str) -> float:
+    return HOST_TTLS.get(httpx.URL(url).host, DEFAULT_TTL)
+
+
+class HttpCache:
+    """URL-keyed response cache in an SQLite file, safe to share between threads."""
+
+    def __init__(self, path: Path, max_bytes: int = MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM http_cache").fetchone()[0]
+
+    def lookup(self, url: str) -> CachedPage | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT headers, body, expires_at FROM http_cache WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE http_cache SET last_used = ? WHERE url = ?", (time.time(), url))
+        return CachedPage(json.loads(row[0]), zlib.decompress(row[1]), row[2])
+
+    def store(self, url: str, resp: httpx.Response):
+        """Cache a 200 response unless it says no-store."""
+        if resp.status_code != 200 or "no-store" in resp.headers.get("cache-control", ""):
+            return
+        headers = {k: resp.headers[k] for k in _KEPT_HEADERS if k in resp.headers}
+        body = zlib.compress(resp.content)
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM http_cache WHERE url = ?", (url,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO http_cache (url, headers, body, size, expires_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, json.dumps(headers), body, len(body), now + ttl_for(url), now),
+            )
+            self._size += len(body) - (old[0] if old else 0)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def refresh(self, url: str, page: CachedPage, resp: httpx.Response) -> CachedPage:
+        """Extend a page after a 304, taking any new validators from *resp*."""
+        headers = dict(page.headers)
+        headers.update({k: resp.headers[k] for k in ("etag", "last-modified") if k in resp.headers})
+        expires_at = time.time() + ttl_for(url)
+        with self._lock:
+            self._conn.execute(
+                "UPDATE http_cache SET headers = ?, expires_at = ? WHERE url = ?",
+                (json.dumps(headers), expires_at, url),
+            )
+        return CachedPage(headers, page.body, expires_at)
+
+    def _evict(self):
+        """Drop least recently used pages until the file is back under 90% of max_bytes."""
+        target = self.max_bytes * 0.9
+        freed = 0
+        victims = []
+        for url, size in self._conn.execute("SELECT url, size FROM http_cache ORDER BY last_used"):
+            if self._size - freed <= target:
+                break
+            victims.append((url,))
+            freed += size
+        self._conn.executemany("DELETE FROM http_cache WHERE url = ?", victims)
+        self._size -= freed
+
+    def reset_stats(self) -> CacheStats:
+        """Start counting a new run; returns the previous run's stats."""
+        old, self.stats = self.stats, CacheStats()
+        return old
+
+    def size(self) -> int:
+        """Total compressed bytes of cached bodies."""
+        return self._size
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM http_cache")
+            self._size = 0
+
+    def close(self):
+        self._conn.close()
+
+
+_caches: dict[Path, HttpCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache() -> HttpCache:
+    """Return the process-wide cache for CACHE_PATH."""
+    with _caches_lock:
+        if CACHE_PATH not in _caches:
+            _caches[CACHE_PATH] = HttpCache(CACHE_PATH)
+        return _caches[CACHE_PATH]
+
+
+def _response(url: str, page: CachedPage) -> httpx.Response:
+    return httpx.Response(200, headers=page.headers, content=page.body, request=httpx.Request("GET", url))
+
+
+def _lookup(url: str) -> tuple[HttpCache, CachedPage | None, httpx.Response | None]:
+    """Return (cache, cached page, response if the page is still fresh)."""
+    cache = get_cache()
+    page = cache.lookup(url)
+    if page is not None and page.fresh:
+        cache.stats.hits += 1
+        return cache, page, _response(url, page)
+    return cache, page, None
+
+
+def _after(cache: HttpCache, url: str, page: CachedPage | None, resp: httpx.Response) -> httpx.Response:
+    if resp.status_code == 304 and page is not None:
+        cache.stats.revalidated += 1
+        return _response(url, cache.refresh(url, page, resp))
+    cache.stats.misses += 1
+    cache.store(url, resp)
+    return resp
+
+
+async def cached_aget(client: httpx.AsyncClient, url: str, **kwargs) -> httpx.Response:
+    """GET *url* through the cache with *client* (rate-limited, with backoff, raising for error status)."""
+    cache, page, hit = _lookup(url)
+    if hit is not None:
+        return hit
+    headers = page.validators() if page is not None else {}
+    return _after(cache, url, page, await arequest(client, "GET", url, headers=headers, **kwargs))
+
+
+def cached_get(url: str, client: httpx.Client | None = None, **kwargs) -> httpx.Response:
+    """Blocking cached_aget(), on *client* or a one-off client."""
+    cache, page, hit = _lookup(url)
+    if hit is not None:
+        return hit
+    headers = page.validators() if page is not None else {}
+    if client is not None:
+        return _after(cache, url, page, request(client, "GET", url, headers=headers, **kwargs))
+    with httpx.Client(follow_redirects=True) as own:
+        return _after(cache, url, page, request(own, "GET", url, headers=headers, **kwargs))
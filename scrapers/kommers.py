@@ -1,4 +1,4 @@
-"""KommersAnnons scraper using httpx + BeautifulSoup.
+"""KommersAnnons scraper using httpx + BeautifulSoup (see scrapers.parsing).
 
 Scrapes the public tender notice list at kommersannons.se/Notices/TenderNotices.
 Server-side search filter handles relevance — no client-side double-filtering.
@@ -8,11 +8,14 @@ from __future__ import annotations
 
 import logging
 import re
+from collections.abc import AsyncIterator
+
 import httpx
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 
-from .base import BaseScraper
-from .backoff import with_backoff
+from .base import BaseScraper, fetch_details
+from .backoff import arequest
+from .parsing import make_soup
 from models import TenderRecord
 
 logger = logging.getLogger(__name__)
@@ -27,62 +30,63 @@ SEARCH_FILTERS = {
     "SelectedContractType": "",
 }
 
+# Parse only the notice rows / the pagination form of a listing page
+# (strainers see the whole class attribute, not single classes)
+_ROWS_ONLY = SoupStrainer("div", class_=lambda c: c is not None and "mt-4" in c.split())
+_FORMS_ONLY = SoupStrainer("form")
+
 
 class KommersScraper(BaseScraper):
     name = "kommers"
 
-    def fetch(self) -> list[TenderRecord]:
-        results: list[TenderRecord] = []
+    async def aiter_fetch(self, client: httpx.AsyncClient) -> AsyncIterator[TenderRecord]:
+        count = 0
         try:
-            with httpx.Client(timeout=30, follow_redirects=True) as client:
-                def _get_filtered():
-                    r = client.get(LIST_URL, params={"SearchString": SEARCH_FILTERS["SearchString"]})
-                    r.raise_for_status()
-                    return r
-                resp = with_backoff(_get_filtered)
-                filtered = self._parse_listing(resp.text, client)
-
-                if filtered:
-                    results.extend(filtered)
-                else:
-                    print("[Kommers] Sokfiltret gav inga resultat, faller tillbaka till ofiltrerad scraping")
-                    def _get_unfiltered():
-                        r = client.get(LIST_URL)
-                        r.raise_for_status()
-                        return r
-                    resp = with_backoff(_get_unfiltered)
-                    results.extend(self._parse_listing(resp.text, client))
+            resp = await arequest(client, "GET", LIST_URL, params={"SearchString": SEARCH_FILTERS["SearchString"]})
+            page_results = self._parse_listing(resp.text)
+
+            if not page_results:
+                print("[Kommers] Sokfiltret gav inga resultat, faller tillbaka till ofiltrerad scraping")
+                resp = await arequest(client, "GET", LIST_URL)
+                page_results = self._parse_listing(resp.text)
+
+            pages = 1
+            while page_results:
+                # Listing is newest first; a page of stored notices means we are caught up
+                if self._all_known(page_results):
+                    break
+                await self._add_buyers(client, page_results)
+                for record in page_results:
+                    yield record
+                count += len(page_results)
 
                 # Paginate via POST with hidden form fields
-                for _ in range(MAX_PAGES - 1):
-                    next_form = self._extract_next_form(resp.text)
-                    if not next_form:
-                        break
-                    def _post_next(data=next_form):
-                        r = client.post(LIST_URL, data=data)
-                        r.raise_for_status()
-                        return r
-                    resp = with_backoff(_post_next)
-                    page_results = self._parse_listing(resp.text, client)
-                    if not page_results:
-                        break
-                    results.extend(page_results)
+                next_form = self._extract_next_form(resp.text)
+                if not next_form:
+                    break
+                if pages >= MAX_PAGES:
+                    # More pages left: the watermark must not move past them
+                    self.complete = False
+                    break
+                resp = await arequest(client, "POST", LIST_URL, data=next_form)
+                page_results = self._parse_listing(resp.text)
+                pages += 1
 
         except Exception as e:
+            self.complete = False
             print(f"[Kommers] Fetch error: {e}")
 
         # No client-side filtering — server search handles relevance
-        print(f"[Kommers] Fetched {len(results)} notices")
-        return results
+        print(f"[Kommers] Fetched {count} notices")
 
-    def _parse_listing(self, html: str, client: httpx.Client | None = None) -> list[TenderRecord]:
+    def _parse_listing(self, html: str) -> list[TenderRecord]:
         """Parse all notice rows from a listing page."""
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html, _ROWS_ONLY)
         notices: list[TenderRecord] = []
 
         for row in soup.select("div.row.mt-4.mb-4"):
             try:
-                proc = self._parse_notice_row(row, client)
+                proc = self._parse_notice_row(row)
                 if proc:
                     notices.append(proc)
             except Exception as e:
@@ -90,7 +94,7 @@ class KommersScraper(BaseScraper):
                 continue
         return notices
 
-    def _parse_notice_row(self, row, client: httpx.Client | None = None) -> TenderRecord | None:
+    def _parse_notice_row(self, row) -> TenderRecord | None:
         """Extract procurement data from a single notice row."""
         link = row.select_one("h4 > a[href]")
         if not link:
@@ -144,11 +148,6 @@ class KommersScraper(BaseScraper):
             except (ValueError, TypeError):
                 pass
 
-        # Extract buyer from detail page if available
-        buyer = None
-        if client and href:
-            buyer = self._fetch_buyer(client, url)
-
         # Flag as needs_review if title looks incomplete
         status = "published"
         if not title or len(title) < 5:
@@ -160,7 +159,7 @@ class KommersScraper(BaseScraper):
                 source="kommers",
                 source_id=f"KOM-{source_id}",
                 title=title,
-                buyer=buyer,
+                buyer=None,  # From the detail page, see _add_buyers()
                 geography=geography,
                 cpv_codes=cpv_codes,
                 procedure_type=None,
@@ -176,38 +175,37 @@ class KommersScraper(BaseScraper):
             logger.warning("[Kommers] Failed to create TenderRecord for KOM-%s: %s", source_id, e)
             return None
 
+    async def _add_buyers(self, client: httpx.AsyncClient, records: list[TenderRecord]):
+        """Fill in the buyer of each record from its detail page."""
+        with_url = [r for r in records if r.url]
+        buyers = await fetch_details(client, [r.url for r in with_url], self._parse_buyer)
+        for record, buyer in zip(with_url, buyers):
+            record.buyer = buyer
+
     @staticmethod
-    def _fetch_buyer(client: httpx.Client, detail_url: str) -> str | None:
-        """Fetch buyer name from the detail page."""
-        try:
-            def _get():
-                r = client.get(detail_url, timeout=15)
-                r.raise_for_status()
-                return r
-            resp = with_backoff(_get)
-            soup = BeautifulSoup(resp.text, "html.parser")
-
-            # Look for buyer/organization in detail page
-            # Common patterns: label "Upphandlande myndighet" or "Organisation"
-            for label_text in ["Upphandlande myndighet", "Organisation", "Myndighet"]:
-                label = soup.find(string=re.compile(label_text, re.IGNORECASE))
-                if label:
-                    parent = label.find_parent(["dt", "th", "label", "strong", "b", "div"])
-                    if parent:
-                        # Try next sibling dd/td/span
-                        sibling = parent.find_next_sibling(["dd", "td", "span", "div"])
-                        if sibling:
-                            buyer = sibling.get_text(strip=True)
-                            if buyer and len(buyer) > 2:
-                                return buyer
-            return None
-        except Exception:
-            return None
+    def _parse_buyer(html: str) -> str | None:
+        """Extract the buyer name from a detail page."""
+        soup = make_soup(html)
+
+        # Look for buyer/organization in detail page
+        # Common patterns: label "Upphandlande myndighet" or "Organisation"
+        for label_text in ["Upphandlande myndighet", "Organisation", "Myndighet"]:
+            label = soup.find(string=re.compile(label_text, re.IGNORECASE))
+            if label:
+                parent = label.find_parent(["dt", "th", "label", "strong", "b", "div"])
+                if parent:
+                    # Try next sibling dd/td/span
+                    sibling = parent.find_next_sibling(["dd", "td", "span", "div"])
+                    if sibling:
+                        buyer = sibling.get_text(strip=True)
+                        if buyer and len(buyer) > 2:
+                            return buyer
+        return None
 
     @staticmethod
     def _extract_next_form(html: str) -> dict | None:
         """Extract hidden form data for the 'Nasta' (next) pagination button."""
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html, _FORMS_ONLY)
 
         next_btn = soup.find("button", string=re.compile(r"Nästa"))
         if not next_btn:
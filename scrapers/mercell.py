@@ -7,6 +7,10 @@ so this source is skipped until a public API becomes available.
 
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
+
+import httpx
+
 from .base import BaseScraper
 from models import TenderRecord
 
@@ -14,9 +18,10 @@ from models import TenderRecord
 class MercellScraper(BaseScraper):
     name = "mercell"
 
-    def fetch(self) -> list[TenderRecord]:
+    async def aiter_fetch(self, client: httpx.AsyncClient) -> AsyncIterator[TenderRecord]:
         print(
             "[Mercell] Kräver inloggning — ej tillgänglig. "
             "Använd TED för EU-upphandlingar."
         )
-        return []
+        return
+        yield  # An (empty) async generator, like the other scrapers
@@ -0,0 +1,23 @@
+"""HTML parsing backend shared by the HTML scrapers.
+
+BeautifulSoup on lxml when it is installed, otherwise the pure-Python
+html.parser. Listing parsers pass a SoupStrainer so only the containers
+they read (the notice rows, the pagination form) become a tree; the rest
+of the page, including ASP.NET ViewState blobs, is skipped by the parser.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# Fastest first; both give the same records on our pages
+PARSERS = [p for p in ("lxml", "html.parser") if p == "html.parser" or importlib.util.find_spec(p)]
+PARSER = PARSERS[0]
+
+
+def make_soup(html: str, parse_only: SoupStrainer | None = None) -> BeautifulSoup:
+    """Parse *html* with PARSER, keeping only what *parse_only* matches."""
+    return BeautifulSoup(html, PARSER, parse_only=parse_only)
+
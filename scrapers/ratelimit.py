@@ -0,0 +1,133 @@
+"""Per-host token-bucket rate limiting with adaptive (AIMD) rates.
+
+Every request to a host first takes a token from that host's bucket; the
+bucket refills at the host's current rate up to its burst size. Limiters
+are process-wide, so all clients and scrapers polling a host share one
+budget.
+
+Adaptive limiters increase the rate a little after each healthy response
+(additive increase, up to max_rate) and halve it on 429/503
+(multiplicative decrease, down to min_rate). A Retry-After header on a
+throttled response additionally holds the whole host until it has passed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import NamedTuple
+
+import httpx
+
+THROTTLE_STATUS_CODES = {429, 503}
+# Share of the configured rate added per healthy response
+INCREASE_STEP = 0.05
+DECREASE_FACTOR = 0.5
+# Longest Retry-After we honour; beyond this a source is better retried next run
+MAX_RETRY_AFTER = 120.0
+
+
+class RateLimit(NamedTuple):
+    rate: float  # requests per second to start at
+    burst: int
+    max_rate: float | None = None  # None: fixed rate, no adaptive increase
+    min_rate: float = 0.1
+
+
+HOST_LIMITS: dict[str, RateLimit] = {
+    "api.ted.europa.eu": RateLimit(rate=2.0, burst=2, max_rate=6.0),
+    "ted.europa.eu": RateLimit(rate=2.0, burst=4, max_rate=6.0),
+    "www.kommersannons.se": RateLimit(rate=4.0, burst=4, max_rate=8.0),
+    "www.e-avrop.com": RateLimit(rate=4.0, burst=4, max_rate=8.0),
+}
+DEFAULT_LIMIT = RateLimit(rate=5.0, burst=5)
+
+
+def retry_after(resp: httpx.Response) -> float | None:
+    """Seconds requested by a Retry-After header (delta or HTTP date), capped at MAX_RETRY_AFTER."""
+    value = resp.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        seconds = (when - datetime.now(timezone.utc)).total_seconds()
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+class HostLimiter:
+    """Token bucket for one host, safe to share between threads and event loops."""
+
+    def __init__(self, limit: RateLimit):
+        self.limit = limit
+        self.rate = limit.rate
+        self._tokens = float(limit.burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.limit.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Take a token and return the seconds to wait before sending.
+
+        Tokens may go negative: concurrent callers queue up behind each
+        other instead of all waking at once.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._blocked_until - now)
+
+    def wait(self):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def record(self, resp: httpx.Response):
+        """Adapt the rate to a response from this host."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if resp.status_code in THROTTLE_STATUS_CODES:
+                self.rate = max(self.limit.min_rate, self.rate * DECREASE_FACTOR)
+                self._tokens = min(self._tokens, 0.0)
+                delay = retry_after(resp)
+                if delay:
+                    self._blocked_until = max(self._blocked_until, now + delay)
+            elif resp.status_code < 400 and self.limit.max_rate:
+                self.rate = min(self.limit.max_rate, self.rate + self.limit.rate * INCREASE_STEP)
+
+
+_limiters: dict[str, HostLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(host: str) -> HostLimiter:
+    """Return the shared limiter for *host*, configured from HOST_LIMITS."""
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = HostLimiter(HOST_LIMITS.get(host, DEFAULT_LIMIT))
+        return _limiters[host]
+
+
+def reset_limiters():
+    """Forget all limiter state, e.g. after changing HOST_LIMITS."""
+    with _limiters_lock:
+        _limiters.clear()
@@ -1,26 +1,27 @@
 """TED (Tenders Electronic Daily) API-scraper.
 
 Använder det fria v3 sök-API:et — ingen autentisering krävs för publicerade notices.
-Kör flera sökningar för att fånga svenska upphandlingar relevanta för kollektivtrafik-IT.
+Sökuttrycken slås ihop till en fråga som bläddras igenom med iteration-tokens.
 """
 
 from __future__ import annotations
 
 import logging
-import time
+from collections.abc import AsyncIterator
 from datetime import datetime, timedelta
 
 import httpx
 from .base import BaseScraper
-from .backoff import with_backoff
+from .backoff import arequest
 from models import TenderRecord
 
 logger = logging.getLogger(__name__)
 
 SEARCH_URL = "https://api.ted.europa.eu/v3/notices/search"
 
+# Only what _normalize() reads; "links" is always returned
 FIELDS = [
-    "notice-identifier",
+    "publication-number",
     "notice-title",
     "description-proc",
     "description-lot",
@@ -32,74 +33,90 @@ FIELDS = [
     "estimated-value-cur-proc",
 ]
 
-# Dynamic date cutoff — 6 months ago
-def _date_cutoff() -> str:
-    return (datetime.now() - timedelta(days=180)).strftime("%Y%m%d")
+FULL_SYNC_DAYS = 180
+# Days re-queried before the watermark, for notices published late in the day
+# or indexed after our last run
+WATERMARK_OVERLAP_DAYS = 2
 
 
-# Sökfrågor — HAST Utveckling: ledarskap, utbildning, organisationsutveckling
+# Dynamic date cutoff — 6 months ago, or just before the watermark
+def _date_cutoff(since: str | None = None) -> str:
+    if since:
+        try:
+            start = datetime.strptime(since[:10], "%Y-%m-%d")
+        except ValueError:
+            logger.warning("[TED] Ogiltigt vattenmärke %r, hämtar hela fönstret", since)
+        else:
+            return (start - timedelta(days=WATERMARK_OVERLAP_DAYS)).strftime("%Y%m%d")
+    return (datetime.now() - timedelta(days=FULL_SYNC_DAYS)).strftime("%Y%m%d")
+
+
+# Sökuttryck — HAST Utveckling: ledarskap, utbildning, organisationsutveckling
 # TED v3 API: FT= för fulltext, classification-cpv= för CPV-koder
-def _build_queries() -> list[str]:
-    cutoff = _date_cutoff()
-    return [
-        # Kärnkoder — chefsutbildning, personalutveckling, coaching
-        f"CY=SWE AND (classification-cpv=80532000 OR classification-cpv=79633000 OR classification-cpv=79632000 OR classification-cpv=79998000) AND publication-date>{cutoff}",
-        # Personalutbildning & personlig utveckling
-        f"CY=SWE AND (classification-cpv=80511000 OR classification-cpv=80570000 OR classification-cpv=80590000) AND publication-date>{cutoff}",
-        # Managementkonsult + utbildnings-nyckelord
-        f"CY=SWE AND (classification-cpv=79414000 OR classification-cpv=79411100 OR classification-cpv=79410000) AND (FT=ledarskap OR FT=utbildning OR FT=coaching OR FT=organisation OR FT=kompetens) AND publication-date>{cutoff}",
-        # Fulltext — ledarskap & chefsutveckling
-        f"CY=SWE AND (FT=ledarskapsutbildning OR FT=ledarskapsutveckling OR FT=chefsutveckling OR FT=chefsutbildning OR FT=ledarskapsprogram) AND publication-date>{cutoff}",
-        # Fulltext — organisationsutveckling, teamutveckling, coaching
-        f"CY=SWE AND (FT=organisationsutveckling OR FT=teamutveckling OR FT=kompetensutveckling OR FT=förändringsledning OR FT=konflikthantering OR FT=stresshantering) AND publication-date>{cutoff}",
-    ]
-
-PAGE_SIZE = 50
-MAX_PAGES = 4
+SEARCH_EXPRESSIONS = [
+    # Kärnkoder — chefsutbildning, personalutveckling, coaching
+    "classification-cpv=80532000 OR classification-cpv=79633000 OR classification-cpv=79632000 OR classification-cpv=79998000",
+    # Personalutbildning & personlig utveckling
+    "classification-cpv=80511000 OR classification-cpv=80570000 OR classification-cpv=80590000",
+    # Managementkonsult + utbildnings-nyckelord
+    "(classification-cpv=79414000 OR classification-cpv=79411100 OR classification-cpv=79410000) AND (FT=ledarskap OR FT=utbildning OR FT=coaching OR FT=organisation OR FT=kompetens)",
+    # Fulltext — ledarskap & chefsutveckling
+    "FT=ledarskapsutbildning OR FT=ledarskapsutveckling OR FT=chefsutveckling OR FT=chefsutbildning OR FT=ledarskapsprogram",
+    # Fulltext — organisationsutveckling, teamutveckling, coaching
+    "FT=organisationsutveckling OR FT=teamutveckling OR FT=kompetensutveckling OR FT=förändringsledning OR FT=konflikthantering OR FT=stresshantering",
+]
 
 
-class TedScraper(BaseScraper):
-    name = "ted"
+def _build_query(since: str | None = None) -> str:
+    """Plan one TED query covering every search expression.
+
+    The expressions overlap heavily, so they are OR-ed under the shared
+    country and date filters: each matching notice is returned exactly
+    once instead of once per expression.
+    """
+    expressions = " OR ".join(f"({e})" for e in SEARCH_EXPRESSIONS)
+    return f"CY=SWE AND publication-date>{_date_cutoff(since)} AND ({expressions})"
 
-    def fetch(self) -> list[TenderRecord]:
-        seen_ids: set[str] = set()
-        results = []
 
-        for query in _build_queries():
-            query_results = self._fetch_query(query, seen_ids)
-            results.extend(query_results)
+# TED's maximum page size; iteration mode has no page-number ceiling
+PAGE_SIZE = 250
+# Safety stop for a runaway token chain (50 000 notices)
+MAX_PAGES = 200
 
-        print(f"[TED] Hämtade {len(results)} upphandlingar totalt")
-        return results
 
-    def _fetch_query(self, query: str, seen_ids: set[str]) -> list[TenderRecord]:
-        results = []
-        page = 1
+class TedScraper(BaseScraper):
+    name = "ted"
+
+    async def aiter_fetch(self, client: httpx.AsyncClient) -> AsyncIterator[TenderRecord]:
+        """Scroll through the planned query with TED's iteration tokens.
+
+        Iteration mode returns the complete result set page by page, so
+        large windows (e.g. a --full resync) are no longer cut off.
+        """
+        seen_ids: set[str] = set()
+        requests = received = 0
+        token = None
 
-        while page <= MAX_PAGES:
+        while requests < MAX_PAGES:
             payload = {
-                "query": query,
+                "query": _build_query(self.since),
                 "fields": FIELDS,
                 "limit": PAGE_SIZE,
-                "page": page,
+                "paginationMode": "ITERATION",
             }
+            if token:
+                payload["iterationNextToken"] = token
             try:
-                def _do_request(p=payload):
-                    r = httpx.post(SEARCH_URL, json=p, timeout=30)
-                    r.raise_for_status()
-                    return r
-                resp = with_backoff(_do_request)
+                resp = await arequest(client, "POST", SEARCH_URL, json=payload)
             except httpx.HTTPError as e:
+                self.complete = False
                 print(f"[TED] HTTP-fel: {e}")
                 break
-
-            time.sleep(0.5)  # Undvik rate limiting
+            requests += 1
 
             data = resp.json()
             notices = data.get("notices", [])
-            if not notices:
-                break
-
+            received += len(notices)
             for notice in notices:
                 pub_nr = notice.get("publication-number", "")
                 if pub_nr in seen_ids:
@@ -107,13 +124,18 @@ class TedScraper(BaseScraper):
                 seen_ids.add(pub_nr)
                 record = self._normalize(notice)
                 if record:
-                    results.append(record)
+                    yield record
 
-            if len(notices) < PAGE_SIZE:
+            token = data.get("iterationNextToken")
+            if not notices or not token:
                 break
-            page += 1
+        else:
+            # Stopped at MAX_PAGES with more results left
+            self.complete = False
 
-        return results
+        logger.info("[TED] %d requests, %d notices received, %d unique", requests, received, len(seen_ids))
+        print(f"[TED] Hämtade {len(seen_ids)} unika upphandlingar med {requests} anrop "
+              f"({received - len(seen_ids)} dubbletter)")
 
     def _normalize(self, notice: dict) -> TenderRecord | None:
         """Mappa TED API-fält till TenderRecord."""
@@ -182,7 +204,7 @@ class TedScraper(BaseScraper):
                 currency=str(est_cur) if est_cur else "SEK",
                 status=status,
                 url=url,
-                description=str(desc)[:2000] if desc else None,
+                description=str(desc) if desc else None,
             )
         except Exception as e:
             logger.warning("[TED] Failed to create TenderRecord for %s: %s", pub_number, e)
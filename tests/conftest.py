@@ -10,7 +10,10 @@ PROJECT_ROOT = Path(__file__).parent.parent
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-import db as _db
+import db as _db  # noqa: E402
+import scorer as _scorer  # noqa: E402
+import scrapers.http_cache as _http_cache  # noqa: E402
+import scrapers.ratelimit as _ratelimit  # noqa: E402
 
 
 @pytest.fixture()
@@ -18,9 +21,42 @@ def tmp_db(tmp_path, monkeypatch):
     """Provide an isolated temporary database for tests.
 
     Patches db.DB_PATH so all db functions use a fresh SQLite file.
-    Returns the Path to the temporary database file.
+    Yields the Path to the temporary database file.
     """
     db_path = tmp_path / "test.db"
     monkeypatch.setattr(_db, "DB_PATH", db_path)
     _db.init_db()
-    return db_path
+    yield db_path
+    _db.close_all_connections()
+
+
+@pytest.fixture()
+def tmp_ruleset(tmp_path, monkeypatch):
+    """Score from a per-test copy of config/scoring_rules.yaml.
+
+    Yields the copy's Path; the shipped ruleset is reloaded afterwards.
+    """
+    path = tmp_path / "scoring_rules.yaml"
+    path.write_bytes(_scorer.RULESET_PATH.read_bytes())
+    monkeypatch.setattr(_scorer, "RULESET_PATH", path)
+    yield path
+    monkeypatch.undo()
+    _scorer.refresh_ruleset()
+
+
+@pytest.fixture(autouse=True)
+def tmp_http_cache(tmp_path, monkeypatch):
+    """Point the HTTP cache at a per-test file so runs never share pages."""
+    monkeypatch.setattr(_http_cache, "CACHE_PATH", tmp_path / "http_cache.db")
+    yield _http_cache.get_cache()
+    _http_cache._caches.pop(tmp_path / "http_cache.db").close()
+
+
+@pytest.fixture(autouse=True)
+def no_rate_limits(monkeypatch):
+    """Let offline tests send as fast as the mock transports answer."""
+    monkeypatch.setattr(_ratelimit, "HOST_LIMITS", {})
+    monkeypatch.setattr(_ratelimit, "DEFAULT_LIMIT", _ratelimit.RateLimit(rate=1e6, burst=10**6))
+    _ratelimit.reset_limiters()
+    yield
+    _ratelimit.reset_limiters()
@@ -0,0 +1,288 @@
+"""Tests for the async scraper interface and concurrent scrape_sources — offline."""
+
+import asyncio
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+import run_scrapers
+import scrapers.base as base
+import scrapers.eavrop as eavrop
+import scrapers.kommers as kommers
+import scrapers.ted as ted
+from db import get_all_procurements, get_scrape_state
+from models import TenderRecord
+from scrapers.base import BaseScraper, fetch_details, make_async_client
+from scrapers.eavrop import EAvropScraper
+from scrapers.kommers import KommersScraper
+from scrapers.ted import TedScraper
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+KOMMERS_DETAIL = "<dl><dt>Upphandlande myndighet</dt><dd>Region Skåne</dd></dl>"
+EAVROP_DETAIL = (
+    "<dl><dt>Beskrivning</dt><dd>Utbildning i ledarskap för chefer</dd>"
+    "<dt>Leveransort</dt><dd>Malmö</dd></dl>"
+)
+
+
+def _fetch_with(scraper: BaseScraper, handler) -> list[TenderRecord]:
+    async def run():
+        async with make_async_client(transport=httpx.MockTransport(handler)) as client:
+            return await scraper.afetch(client)
+    return asyncio.run(run())
+
+
+class TestAsyncScrapers:
+    def test_kommers_listing_and_buyers(self):
+        listing = (FIXTURES_DIR / "kommers_listing.html").read_text()
+
+        def handler(request):
+            if "/Notices/TenderNotice/" in request.url.path:
+                return httpx.Response(200, text=KOMMERS_DETAIL)
+            return httpx.Response(200, text=listing)
+
+        scraper = KommersScraper()
+        records = _fetch_with(scraper, handler)
+        assert len(records) == 3
+        assert {r.buyer for r in records} == {"Region Skåne"}
+        assert scraper.complete
+
+    def test_eavrop_listing_and_details(self):
+        listing = (FIXTURES_DIR / "eavrop_listing.html").read_text()
+
+        def handler(request):
+            if "upphandling.aspx" in request.url.path:
+                return httpx.Response(200, text=EAVROP_DETAIL)
+            return httpx.Response(200, text=listing)
+
+        records = _fetch_with(EAvropScraper(), handler)
+        assert len(records) == 3
+        assert records[0].description == "Utbildning i ledarskap för chefer"
+        assert records[0].geography == "Malmö"
+
+    def test_ted_single_planned_query(self):
+        notices = json.loads((FIXTURES_DIR / "ted_notices.json").read_text())
+        requests = []
+
+        def handler(request):
+            requests.append(json.loads(request.content))
+            return httpx.Response(200, json={"notices": notices})
+
+        records = _fetch_with(TedScraper(), handler)
+        assert len(records) == len({n["publication-number"] for n in notices})
+        assert len(requests) == 1
+        assert requests[0]["paginationMode"] == "ITERATION"
+        assert all(f"({e})" in requests[0]["query"] for e in ted.SEARCH_EXPRESSIONS)
+
+    def test_ted_follows_iteration_tokens(self):
+        notices = json.loads((FIXTURES_DIR / "ted_notices.json").read_text())
+        pages = [notices[:1], notices[1:], []]
+        tokens = []
+
+        def handler(request):
+            payload = json.loads(request.content)
+            tokens.append(payload.get("iterationNextToken"))
+            page = pages[len(tokens) - 1]
+            return httpx.Response(200, json={"notices": page, "iterationNextToken": f"t{len(tokens)}"})
+
+        scraper = TedScraper()
+        records = _fetch_with(scraper, handler)
+        assert tokens == [None, "t1", "t2"]
+        assert len(records) == len({n["publication-number"] for n in notices})
+        assert scraper.complete
+
+    def test_ted_page_cap_marks_incomplete(self, monkeypatch):
+        monkeypatch.setattr(ted, "MAX_PAGES", 2)
+        notices = json.loads((FIXTURES_DIR / "ted_notices.json").read_text())
+
+        def handler(request):
+            return httpx.Response(200, json={"notices": notices, "iterationNextToken": "mer"})
+
+        scraper = TedScraper()
+        _fetch_with(scraper, handler)
+        assert not scraper.complete
+
+    @pytest.mark.parametrize("module, scraper_cls, detail, pager", [
+        (kommers, KommersScraper, "/Notices/TenderNotice/",
+         '<form method="post"><input type="hidden" name="p" value="2" /><button>Nästa</button></form>'),
+        (eavrop, EAvropScraper, "upphandling.aspx",
+         '<input type="hidden" name="__VIEWSTATE" value="vs" />'),
+    ])
+    def test_listing_page_cap_marks_incomplete(self, monkeypatch, module, scraper_cls, detail, pager):
+        monkeypatch.setattr(module, "MAX_PAGES", 2)
+        listing = (FIXTURES_DIR / f"{scraper_cls.name}_listing.html").read_text() + pager
+        pages = []
+
+        def handler(request):
+            if detail in request.url.path:
+                return httpx.Response(200, text="<dl></dl>")
+            pages.append(request.method)
+            return httpx.Response(200, text=listing)
+
+        scraper = scraper_cls()
+        _fetch_with(scraper, handler)
+        assert pages == ["GET", "POST"]
+        assert not scraper.complete
+
+    def test_http_error_ends_source_quietly(self):
+        def handler(request):
+            return httpx.Response(404)
+
+        assert _fetch_with(KommersScraper(), handler) == []
+
+
+class TestFetchDetails:
+    def _run(self, handler, urls, parse=str.upper):
+        async def run():
+            async with make_async_client(transport=httpx.MockTransport(handler)) as client:
+                return await fetch_details(client, urls, parse)
+        return asyncio.run(run())
+
+    def test_per_host_cap(self, monkeypatch):
+        monkeypatch.setattr(base, "DETAIL_CONCURRENCY", 3)
+        in_flight: dict[str, int] = {}
+        peak: dict[str, int] = {}
+
+        async def handler(request):
+            host = request.url.host
+            in_flight[host] = in_flight.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), in_flight[host])
+            await asyncio.sleep(0.02)
+            in_flight[host] -= 1
+            return httpx.Response(200, text=request.url.path)
+
+        urls = [f"https://{h}.example/{i}" for h in ("a", "b") for i in range(10)]
+        results = self._run(handler, urls)
+        assert results == [f"/{i}" for _ in range(2) for i in range(10)]
+        assert peak == {"a.example": 3, "b.example": 3}
+
+    def test_failures_give_none(self):
+        def handler(request):
+            if request.url.path == "/trasig":
+                return httpx.Response(404)
+            return httpx.Response(200, text="ok")
+
+        def parse(html):
+            if html != "ok":
+                raise ValueError(html)
+            return html
+
+        assert self._run(handler, ["https://x.example/a", "https://x.example/trasig"], parse) == ["ok", None]
+
+
+class _StreamingScraper(BaseScraper):
+    name = "ted"
+
+    def __init__(self, n, fail_after=None):
+        self.n = n
+        self.fail_after = fail_after
+        self.stored_midway = None
+
+    async def aiter_fetch(self, client):
+        for i in range(self.n):
+            if i == self.fail_after:
+                raise httpx.ReadTimeout("sida 5")
+            if i == run_scrapers.UPSERT_BATCH + 1:
+                self.stored_midway = len(get_all_procurements())
+            yield TenderRecord(source="ted", source_id=f"S{i}", title=f"Upphandling {i}")
+
+
+async def _repeat(records):
+    async for record in records:
+        yield record
+        yield record
+
+
+class TestStreaming:
+    def test_batches_stored_while_source_runs(self, tmp_db, monkeypatch):
+        monkeypatch.setattr(run_scrapers, "UPSERT_BATCH", 10)
+        scraper = _StreamingScraper(25)
+        monkeypatch.setattr(run_scrapers, "ALL_SCRAPERS", [lambda: scraper])
+        assert run_scrapers.scrape_sources(on_progress=lambda msg: None) == {"ted": 25}
+        assert scraper.stored_midway == 10
+        assert len(get_all_procurements()) == 25
+
+    def test_failure_keeps_earlier_pages(self, tmp_db, monkeypatch):
+        monkeypatch.setattr(run_scrapers, "UPSERT_BATCH", 10)
+        monkeypatch.setattr(run_scrapers, "ALL_SCRAPERS", [lambda: _StreamingScraper(50, fail_after=23)])
+        messages = []
+        assert run_scrapers.scrape_sources(on_progress=messages.append) == {"ted": 23}
+        assert len(get_all_procurements()) == 23
+        assert any("23 lagrade före felet" in m for m in messages)
+
+    def test_failed_flush_after_error_reported(self, tmp_db, monkeypatch, caplog):
+        scraper = _StreamingScraper(5, fail_after=3)
+        monkeypatch.setattr(run_scrapers, "ALL_SCRAPERS", [lambda: scraper])
+
+        def broken(records):
+            raise sqlite3.OperationalError("disk I/O error")
+
+        monkeypatch.setattr(run_scrapers, "upsert_procurements", broken)
+        messages = []
+        assert run_scrapers.scrape_sources(on_progress=messages.append) == {"ted": 0}
+        assert not scraper.complete
+        assert any("3 kunde inte sparas" in m for m in messages)
+        assert "disk I/O error" in caplog.text
+        assert get_scrape_state("ted") is None
+
+    def test_repeated_notice_counted_per_record(self, tmp_db, monkeypatch):
+        scraper = _StreamingScraper(3)
+        scraper.aiter_fetch = lambda client: _repeat(_StreamingScraper.aiter_fetch(scraper, client))
+        monkeypatch.setattr(run_scrapers, "ALL_SCRAPERS", [lambda: scraper])
+        assert run_scrapers.scrape_sources(on_progress=lambda msg: None) == {"ted": 6}
+        assert len(get_all_procurements()) == 3
+
+    def test_iter_fetch_is_lazy(self):
+        records = _StreamingScraper(3, fail_after=1).iter_fetch()
+        assert next(records).source_id == "S0"
+        with pytest.raises(httpx.ReadTimeout):
+            next(records)
+
+
+class _FakeScraper(BaseScraper):
+    def __init__(self, name, delay=0.0, fail=False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+
+    async def aiter_fetch(self, client):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise httpx.ConnectError("nere")
+        yield TenderRecord(source="ted", source_id=f"{self.name}-1", title=f"Upphandling {self.name}")
+
+
+class TestScrapeSources:
+    def test_sources_run_concurrently(self, tmp_db, monkeypatch):
+        monkeypatch.setattr(run_scrapers, "ALL_SCRAPERS", [
+            lambda: _FakeScraper("a", delay=0.3), lambda: _FakeScraper("b", delay=0.3),
+            lambda: _FakeScraper("c", delay=0.3),
+        ])
+        t0 = time.perf_counter()
+        counts = run_scrapers.scrape_sources(on_progress=lambda msg: None)
+        assert time.perf_counter() - t0 < 0.8
+        assert counts == {"a": 1, "b": 1, "c": 1}
+        assert len(get_all_procurements()) == 3
+
+    def test_failing_source_isolated(self, tmp_db, monkeypatch):
+        monkeypatch.setattr(run_scrapers, "ALL_SCRAPERS", [
+            lambda: _FakeScraper("ok"), lambda: _FakeScraper("trasig", fail=True),
+        ])
+        messages = []
+        counts = run_scrapers.scrape_sources(on_progress=messages.append)
+        assert counts == {"ok": 1, "trasig": 0}
+        assert any("trasig: Fel" in m for m in messages)
+        assert [p["source_id"] for p in get_all_procurements()] == ["ok-1"]
+
+    def test_source_filter(self, tmp_db, monkeypatch):
+        monkeypatch.setattr(run_scrapers, "ALL_SCRAPERS", [lambda: _FakeScraper("a"), lambda: _FakeScraper("b")])
+        assert run_scrapers.scrape_sources(sources=["b"], on_progress=lambda msg: None) == {"b": 1}
+
+    def test_sync_fetch_still_available(self):
+        records = _FakeScraper("s").fetch()
+        assert [r.source_id for r in records] == ["s-1"]
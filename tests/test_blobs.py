@@ -0,0 +1,172 @@
+"""Tests for compressed large-text storage and the v4 → v5 migration — uses isolated tmp database."""
+
+import json
+
+import pytest
+
+import db
+import migrate
+from db import (
+    upsert_procurements, get_procurement, get_all_procurements, update_score,
+    save_analysis, get_analysis, purge_old_expired, cross_source_deduplicate,
+    move_large_text_to_blobs, get_connection, DESCRIPTION_PREVIEW_CHARS,
+)
+
+LONG_TEXT = "Ledarskapsutbildning för chefer i offentlig sektor. " * 200
+
+
+def _blobs(pid: int) -> dict[str, str]:
+    conn = get_connection()
+    rows = conn.execute(
+        "SELECT field, codec FROM procurement_blobs WHERE procurement_id = ?", (pid,)
+    ).fetchall()
+    conn.close()
+    return {r["field"]: r["codec"] for r in rows}
+
+
+def _columns(table: str) -> set[str]:
+    conn = get_connection()
+    cols = {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+    conn.close()
+    return cols
+
+
+class TestCodec:
+    @pytest.mark.parametrize("text", ["", "kort", LONG_TEXT, "åäö" * 500])
+    def test_roundtrip(self, text):
+        assert db._decode_blob(*db._encode_blob(text)) == text
+
+    def test_short_text_stored_raw(self):
+        assert db._encode_blob("kort")[0] == "raw"
+
+    def test_long_text_compressed(self):
+        codec, data = db._encode_blob(LONG_TEXT)
+        assert codec in ("zlib", "zstd")
+        assert len(data) < len(LONG_TEXT) / 10
+
+    def test_zlib_readable_without_zstandard(self):
+        assert db._decode_blob("zlib", db.zlib.compress(b"hej")) == "hej"
+
+    def test_unknown_codec_rejected(self):
+        with pytest.raises(ValueError):
+            db._decode_blob("lz4", b"")
+
+
+class TestDescriptions:
+    def test_long_description_kept_in_full(self, tmp_db):
+        ids = upsert_procurements([{"source": "ted", "source_id": "L1", "title": "T", "description": LONG_TEXT}])
+        assert get_procurement(ids["L1"])["description"] == LONG_TEXT
+        # Lists and scans read the inline preview
+        preview = get_all_procurements()[0]["description"]
+        assert preview == LONG_TEXT[:DESCRIPTION_PREVIEW_CHARS]
+
+    def test_short_description_has_no_blob(self, tmp_db):
+        ids = upsert_procurements([{"source": "ted", "source_id": "S1", "title": "T", "description": "kort"}])
+        assert _blobs(ids["S1"]) == {}
+        assert get_procurement(ids["S1"])["description"] == "kort"
+
+    def test_shortened_description_drops_blob(self, tmp_db):
+        rec = {"source": "ted", "source_id": "L1", "title": "T", "description": LONG_TEXT}
+        pid = upsert_procurements([rec])["L1"]
+        upsert_procurements([{**rec, "description": "kort"}])
+        assert "description" not in _blobs(pid)
+        assert get_procurement(pid)["description"] == "kort"
+
+    def test_cross_source_merge_moves_full_description(self, tmp_db):
+        ids = upsert_procurements([
+            {"source": "ted", "source_id": "C1", "title": "Ledarskap", "buyer": "K", "url": "u", "deadline": "2026-01-01"},
+            {"source": "kommers", "source_id": "C2", "title": "Ledarskap", "buyer": "K", "description": LONG_TEXT},
+        ])
+        assert cross_source_deduplicate() == 1
+        assert get_procurement(ids["C1"])["description"] == LONG_TEXT
+
+
+class TestScoreBreakdownAndNoticeText:
+    def test_score_breakdown_roundtrip(self, tmp_db):
+        pid = upsert_procurements([{"source": "ted", "source_id": "B1", "title": "T"}])["B1"]
+        update_score(pid, 40, "ok", {"sector": 20, "keywords": ["coaching"]})
+        assert json.loads(get_procurement(pid)["score_breakdown"]) == {"sector": 20, "keywords": ["coaching"]}
+        update_score(pid, 0, "ok")
+        assert get_procurement(pid)["score_breakdown"] is None
+        assert _blobs(pid) == {}
+
+    def test_score_breakdown_not_in_row(self, tmp_db):
+        assert "score_breakdown" not in _columns("procurements")
+        assert "full_notice_text" not in _columns("analyses")
+
+    def test_full_notice_text_roundtrip(self, tmp_db):
+        pid = upsert_procurements([{"source": "ted", "source_id": "A1", "title": "T"}])["A1"]
+        save_analysis(pid, {"kravsammanfattning": "k", "full_notice_text": LONG_TEXT})
+        analysis = get_analysis(pid)
+        assert analysis["full_notice_text"] == LONG_TEXT
+        assert analysis["kravsammanfattning"] == "k"
+        save_analysis(pid, {"kravsammanfattning": "k2"})
+        assert get_analysis(pid)["full_notice_text"] is None
+
+    def test_blobs_deleted_with_procurement(self, tmp_db):
+        pid = upsert_procurements([{"source": "ted", "source_id": "X1", "title": "T", "status": "expired",
+                                    "deadline": "2020-01-01", "description": LONG_TEXT}])["X1"]
+        update_score(pid, 10, "ok", {"sector": 10})
+        save_analysis(pid, {"full_notice_text": LONG_TEXT})
+        assert len(_blobs(pid)) == 3
+        assert purge_old_expired(days=0) == 1
+        assert _blobs(pid) == {}
+
+
+def _make_legacy_v4(conn):
+    """Re-add the inline columns a v4 database has, with data in them."""
+    conn.execute("ALTER TABLE procurements ADD COLUMN score_breakdown TEXT")
+    conn.execute("ALTER TABLE analyses ADD COLUMN full_notice_text TEXT")
+
+
+class TestMigrationV5:
+    def test_inline_text_moved_to_blobs(self, tmp_db):
+        ids = upsert_procurements([{"source": "ted", "source_id": "M1", "title": "T"}])
+        pid = ids["M1"]
+        save_analysis(pid, {"kravsammanfattning": "k"})
+        conn = get_connection()
+        _make_legacy_v4(conn)
+        conn.execute("UPDATE procurements SET score_breakdown = '{\"sector\": 20}', description = ?", (LONG_TEXT,))
+        conn.execute("UPDATE analyses SET full_notice_text = ?", (LONG_TEXT,))
+        conn.commit()
+        conn.close()
+
+        assert move_large_text_to_blobs() == {"score_breakdown": 1, "full_notice_text": 1, "description": 1}
+        assert "score_breakdown" not in _columns("procurements")
+        assert "full_notice_text" not in _columns("analyses")
+        proc = get_procurement(pid)
+        assert json.loads(proc["score_breakdown"]) == {"sector": 20}
+        assert proc["description"] == LONG_TEXT
+        assert get_analysis(pid)["full_notice_text"] == LONG_TEXT
+        # Running again is a no-op
+        assert set(move_large_text_to_blobs().values()) == {0}
+
+    def test_stale_inline_columns_ignored_before_migration(self, tmp_db):
+        pid = upsert_procurements([{"source": "ted", "source_id": "M1", "title": "T"}])["M1"]
+        save_analysis(pid, {"kravsammanfattning": "k"})
+        conn = get_connection()
+        _make_legacy_v4(conn)
+        conn.execute("UPDATE procurements SET score_breakdown = '{\"sector\": 20}'")
+        conn.execute("UPDATE analyses SET full_notice_text = 'gammal'")
+        conn.commit()
+        conn.close()
+
+        update_score(pid, 0, "omscorad")
+        assert get_procurement(pid)["score_breakdown"] is None
+        assert get_analysis(pid)["full_notice_text"] is None
+        update_score(pid, 10, "omscorad", {"sector": 10})
+        assert json.loads(get_procurement(pid)["score_breakdown"]) == {"sector": 10}
+
+    def test_migration_reports_size(self, tmp_db, capsys):
+        pid = upsert_procurements([{"source": "ted", "source_id": "M1", "title": "T"}])["M1"]
+        save_analysis(pid, {"kravsammanfattning": "k"})
+        conn = get_connection()
+        _make_legacy_v4(conn)
+        conn.execute("UPDATE analyses SET full_notice_text = ?", (LONG_TEXT * 10,))
+        conn.commit()
+        conn.close()
+
+        migrate.migrate_v4_to_v5()
+        out = capsys.readouterr().out
+        assert "Databasstorlek" in out
+        assert migrate.get_schema_version() == 5
@@ -0,0 +1,149 @@
+"""Tests for ON DELETE CASCADE deletes and the v3 → v4 migration — uses isolated tmp database."""
+
+import db
+import migrate
+from db import (
+    upsert_procurements, save_analysis, save_label, ensure_pipeline_entry, add_procurement_note,
+    purge_old_expired, deduplicate_procurements, cross_source_deduplicate,
+    get_connection, check_counters, tables_without_cascade,
+)
+
+
+def _children(pid: int) -> dict[str, int]:
+    conn = get_connection()
+    counts = {
+        t: conn.execute(f"SELECT COUNT(*) FROM {t} WHERE procurement_id = ?", (pid,)).fetchone()[0]
+        for t in db.CASCADE_TABLES
+    }
+    conn.close()
+    return counts
+
+
+def _stale_tables() -> list[str]:
+    conn = get_connection()
+    stale = tables_without_cascade(conn)
+    conn.close()
+    return stale
+
+
+def _attach_children(pid: int):
+    save_analysis(pid, {"kravsammanfattning": "k", "full_notice_text": "notice"})
+    save_label(pid, "relevant")
+    ensure_pipeline_entry(pid, assigned_to="anna")
+    add_procurement_note(pid, "anna", "note")
+
+
+class TestCascadingDeletes:
+    def test_purge_removes_children(self, tmp_db):
+        ids = upsert_procurements([
+            {"source": "ted", "source_id": "X1", "title": "A", "status": "expired", "deadline": "2020-01-01"},
+            {"source": "ted", "source_id": "X2", "title": "B", "deadline": "2099-01-01"},
+        ])
+        _attach_children(ids["X1"])
+        _attach_children(ids["X2"])
+        assert purge_old_expired(days=0) == 1
+        assert set(_children(ids["X1"]).values()) == {0}
+        assert set(_children(ids["X2"]).values()) == {1}
+        assert check_counters() == {}
+
+    def test_deduplicate_removes_pipeline_and_notes(self, tmp_db):
+        ids = upsert_procurements([
+            {"source": "ted", "source_id": "D1", "title": "Samma", "buyer": "K", "published_date": "2026-01-01"},
+            {"source": "ted", "source_id": "D2", "title": "Samma", "buyer": "K", "published_date": "2026-02-01"},
+        ])
+        _attach_children(ids["D1"])
+        assert deduplicate_procurements() == 1
+        assert set(_children(ids["D1"]).values()) == {0}
+
+    def test_cross_source_deduplicate_removes_children(self, tmp_db):
+        ids = upsert_procurements([
+            {"source": "ted", "source_id": "C1", "title": "Ledarskap", "buyer": "K", "url": "u"},
+            {"source": "kommers", "source_id": "C2", "title": "Ledarskap", "buyer": "K"},
+        ])
+        _attach_children(ids["C2"])
+        assert cross_source_deduplicate() == 1
+        assert set(_children(ids["C2"]).values()) == {0}
+
+    def test_batch_larger_than_variable_limit(self, tmp_db):
+        n = 33_000  # above SQLITE_MAX_VARIABLE_NUMBER (32766)
+        conn = get_connection()
+        conn.executemany(
+            "INSERT INTO procurements (source, source_id, title, status, deadline)"
+            " VALUES ('ted', ?, 't', 'expired', '2020-01-01')",
+            ((str(i),) for i in range(n)),
+        )
+        conn.commit()
+        conn.close()
+        assert purge_old_expired(days=0) == n
+
+
+class TestMigrationV3ToV4:
+    def _downgrade(self):
+        """Recreate the child tables with the pre-v4 foreign keys."""
+        conn = get_connection()
+        conn.commit()
+        conn.execute("PRAGMA foreign_keys = OFF")
+        for table in db.CASCADE_TABLES:
+            sql = conn.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+            ).fetchone()[0]
+            rows = conn.execute(f"SELECT * FROM {table}").fetchall()
+            conn.execute(f"DROP TABLE {table}")
+            conn.execute(sql.replace(" ON DELETE CASCADE", ""))
+            for r in rows:
+                conn.execute(f"INSERT INTO {table} VALUES ({', '.join('?' * len(r))})", tuple(r))
+        conn.commit()
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.close()
+
+    def test_deletes_work_before_migration(self, tmp_db):
+        ids = upsert_procurements([
+            {"source": "ted", "source_id": "X1", "title": "A", "status": "expired", "deadline": "2020-01-01"},
+            {"source": "ted", "source_id": "X2", "title": "B", "deadline": "2099-01-01"},
+        ])
+        _attach_children(ids["X1"])
+        _attach_children(ids["X2"])
+        self._downgrade()
+        db.init_db()
+        assert _stale_tables() == db.CASCADE_TABLES
+        assert purge_old_expired(days=0) == 1
+        assert set(_children(ids["X1"]).values()) == {0}
+        assert set(_children(ids["X2"]).values()) == {1}
+        assert check_counters() == {}
+
+    def test_rebuilds_with_cascade_and_keeps_data(self, tmp_db):
+        ids = upsert_procurements([{"source": "ted", "source_id": "M1", "title": "A"}])
+        _attach_children(ids["M1"])
+        self._downgrade()
+        assert _stale_tables() == db.CASCADE_TABLES
+
+        # An orphan left behind by an old manual delete
+        conn = get_connection()
+        conn.execute("PRAGMA foreign_keys = OFF")
+        conn.execute("INSERT INTO labels (procurement_id, label) VALUES (999, 'relevant')")
+        conn.commit()
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.close()
+
+        migrate.migrate_v3_to_v4()
+
+        conn = get_connection()
+        assert tables_without_cascade(conn) == []
+        assert conn.execute("SELECT COUNT(*) FROM labels WHERE procurement_id = 999").fetchone()[0] == 0
+        assert conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'idx_labels_procurement'"
+        ).fetchone() is not None
+        assert migrate.get_schema_version() == 4
+        conn.close()
+        assert _children(ids["M1"]) == {t: 1 for t in db.CASCADE_TABLES}
+        assert check_counters() == {}
+
+        conn = get_connection()
+        conn.execute("DELETE FROM procurements WHERE id = ?", (ids["M1"],))
+        conn.commit()
+        conn.close()
+        assert set(_children(ids["M1"]).values()) == {0}
+
+    def test_noop_on_current_schema(self, tmp_db):
+        migrate.migrate_v3_to_v4()
+        assert _stale_tables() == []
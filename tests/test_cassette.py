@@ -0,0 +1,129 @@
+"""Tests for cassette record/replay of scrape runs — offline."""
+
+import asyncio
+import json
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+import run_scrapers
+from db import close_all_connections, get_all_procurements
+from scrapers.cassette import CassetteMiss, RecordingTransport, ReplayTransport, load_cassette
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+DETAIL = (
+    "<dl><dt>Upphandlande myndighet</dt><dd>Region Skåne</dd>"
+    "<dt>Beskrivning</dt><dd>Utbildning i ledarskap för chefer</dd></dl>"
+)
+
+
+def _sites():
+    """The three sources served from the fixtures, counting requests."""
+    kommers = (FIXTURES_DIR / "kommers_listing.html").read_text()
+    eavrop = (FIXTURES_DIR / "eavrop_listing.html").read_text()
+    notices = json.loads((FIXTURES_DIR / "ted_notices.json").read_text())
+    seen = []
+
+    def handler(request):
+        seen.append(request.url)
+        if request.url.host == "api.ted.europa.eu":
+            return httpx.Response(200, json={"notices": notices})
+        if "TenderNotice/" in request.url.path or "upphandling.aspx" in request.url.path:
+            return httpx.Response(200, text=DETAIL)
+        return httpx.Response(200, text=kommers if "kommersannons" in request.url.host else eavrop)
+
+    return httpx.MockTransport(handler), seen
+
+
+def _get(transport, *urls, method="GET", content=None):
+    async def run():
+        async with httpx.AsyncClient(transport=transport) as client:
+            return [await client.request(method, u, content=content) for u in urls]
+    return asyncio.run(run())
+
+
+class TestRecordReplay:
+    def test_full_run_replays_offline(self, tmp_db, tmp_path, tmp_http_cache):
+        live, seen = _sites()
+        recorder = RecordingTransport(live)
+        recorded = run_scrapers.scrape_sources(on_progress=lambda msg: None, full=True, transport=recorder)
+        recorder.save(tmp_path / "run.json.gz")
+        stored = sorted(p["source_id"] for p in get_all_procurements())
+        assert sum(recorded.values()) > 0
+        assert len(recorder.interactions) == len(seen)
+
+        close_all_connections()
+        tmp_db.unlink()
+        tmp_http_cache.clear()
+        run_scrapers.init_db()
+        replay = ReplayTransport(tmp_path / "run.json.gz")
+        seen.clear()
+        assert run_scrapers.scrape_sources(on_progress=lambda msg: None, full=True, transport=replay) == recorded
+        assert sorted(p["source_id"] for p in get_all_procurements()) == stored
+        assert replay.requests == len(recorder.interactions)
+        assert seen == []
+
+    def test_binary_body_and_headers_roundtrip(self, tmp_path):
+        blob = bytes(range(256))
+        live = httpx.MockTransport(lambda r: httpx.Response(200, content=blob, headers={"ETag": '"v1"'}))
+        recorder = RecordingTransport(live)
+        _get(recorder, "https://a.example/doc.pdf")
+        recorder.save(tmp_path / "c.json")
+        [resp] = _get(ReplayTransport(tmp_path / "c.json"), "https://a.example/doc.pdf")
+        assert resp.content == blob
+        assert resp.headers["etag"] == '"v1"'
+
+
+class TestMatching:
+    def _cassette(self, *bodies):
+        recorder = RecordingTransport(httpx.MockTransport(lambda r: httpx.Response(200, content=r.content)))
+        for body in bodies:
+            _get(recorder, "https://a.example/s", method="POST", content=body)
+        return recorder.interactions
+
+    def test_body_selects_response(self):
+        replay = ReplayTransport(self._cassette(b"page=1", b"page=2"))
+        assert _get(replay, "https://a.example/s", method="POST", content=b"page=2")[0].content == b"page=2"
+        assert _get(replay, "https://a.example/s", method="POST", content=b"page=1")[0].content == b"page=1"
+
+    def test_drifted_body_falls_back_to_url_order(self):
+        replay = ReplayTransport(self._cassette(b"from=20260101", b"from=20260101&p=2"))
+        first = _get(replay, "https://a.example/s", method="POST", content=b"from=20260301")[0]
+        assert first.content == b"from=20260101"
+
+    def test_each_interaction_served_once(self):
+        replay = ReplayTransport(self._cassette(b"q"))
+        _get(replay, "https://a.example/s", method="POST", content=b"q")
+        with pytest.raises(CassetteMiss):
+            _get(replay, "https://a.example/s", method="POST", content=b"q")
+
+
+class TestLatency:
+    def _interactions(self, tmp_path):
+        async def slow(request):
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, text="ok")
+
+        recorder = RecordingTransport(httpx.MockTransport(slow))
+        _get(recorder, "https://a.example/1", "https://a.example/2")
+        recorder.save(tmp_path / "c.json")
+        return load_cassette(tmp_path / "c.json")
+
+    def test_fixed_latency(self, tmp_path):
+        interactions = self._interactions(tmp_path)
+        t0 = time.perf_counter()
+        _get(ReplayTransport(interactions, latency=0.0), "https://a.example/1", "https://a.example/2")
+        assert time.perf_counter() - t0 < 0.1
+        t0 = time.perf_counter()
+        _get(ReplayTransport(interactions, latency=0.1), "https://a.example/1", "https://a.example/2")
+        assert time.perf_counter() - t0 >= 0.2
+
+    def test_recorded_latency(self, tmp_path):
+        interactions = self._interactions(tmp_path)
+        assert all(i["elapsed"] >= 0.05 for i in interactions)
+        t0 = time.perf_counter()
+        _get(ReplayTransport(interactions, latency=None), "https://a.example/1", "https://a.example/2")
+        assert time.perf_counter() - t0 >= 0.1
@@ -0,0 +1,128 @@
+"""Tests for the trigger-maintained dashboard counters — uses isolated tmp database."""
+
+import db
+from db import (
+    upsert_procurements, update_score, update_ai_relevance, save_label,
+    ensure_pipeline_entry, update_pipeline_stage, update_pipeline_details,
+    get_stats, get_label_stats, get_pipeline_summary, get_pipeline_summary_by_user,
+    get_status_counts, check_counters, rebuild_counters, get_connection,
+    archive_expired_procurements, purge_old_expired, create_account, link_procurement_to_account,
+)
+
+
+def _seed():
+    return upsert_procurements([
+        {"source": "ted", "source_id": "C1", "title": "A", "buyer": "Region Skåne", "status": "published",
+         "score": 80, "deadline": "2020-01-01", "estimated_value": 100000},
+        {"source": "ted", "source_id": "C2", "title": "B", "status": "published", "score": 40,
+         "deadline": "2099-01-01"},
+        {"source": "kommers", "source_id": "C3", "title": "C", "status": "published", "score": 0},
+    ])
+
+
+class TestReadsMatchRecompute:
+    def test_stats(self, tmp_db):
+        ids = _seed()
+        update_score(ids["C2"], 65, "")
+        stats = get_stats()
+        assert stats["total"] == 3
+        assert stats["high_fit"] == 2
+        assert stats["avg_score"] == round((80 + 65 + 0) / 3, 1)
+        assert stats["by_source"] == {"ted": 2, "kommers": 1}
+        assert stats["new_today"] == 3
+        assert check_counters() == {}
+
+    def test_label_stats(self, tmp_db):
+        ids = _seed()
+        save_label(ids["C1"], "relevant")
+        save_label(ids["C1"], "irrelevant")
+        save_label(ids["C2"], "relevant")
+        assert get_label_stats() == {"total": 3, "relevant": 2, "irrelevant": 1}
+
+    def test_pipeline_summary(self, tmp_db):
+        ids = _seed()
+        ensure_pipeline_entry(ids["C1"], assigned_to="anna")
+        ensure_pipeline_entry(ids["C2"])
+        update_pipeline_stage(ids["C1"], "kvalificerad", "anna")
+        update_pipeline_details(ids["C1"], estimated_value=200000, probability=50, updated_by="anna")
+        summary = get_pipeline_summary()
+        assert summary["kvalificerad"] == {"count": 1, "weighted_value": 100000, "total_value": 200000}
+        assert summary["bevakad"]["count"] == 1
+        assert get_pipeline_summary_by_user() == {
+            "anna": {"kvalificerad": {"count": 1, "weighted_value": 100000}},
+        }
+        assert check_counters() == {}
+
+    def test_status_counts(self, tmp_db):
+        ids = _seed()
+        update_ai_relevance(ids["C1"], "relevant", "")
+        status = get_status_counts()
+        assert status["total"] == 3
+        assert status["analyzed"] == 1
+        # C1 is past its deadline but not yet archived
+        assert status["expired"] == 1
+        assert status["active"] == 2
+        assert status["no_deadline"] == 1
+        assert status["completeness"]["buyer"] == round(1 / 3 * 100, 1)
+        archive_expired_procurements()
+        assert get_status_counts()["expired"] == 1
+        assert check_counters() == {}
+
+
+class TestConsistency:
+    def test_deletes_decrement(self, tmp_db):
+        ids = _seed()
+        save_label(ids["C1"], "relevant")
+        archive_expired_procurements()
+        assert purge_old_expired(days=0) == 1
+        assert get_stats()["total"] == 2
+        assert get_stats()["by_source"] == {"ted": 1, "kommers": 1}
+        assert check_counters() == {}
+
+    def test_unchanged_upsert_keeps_counts(self, tmp_db):
+        _seed()
+        _seed()
+        assert get_stats()["total"] == 3
+        assert check_counters() == {}
+
+    def test_check_reports_and_rebuild_repairs_drift(self, tmp_db):
+        _seed()
+        conn = get_connection()
+        conn.execute("UPDATE counters SET value = value + 5 WHERE name = 'procurements'")
+        conn.commit()
+        conn.close()
+        assert check_counters() == {("procurements", ""): (8, 3)}
+        rebuild_counters()
+        assert check_counters() == {}
+        assert get_stats()["total"] == 3
+
+    def test_init_db_backfills_existing_rows(self, tmp_db):
+        _seed()
+        conn = get_connection()
+        conn.execute("DROP TABLE counters")
+        conn.execute("DROP TRIGGER counters_procurements_ai")
+        conn.commit()
+        conn.close()
+        db.init_db()
+        assert get_stats()["total"] == 3
+        assert check_counters() == {}
+
+    def test_linked_account_keys_match_recompute(self, tmp_db):
+        ids = _seed()
+        account = create_account("Region Skåne")
+        link_procurement_to_account(ids["C1"], account)
+        assert get_status_counts()["accounts_linked"] == 1
+        assert check_counters() == {}
+        rebuild_counters()
+        assert check_counters() == {}
+
+    def test_null_status_is_neither_open_nor_archived(self, tmp_db):
+        ids = _seed()
+        conn = get_connection()
+        conn.execute("UPDATE procurements SET status = NULL WHERE id = ?", (ids["C1"],))
+        conn.commit()
+        conn.close()
+        # As before the counters: NULL != 'expired' is not true in SQL
+        assert get_status_counts()["active"] == 2
+        assert archive_expired_procurements() == 0
+        assert check_counters() == {}
@@ -0,0 +1,105 @@
+"""Tests for table versions and versioned_cache — uses isolated tmp database."""
+
+import pytest
+
+from db import (
+    get_table_versions, get_data_version, versioned_cache, upsert_procurement,
+    update_score, purge_old_expired, save_label, create_account, submit_write,
+)
+
+
+class TestTableVersions:
+    def test_every_row_change_bumps(self, tmp_db):
+        v0 = get_table_versions("procurements")["procurements"]
+        pid = upsert_procurement({"source": "ted", "source_id": "V1", "title": "T",
+                                  "status": "expired", "deadline": "2020-01-01"})
+        v1 = get_table_versions("procurements")["procurements"]
+        update_score(pid, 10, "ok")
+        v2 = get_table_versions("procurements")["procurements"]
+        purge_old_expired(days=0)
+        v3 = get_table_versions("procurements")["procurements"]
+        assert v0 < v1 < v2 < v3
+
+    def test_other_tables_untouched(self, tmp_db):
+        before = get_table_versions()
+        create_account("Kund")
+        after = get_table_versions()
+        assert after["accounts"] > before["accounts"]
+        assert {t: v for t, v in after.items() if t != "accounts"} == \
+            {t: v for t, v in before.items() if t != "accounts"}
+
+    def test_queued_writes_bump(self, tmp_db):
+        pid = upsert_procurement({"source": "ted", "source_id": "V1", "title": "T"})
+        before = get_data_version("labels")
+        submit_write(save_label, pid, "relevant").result(timeout=5)
+        assert get_data_version("labels") > before
+
+    def test_data_version_sums_tables(self, tmp_db):
+        versions = get_table_versions("procurements", "labels")
+        assert get_data_version("procurements", "labels") == sum(versions.values())
+
+    def test_unknown_table_rejected(self, tmp_db):
+        with pytest.raises(ValueError):
+            get_table_versions("counters")
+
+
+class TestVersionedCache:
+    def test_recomputes_only_after_change(self, tmp_db):
+        calls = []
+
+        @versioned_cache("accounts")
+        def load(x):
+            calls.append(x)
+            return [x]
+
+        first = load(1)
+        assert load(1) is first
+        assert len(calls) == 1
+        load(2)
+        assert len(calls) == 2
+        upsert_procurement({"source": "ted", "source_id": "V1", "title": "T"})
+        assert load(1) is first
+        create_account("Kund")
+        assert load(1) is not first
+        assert len(calls) == 3
+
+    def test_cache_clear(self, tmp_db):
+        calls = []
+
+        @versioned_cache("accounts")
+        def load():
+            calls.append(1)
+
+        load()
+        load.cache_clear()
+        load()
+        assert len(calls) == 2
+
+    def test_maxsize_evicts_oldest(self, tmp_db):
+        calls = []
+
+        @versioned_cache("accounts", maxsize=2)
+        def load(x):
+            calls.append(x)
+
+        for x in (1, 2, 3, 1):
+            load(x)
+        assert calls == [1, 2, 3, 1]
+
+    def test_predictions_cached(self, tmp_db):
+        from predictions import predict_reprocurements
+
+        first = predict_reprocurements()
+        assert predict_reprocurements() is first
+        upsert_procurement({"source": "ted", "source_id": "V1", "title": "T"})
+        assert predict_reprocurements() is not first
+
+    def test_weekly_report_copies_cached_result(self, tmp_db):
+        from reports import generate_report
+
+        report = generate_report("2026-W10")
+        report["stage_summary"].clear()
+        report["new_relevant"].append({"title": "tillagd"})
+        fresh = generate_report("2026-W10")
+        assert fresh["stage_summary"]
+        assert fresh["new_relevant"] == []
@@ -0,0 +1,93 @@
+"""Tests for the pooled connection manager in db.py."""
+
+import gc
+import logging
+import threading
+
+import pytest
+
+import db
+
+
+class TestConnectionReuse:
+    def test_connection_reused_after_close(self, tmp_db):
+        conn = db.get_connection()
+        raw = conn.raw
+        conn.close()
+        conn2 = db.get_connection()
+        assert conn2.raw is raw
+        conn2.close()
+
+    def test_nested_calls_share_connection(self, tmp_db):
+        outer = db.get_connection()
+        inner = db.get_connection()
+        assert inner.raw is outer.raw
+        inner.close()
+        # Outer handle still usable after inner close
+        assert outer.execute("SELECT 1").fetchone()[0] == 1
+        outer.close()
+
+    def test_threads_get_separate_connections(self, tmp_db):
+        conn = db.get_connection()
+        seen = []
+
+        def worker():
+            c = db.get_connection()
+            seen.append(c.raw)
+            c.close()
+
+        t = threading.Thread(target=worker)
+        t.start()
+        t.join()
+        assert seen[0] is not conn.raw
+        conn.close()
+
+    def test_closed_handle_rejects_use(self, tmp_db):
+        conn = db.get_connection()
+        conn.close()
+        with pytest.raises(Exception):
+            conn.execute("SELECT 1")
+
+    def test_pragmas_applied(self, tmp_db):
+        conn = db.get_connection()
+        assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        conn.close()
+
+
+class TestTransaction:
+    def test_commit_on_success(self, tmp_db):
+        with db.transaction() as conn:
+            conn.execute("INSERT INTO accounts (name, normalized_name) VALUES ('A', 'a')")
+        assert len(db.get_all_accounts()) == 1
+
+    def test_rollback_on_error(self, tmp_db):
+        with pytest.raises(RuntimeError):
+            with db.transaction() as conn:
+                conn.execute("INSERT INTO accounts (name, normalized_name) VALUES ('A', 'a')")
+                raise RuntimeError("boom")
+        assert db.get_all_accounts() == []
+
+    def test_uncommitted_work_discarded_on_close(self, tmp_db):
+        conn = db.get_connection()
+        conn.execute("INSERT INTO accounts (name, normalized_name) VALUES ('A', 'a')")
+        conn.close()
+        assert db.get_all_accounts() == []
+
+
+class TestLeakDetection:
+    def test_unclosed_handle_is_reported_and_released(self, tmp_db, caplog):
+        def leaky():
+            conn = db.get_connection()
+            conn.execute("SELECT 1")
+
+        with caplog.at_level(logging.WARNING, logger="db"):
+            leaky()
+            gc.collect()
+        assert "never closed" in caplog.text
+        assert "leaky" in caplog.text
+        # The leaked lease was returned, so the thread gets a fresh checkout
+        conn = db.get_connection()
+        assert conn._lease.refs == 1
+        conn.close()
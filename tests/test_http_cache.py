@@ -0,0 +1,104 @@
+"""Tests for the persistent HTTP cache — offline, per-test cache file."""
+
+import asyncio
+import os
+
+import httpx
+
+import scrapers.http_cache as http_cache
+from scrapers.base import fetch_details, make_async_client
+from scrapers.http_cache import HttpCache, cached_get
+
+URL = "https://www.e-avrop.com/org/visa/upphandling.aspx?id=1"
+
+
+def _fetch(handler, urls):
+    async def run():
+        async with make_async_client(transport=httpx.MockTransport(handler)) as client:
+            return await fetch_details(client, urls, lambda html: html)
+    return asyncio.run(run())
+
+
+class TestCachedFetch:
+    def test_fresh_page_served_without_request(self, tmp_http_cache):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, text="detalj")
+
+        assert _fetch(handler, [URL]) == ["detalj"]
+        assert _fetch(handler, [URL]) == ["detalj"]
+        assert len(requests) == 1
+        assert (tmp_http_cache.stats.hits, tmp_http_cache.stats.misses) == (1, 1)
+
+    def test_stale_page_revalidated_with_etag(self, tmp_http_cache, monkeypatch):
+        monkeypatch.setitem(http_cache.HOST_TTLS, "www.e-avrop.com", 0)
+        seen = []
+
+        def handler(request):
+            seen.append(request.headers.get("if-none-match"))
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304, headers={"ETag": '"v1"'})
+            return httpx.Response(200, text="detalj", headers={"ETag": '"v1"'})
+
+        assert _fetch(handler, [URL]) == ["detalj"]
+        assert _fetch(handler, [URL]) == ["detalj"]
+        assert seen == [None, '"v1"']
+        assert tmp_http_cache.stats.revalidated == 1
+        assert tmp_http_cache.stats.hit_ratio == 0.5
+
+    def test_changed_page_replaced(self, tmp_http_cache, monkeypatch):
+        monkeypatch.setitem(http_cache.HOST_TTLS, "www.e-avrop.com", 0)
+        bodies = iter(["gammal", "ny"])
+
+        def handler(request):
+            return httpx.Response(200, text=next(bodies), headers={"Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"})
+
+        assert _fetch(handler, [URL]) == ["gammal"]
+        assert _fetch(handler, [URL]) == ["ny"]
+        assert tmp_http_cache.lookup(URL).body == b"ny"
+
+    def test_errors_and_no_store_not_cached(self, tmp_http_cache):
+        def handler(request):
+            if request.url.params["id"] == "1":
+                return httpx.Response(404)
+            return httpx.Response(200, text="x", headers={"Cache-Control": "no-store"})
+
+        _fetch(handler, [URL, URL.replace("id=1", "id=2")])
+        assert tmp_http_cache.size() == 0
+
+    def test_sync_get_for_notice_xml(self, tmp_http_cache):
+        calls = []
+
+        def handler(request):
+            calls.append(str(request.url))
+            return httpx.Response(200, content=b"<xml/>")
+
+        url = "https://ted.europa.eu/en/notice/1-2024/xml"
+        with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+            assert cached_get(url, client=client).content == b"<xml/>"
+            assert cached_get(url, client=client).content == b"<xml/>"
+        assert calls == [url]
+
+
+class TestEviction:
+    def test_least_recently_used_evicted(self, tmp_path):
+        cache = HttpCache(tmp_path / "c.db", max_bytes=2500)
+        body = os.urandom(1000)  # incompressible, ~1 KB stored
+        for i in range(2):
+            cache.store(f"https://x.example/{i}", httpx.Response(200, content=body))
+        cache.lookup("https://x.example/0")
+        cache.store("https://x.example/2", httpx.Response(200, content=body))
+
+        assert cache.lookup("https://x.example/1") is None
+        assert cache.lookup("https://x.example/0") is not None
+        assert cache.size() <= cache.max_bytes
+        cache.close()
+
+    def test_size_survives_reopen(self, tmp_path):
+        cache = HttpCache(tmp_path / "c.db")
+        cache.store("https://x.example/a", httpx.Response(200, content=b"a" * 5000))
+        size = cache.size()
+        cache.close()
+        assert HttpCache(tmp_path / "c.db").size() == size > 0
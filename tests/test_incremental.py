@@ -0,0 +1,122 @@
+"""Tests for incremental scraping: watermarks, known ids and --full — offline."""
+
+import asyncio
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import httpx
+
+import run_scrapers
+import scrapers.ted as ted
+from db import get_scrape_state, update_scrape_state, get_known_source_ids, upsert_procurement
+from models import TenderRecord
+from scrapers.base import BaseScraper, make_async_client
+from scrapers.kommers import KommersScraper
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+class TestScrapeState:
+    def test_watermark_only_moves_forward(self, tmp_db):
+        assert get_scrape_state("ted") is None
+        update_scrape_state("ted", "2026-03-01")
+        update_scrape_state("ted", "2026-02-01")
+        update_scrape_state("ted", None)
+        state = get_scrape_state("ted")
+        assert state["watermark"] == "2026-03-01"
+        assert state["last_full_sync_at"] is None
+
+    def test_full_sync_recorded(self, tmp_db):
+        update_scrape_state("ted", "2026-03-01", full=True)
+        first = get_scrape_state("ted")["last_full_sync_at"]
+        update_scrape_state("ted", "2026-03-02")
+        assert first is not None
+        assert get_scrape_state("ted")["last_full_sync_at"] == first
+
+    def test_known_source_ids(self, tmp_db):
+        upsert_procurement({"source": "kommers", "source_id": "KOM-1", "title": "T"})
+        upsert_procurement({"source": "ted", "source_id": "1-2026", "title": "T"})
+        assert get_known_source_ids("kommers") == {"KOM-1"}
+
+
+class TestTedWindow:
+    def test_query_starts_before_watermark(self):
+        assert "publication-date>20260227" in ted._build_query("2026-03-01")
+
+    def test_full_window_without_watermark(self):
+        cutoff = (datetime.now() - timedelta(days=ted.FULL_SYNC_DAYS)).strftime("%Y%m%d")
+        assert f"publication-date>{cutoff}" in ted._build_query()
+        assert ted._date_cutoff("trasigt") == cutoff
+
+
+class TestEarlyStop:
+    def _fetch(self, known_ids):
+        listing = (FIXTURES_DIR / "kommers_listing.html").read_text()
+        details = []
+
+        def handler(request):
+            if "/Notices/TenderNotice/" in request.url.path:
+                details.append(request.url.path)
+                return httpx.Response(200, text="<dl></dl>")
+            return httpx.Response(200, text=listing)
+
+        scraper = KommersScraper()
+        scraper.known_ids = frozenset(known_ids)
+
+        async def run():
+            async with make_async_client(transport=httpx.MockTransport(handler)) as client:
+                return await scraper.afetch(client)
+        return asyncio.run(run()), details
+
+    def test_all_known_page_stops(self):
+        records, details = self._fetch({"KOM-12345", "KOM-12346", "KOM-12347"})
+        assert records == []
+        assert details == []
+
+    def test_page_with_new_notice_kept(self):
+        records, details = self._fetch({"KOM-12345", "KOM-12346"})
+        assert len(records) == 3
+        assert len(details) == 3
+
+
+class _DatedScraper(BaseScraper):
+    name = "ted"
+    runs: list = []
+
+    def __init__(self, dates=("2026-03-01",), complete=True):
+        self.dates = dates
+        self.ok = complete
+
+    async def aiter_fetch(self, client):
+        _DatedScraper.runs.append((self.since, self.known_ids))
+        self.complete = self.ok
+        for i, d in enumerate(self.dates):
+            yield TenderRecord(source="ted", source_id=f"{d}-{i}", title="Upphandling", published_date=d)
+
+
+class TestScrapeSourcesIncremental:
+    def _scrape(self, monkeypatch, full=False, **kwargs):
+        monkeypatch.setattr(run_scrapers, "ALL_SCRAPERS", [lambda: _DatedScraper(**kwargs)])
+        return run_scrapers.scrape_sources(on_progress=lambda msg: None, full=full)
+
+    def test_resumes_from_watermark(self, tmp_db, monkeypatch):
+        _DatedScraper.runs = []
+        self._scrape(monkeypatch, dates=("2026-02-01", "2026-03-01"))
+        self._scrape(monkeypatch, dates=())
+        assert _DatedScraper.runs[0] == (None, frozenset())
+        assert _DatedScraper.runs[1] == ("2026-03-01", {"2026-02-01-0", "2026-03-01-1"})
+
+    def test_full_ignores_state(self, tmp_db, monkeypatch):
+        _DatedScraper.runs = []
+        self._scrape(monkeypatch)
+        self._scrape(monkeypatch, full=True, dates=("2026-01-01",))
+        assert _DatedScraper.runs[1] == (None, frozenset())
+        state = get_scrape_state("ted")
+        assert state["watermark"] == "2026-03-01"
+        assert state["last_full_sync_at"] is not None
+
+    def test_incomplete_run_keeps_watermark(self, tmp_db, monkeypatch):
+        update_scrape_state("ted", "2026-01-01")
+        self._scrape(monkeypatch, complete=False)
+        assert get_scrape_state("ted")["watermark"] == "2026-01-01"
+        assert get_known_source_ids("ted") == {"2026-03-01-0"}
@@ -79,15 +79,15 @@ class TestDateCoercion:
         assert r.published_date is None
 
 
-class TestDescriptionTruncation:
+class TestDescriptionCleanup:
     def test_short_description_unchanged(self):
         r = _make_record(description="Short desc")
         assert r.description == "Short desc"
 
-    def test_long_description_truncated(self):
+    def test_long_description_kept_whole(self):
         long_desc = "x" * 3000
         r = _make_record(description=long_desc)
-        assert len(r.description) == 2000
+        assert len(r.description) == 3000
 
     def test_none_description(self):
         r = _make_record(description=None)
@@ -0,0 +1,73 @@
+"""Parsing backends and strainers give identical records — offline."""
+
+from pathlib import Path
+
+import pytest
+
+import scrapers.eavrop as eavrop
+import scrapers.kommers as kommers
+import scrapers.parsing as parsing
+from scrapers.eavrop import EAvropScraper
+from scrapers.kommers import KommersScraper
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+VIEWSTATE = "A" * 50_000
+PAGER = f"""
+<form method="post" action="/Notices/TenderNotices">
+  <input type="hidden" name="__VIEWSTATE" value="{VIEWSTATE}" />
+  <input type="hidden" name="__VIEWSTATEGENERATOR" value="CA0B0334" />
+  <input type="hidden" name="__EVENTVALIDATION" value="ev" />
+  <input type="text" name="SearchString" value="ledarskap" />
+  <button type="submit" name="Page" value="2">Nästa</button>
+</form>
+"""
+
+
+def _with_pager(name: str) -> str:
+    return (FIXTURES_DIR / name).read_text().replace("<body>", "<body>" + PAGER)
+
+
+def _baseline(monkeypatch, fn, *args):
+    """Result with the original setup: html.parser over the whole page."""
+    with monkeypatch.context() as m:
+        m.setattr(parsing, "PARSER", "html.parser")
+        for module, name in ((kommers, "_ROWS_ONLY"), (kommers, "_FORMS_ONLY"),
+                             (eavrop, "_GRID_ONLY"), (eavrop, "_INPUTS_ONLY")):
+            m.setattr(module, name, None)
+        return fn(*args)
+
+
+@pytest.mark.parametrize("parser", parsing.PARSERS)
+class TestBackendParity:
+    def test_kommers_listing(self, parser, monkeypatch):
+        html = _with_pager("kommers_listing.html")
+        expected = [r.model_dump() for r in _baseline(monkeypatch, KommersScraper()._parse_listing, html)]
+        monkeypatch.setattr(parsing, "PARSER", parser)
+        assert [r.model_dump() for r in KommersScraper()._parse_listing(html)] == expected
+        assert len(expected) == 3
+
+    def test_eavrop_listing(self, parser, monkeypatch):
+        html = _with_pager("eavrop_listing.html")
+        expected = [r.model_dump() for r in _baseline(monkeypatch, EAvropScraper()._parse_listing, html)]
+        monkeypatch.setattr(parsing, "PARSER", parser)
+        assert [r.model_dump() for r in EAvropScraper()._parse_listing(html)] == expected
+        assert len(expected) == 3
+
+    def test_pagination_forms(self, parser, monkeypatch):
+        kom = _with_pager("kommers_listing.html")
+        eav = _with_pager("eavrop_listing.html")
+        expected = (_baseline(monkeypatch, KommersScraper._extract_next_form, kom),
+                    _baseline(monkeypatch, EAvropScraper._build_postback, eav, 2))
+        monkeypatch.setattr(parsing, "PARSER", parser)
+        assert KommersScraper._extract_next_form(kom) == expected[0]
+        assert EAvropScraper._build_postback(eav, 2) == expected[1]
+        assert expected[0]["__VIEWSTATE"] == expected[1]["__VIEWSTATE"] == VIEWSTATE
+
+    def test_detail_pages(self, parser, monkeypatch):
+        page = ("<dl><dt>Upphandlande myndighet</dt><dd>Region Skåne</dd>"
+                "<dt>Beskrivning</dt><dd>Utbildning i ledarskap för chefer</dd>"
+                "<dt>Leveransort</dt><dd>Malmö</dd></dl>")
+        monkeypatch.setattr(parsing, "PARSER", parser)
+        assert KommersScraper._parse_buyer(page) == "Region Skåne"
+        assert EAvropScraper._parse_detail(page) == ("Utbildning i ledarskap för chefer", "Malmö")
@@ -0,0 +1,89 @@
+"""Tests for query_procurements / count_procurements — uses isolated tmp database."""
+
+import pytest
+
+from db import (
+    upsert_procurements, update_ai_relevance, save_label, save_analysis,
+    query_procurements, count_procurements,
+)
+
+
+def _seed(n=25):
+    return upsert_procurements([
+        {"source": "ted", "source_id": f"Q{i}", "title": f"Upphandling {i}",
+         "description": "x" * 500, "score": i % 10 * 10,
+         "published_date": f"2026-01-{i % 5 + 1:02d}"}
+        for i in range(n)
+    ])
+
+
+def _walk(**kwargs):
+    rows, cursor = query_procurements(**kwargs)
+    pages = [rows]
+    while cursor is not None:
+        rows, cursor = query_procurements(after=cursor, **kwargs)
+        pages.append(rows)
+    return pages
+
+
+class TestProjection:
+    def test_only_requested_columns(self, tmp_db):
+        _seed(3)
+        rows, _ = query_procurements(["id", "title"])
+        assert set(rows[0]) == {"id", "title"}
+
+    def test_derived_columns(self, tmp_db):
+        ids = _seed(3)
+        save_label(ids["Q1"], "relevant")
+        save_analysis(ids["Q1"], {"kravsammanfattning": "k"})
+        rows, _ = query_procurements(["id", "label", "has_analysis", "description_preview"])
+        by_id = {r["id"]: r for r in rows}
+        assert by_id[ids["Q1"]]["label"] == "relevant"
+        assert by_id[ids["Q1"]]["has_analysis"] == 1
+        assert by_id[ids["Q2"]]["label"] is None
+        assert by_id[ids["Q2"]]["has_analysis"] == 0
+        assert len(by_id[ids["Q2"]]["description_preview"]) == 160
+
+    def test_unknown_column_rejected(self, tmp_db):
+        with pytest.raises(ValueError):
+            query_procurements(["id", "title; DROP TABLE procurements"])
+
+
+class TestKeysetPaging:
+    def test_pages_cover_all_rows_in_order(self, tmp_db):
+        _seed(25)
+        pages = _walk(columns=["id", "score", "published_date"], limit=7)
+        assert [len(p) for p in pages] == [7, 7, 7, 4]
+        rows = [r for p in pages for r in p]
+        keys = [(r["score"], r["published_date"], r["id"]) for r in rows]
+        assert keys == sorted(keys, reverse=True)
+        assert len({r["id"] for r in rows}) == 25
+
+    def test_order_by_published(self, tmp_db):
+        _seed(12)
+        pages = _walk(columns=["id", "published_date"], limit=5, order_by="published")
+        rows = [r for p in pages for r in p]
+        keys = [(r["published_date"], r["id"]) for r in rows]
+        assert keys == sorted(keys, reverse=True)
+        assert len(rows) == 12
+
+    def test_exact_page_has_no_next_cursor(self, tmp_db):
+        _seed(5)
+        rows, cursor = query_procurements(["id"], limit=5)
+        assert len(rows) == 5
+        assert cursor is None
+
+    def test_cursor_must_match_order(self, tmp_db):
+        with pytest.raises(ValueError):
+            query_procurements(["id"], after=(1, 2), order_by="score")
+
+
+class TestFilters:
+    def test_score_band_and_irrelevant_excluded(self, tmp_db):
+        ids = _seed(20)
+        update_ai_relevance(ids["Q9"], "irrelevant", "")
+        filters = {"min_score": 60, "max_score": 100, "ai_relevance": "not_irrelevant"}
+        rows, _ = query_procurements(["id", "score"], **filters)
+        assert all(r["score"] >= 60 for r in rows)
+        assert ids["Q9"] not in {r["id"] for r in rows}
+        assert count_procurements(**filters) == len(rows) == 7
@@ -0,0 +1,259 @@
+"""Query-plan regression suite for db.py.
+
+Every public db function is exercised against a small seeded database
+while a trace callback records the SQL it runs. Each recorded statement
+is then put through EXPLAIN QUERY PLAN. The test fails if any statement
+does a full table scan ("SCAN <table>" without an index) of one of the
+tables that grow with use. Batch jobs that read a whole table on purpose
+are listed in FULL_SCAN_ALLOWED, with the reason.
+"""
+
+import re
+import sqlite3
+import sys
+from collections import defaultdict
+
+import pytest
+
+import db
+
+# Tables that grow with procurements or user activity
+LARGE_TABLES = {
+    "procurements", "analyses", "labels", "pipeline", "procurement_notes",
+    "notifications", "messages", "calendar_events", "watch_list", "procurement_blobs",
+}
+
+# Functions that read a whole table by design, and why
+FULL_SCAN_ALLOWED = {
+    "init_db": "schema setup and migrations",
+    "rebuild_search_index": "rebuilds the FTS index from every row",
+    "get_all_procurements": "batch export/analysis over every row",
+    "get_score_inputs": "rescoring reads every row",
+    "cross_source_deduplicate": "batch job comparing every row",
+    "deduplicate_procurements": "batch job, window over every row",
+    "auto_link_procurements_to_accounts": "batch job over unlinked rows",
+    "get_all_labels": "feedback tab lists every label",
+    "get_label_stats": "aggregate over every label",
+    "get_pipeline_items": "pipeline board lists every item",
+    "get_pipeline_summary": "aggregate over every pipeline item",
+    "get_pipeline_summary_by_user": "aggregate over every pipeline item",
+    "get_all_active_watches": "scraper matching reads every active watch",
+    "get_all_contracts": "timeline lists every contract",
+    "rebuild_counters": "recomputes every rollup from scratch",
+    "check_counters": "recomputes every rollup from scratch",
+    "move_large_text_to_blobs": "one-off migration over every row",
+}
+
+# Plumbing that runs no query of its own (tables_without_cascade: PRAGMAs only)
+_NOT_QUERIES = {"get_connection", "transaction", "close_all_connections", "tables_without_cascade",
+                "submit_write", "versioned_cache"}
+
+_SKIP_PREFIXES = ("--", "PRAGMA", "BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE",
+                  "CREATE", "DROP", "ALTER", "ANALYZE", "EXPLAIN")
+_SQL_KEYWORDS = {"WHERE", "ON", "JOIN", "LEFT", "INNER", "CROSS", "ORDER", "GROUP",
+                 "LIMIT", "SET", "USING", "AS", "NATURAL", "UNION", "VALUES"}
+
+
+def _caller() -> str:
+    """Name of the outermost public db.py function on the stack."""
+    caller = "?"
+    frame = sys._getframe(1)
+    while frame:
+        if frame.f_code.co_filename == db.__file__:
+            name = frame.f_code.co_name
+            if not name.startswith("_") and name not in _NOT_QUERIES and name != "<module>":
+                caller = name
+        frame = frame.f_back
+    return caller
+
+
+def _aliases(sql: str) -> dict[str, str]:
+    """Map table aliases (and names) in FROM/JOIN clauses to table names."""
+    mapping = {}
+    for table, alias in re.findall(r"\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?",
+                                   sql, re.IGNORECASE):
+        mapping[table] = table
+        if alias and alias.upper() not in _SQL_KEYWORDS:
+            mapping[alias] = table
+    return mapping
+
+
+def full_scans(conn: sqlite3.Connection, sql: str) -> list[str]:
+    """Return the large tables *sql* reads with a full table scan."""
+    names = _aliases(sql)
+    scans = []
+    for row in conn.execute("EXPLAIN QUERY PLAN " + sql):
+        m = re.fullmatch(r"SCAN (\w+)", row[3])
+        if m and names.get(m.group(1), m.group(1)) in LARGE_TABLES:
+            scans.append(names.get(m.group(1), m.group(1)))
+    return scans
+
+
+@pytest.fixture
+def traced(tmp_db, monkeypatch):
+    """Record (caller, sql) for every statement db.py runs."""
+    statements: dict[str, set[str]] = defaultdict(set)
+    open_connection = db._open_connection
+
+    def tracing_open(path):
+        conn = open_connection(path)
+        conn.set_trace_callback(lambda sql: statements[_caller()].add(sql))
+        return conn
+
+    db.close_all_connections()
+    monkeypatch.setattr(db, "_open_connection", tracing_open)
+    yield statements
+    db.close_all_connections()
+
+
+def _exercise():
+    """Call every public db function at least once against seeded data."""
+    db.init_db()
+    db.seed_accounts()
+    db.sync_users_from_yaml()
+    ids = db.upsert_procurements([
+        {"source": "ted", "source_id": f"P{i}", "title": f"Upphandling {i}",
+         "buyer": "Västtrafik AB", "description": "Ledarskap", "score": i * 10,
+         "published_date": f"2026-01-{i + 1:02d}", "deadline": f"2025-02-{i + 1:02d}",
+         "status": "published"}
+        for i in range(8)
+    ])
+    db.upsert_procurement({"source": "kommers", "source_id": "K1", "title": "Upphandling 1",
+                           "buyer": "Västtrafik AB", "deadline": "2099-01-01"})
+    pid = ids["P3"]
+    db.rebuild_search_index()
+    db.update_score(pid, 70, "ok", {"sector": 20})
+    db.update_scores([(ids["P1"], 10, "ok", None), (ids["P2"], 20, "ok", {"sector": 20}, "h")], ruleset="r")
+    db.update_ai_relevance(pid, "relevant", "ok")
+    db.get_all_procurements()
+    db.get_procurements(ids.values())
+    db.get_score_inputs()
+    db.get_score_inputs(ids.values(), ruleset="r")
+    db.get_procurement(pid)
+    db.query_procurements(["id", "label", "has_analysis"], limit=3)
+    rows, cursor = db.query_procurements(["id"], limit=2, order_by="published",
+                                         min_score=1, ai_relevance="not_irrelevant")
+    db.query_procurements(["id"], after=cursor, limit=2, order_by="published",
+                          min_score=1, ai_relevance="not_irrelevant")
+    db.count_procurements(min_score=60, max_score=100, ai_relevance="not_irrelevant")
+    db.search_procurements(query="ledarskap", limit=10)
+    db.search_procurements(source="ted", ai_relevance="unassessed")
+    db.get_unassessed_procurements(min_score=1)
+    db.update_scrape_state("ted", "2026-01-08", full=True)
+    db.get_scrape_state("ted")
+    db.get_known_source_ids("kommers")
+
+    db.save_analysis(pid, {"kravsammanfattning": "k", "full_notice_text": "notis"})
+    db.get_analysis(pid)
+    db.save_label(pid, "relevant", "bra")
+    db.get_label(pid)
+    db.get_all_labels()
+    db.get_label_stats()
+    db.get_stats()
+    db.get_status_counts()
+    db.get_table_versions("procurements", "labels")
+    db.get_data_version()
+
+    db.ensure_pipeline_entry(pid, assigned_to="anna")
+    db.update_pipeline_stage(pid, "kvalificerad", "anna")
+    db.update_pipeline_assignment(pid, "anna", "anna")
+    db.update_pipeline_details(pid, estimated_value=100, notes="n", updated_by="anna")
+    db.get_pipeline_items(stage="kvalificerad", assigned_to="anna")
+    db.get_pipeline_item(pid)
+    db.get_pipeline_summary()
+    db.get_pipeline_summary_by_user()
+    db.add_procurement_note(pid, "anna", "note")
+    db.get_procurement_notes(pid)
+    db.get_recent_activity(username="anna")
+    db.get_recent_activity()
+
+    acc = db.create_account("Testkund", buyer_aliases="testkund", region="Skåne")
+    db.get_all_accounts()
+    db.get_account(acc)
+    db.update_account(acc, notes="x")
+    db.link_procurement_to_account(pid, acc)
+    db.get_procurements_for_account(acc)
+    db.auto_link_procurements_to_accounts()
+    db.add_to_dashboard("anna", acc)
+    db.get_user_dashboard("anna")
+    db.remove_from_dashboard("anna", acc)
+    contact = db.add_contact(acc, "Kim")
+    db.get_contacts(acc)
+    db.delete_contact(contact)
+    watch = db.add_watch("anna", "keyword", keyword="coaching")
+    db.get_watches("anna")
+    db.seed_default_watches("anna")
+    db.get_all_active_watches()
+    db.remove_watch(watch)
+    db.add_contract(acc, "Avtal", contract_end="2027-01-01", procurement_id=pid)
+    db.get_contracts(acc)
+    db.get_all_contracts()
+
+    db.send_message("anna", "hej", to_user="bo", procurement_id=pid)
+    db.get_messages("bo")
+    db.get_messages("bo", other_user="anna")
+    db.get_unread_count("bo")
+    db.mark_messages_read("bo", from_user="anna")
+    db.mark_messages_read("bo")
+    db.get_conversations("bo")
+    event = db.add_calendar_event("anna", "Möte", "2026-03-01", procurement_id=pid)
+    db.get_calendar_events("anna", start_date="2026-01-01", end_date="2026-12-31")
+    db.delete_calendar_event(event)
+    db.create_deadline_calendar_events()
+    note = db.create_notification("anna", "deadline_warning", "Deadline", procurement_id=pid)
+    db.get_notifications("anna", unread_only=True)
+    db.get_notifications("anna")
+    db.get_unread_notification_count("anna")
+    db.mark_notification_read(note)
+    db.mark_all_notifications_read("anna")
+
+    db.archive_expired_procurements()
+    db.deduplicate_procurements()
+    db.cross_source_deduplicate()
+    db.purge_old_expired(days=0)
+    db.check_counters()
+    db.rebuild_counters()
+    db.move_large_text_to_blobs()
+
+
+def test_no_full_scans_of_large_tables(traced):
+    _exercise()
+    conn = sqlite3.connect(str(db.DB_PATH))
+    # Temp tables only exist on the connection that made them
+    for sqls in traced.values():
+        for sql in sqls:
+            if sql.lstrip().upper().startswith("CREATE TEMP"):
+                conn.execute(sql)
+    problems = []
+    for caller, sqls in sorted(traced.items()):
+        if caller in FULL_SCAN_ALLOWED:
+            continue
+        for sql in sorted(sqls):
+            if sql.lstrip().upper().startswith(_SKIP_PREFIXES):
+                continue
+            for table in full_scans(conn, sql):
+                problems.append(f"{caller}: SCAN {table}\n    {' '.join(sql.split())[:200]}")
+    conn.close()
+    assert not problems, "Full table scans:\n" + "\n".join(problems)
+
+
+def test_every_public_function_is_exercised(traced):
+    _exercise()
+    public = {
+        name for name, obj in vars(db).items()
+        if callable(obj) and getattr(obj, "__module__", None) == "db"
+        and not name.startswith("_") and not isinstance(obj, type)
+        and name not in _NOT_QUERIES
+    }
+    missing = public - set(traced)
+    assert not missing, f"Add these to _exercise(): {sorted(missing)}"
+
+
+def test_full_scan_detection():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE procurements (id INTEGER PRIMARY KEY, score INTEGER)")
+    assert full_scans(conn, "SELECT * FROM procurements p WHERE p.score > 5") == ["procurements"]
+    assert full_scans(conn, "SELECT * FROM procurements WHERE id = 1") == []
+    conn.execute("CREATE INDEX idx_score ON procurements(score)")
+    assert full_scans(conn, "SELECT * FROM procurements p WHERE p.score > 5") == []
+    conn.close()
@@ -0,0 +1,129 @@
+"""Tests for per-host rate limiting and Retry-After-aware backoff — offline."""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import httpx
+import pytest
+
+import scrapers.backoff as backoff
+import scrapers.ratelimit as ratelimit
+from scrapers.backoff import arequest, request, with_backoff
+from scrapers.ratelimit import HostLimiter, RateLimit, get_limiter, retry_after
+
+
+def _resp(status, **headers):
+    return httpx.Response(status, headers=headers, request=httpx.Request("GET", "https://x.example/"))
+
+
+class TestTokenBucket:
+    def test_burst_then_paced(self):
+        limiter = HostLimiter(RateLimit(rate=10, burst=2))
+        waits = [limiter.reserve() for _ in range(4)]
+        assert waits[:2] == [0.0, 0.0]
+        assert waits[2] == pytest.approx(0.1, abs=0.01)
+        assert waits[3] == pytest.approx(0.2, abs=0.01)
+
+    def test_refills_over_time(self, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+        limiter = HostLimiter(RateLimit(rate=10, burst=1))
+        assert limiter.reserve() == 0.0
+        now[0] += 0.1
+        assert limiter.reserve() == pytest.approx(0.0)
+
+
+class TestAdaptive:
+    def test_healthy_responses_increase_to_max(self):
+        limiter = HostLimiter(RateLimit(rate=2, burst=1, max_rate=2.5))
+        for _ in range(3):
+            limiter.record(_resp(200))
+        assert limiter.rate == pytest.approx(2.3)
+        for _ in range(20):
+            limiter.record(_resp(200))
+        assert limiter.rate == 2.5
+
+    def test_throttle_halves_down_to_min(self):
+        limiter = HostLimiter(RateLimit(rate=2, burst=1, max_rate=4, min_rate=0.4))
+        limiter.record(_resp(429))
+        assert limiter.rate == 1.0
+        for _ in range(5):
+            limiter.record(_resp(503))
+        assert limiter.rate == 0.4
+
+    def test_fixed_rate_without_max(self):
+        limiter = HostLimiter(RateLimit(rate=2, burst=1))
+        limiter.record(_resp(200))
+        assert limiter.rate == 2
+
+    def test_retry_after_holds_host(self):
+        limiter = HostLimiter(RateLimit(rate=100, burst=10))
+        limiter.record(_resp(429, **{"Retry-After": "5"}))
+        assert limiter.reserve() == pytest.approx(5, abs=0.05)
+
+
+class TestRetryAfter:
+    def test_seconds_and_date(self):
+        assert retry_after(_resp(429, **{"Retry-After": "3"})) == 3
+        when = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+        assert retry_after(_resp(503, **{"Retry-After": when})) == pytest.approx(30, abs=2)
+        assert retry_after(_resp(429, **{"Retry-After": "9999"})) == ratelimit.MAX_RETRY_AFTER
+        assert retry_after(_resp(429, **{"Retry-After": "snart"})) is None
+        assert retry_after(_resp(429)) is None
+
+    def test_backoff_waits_at_least_retry_after(self, monkeypatch):
+        sleeps = []
+        monkeypatch.setattr(backoff.time, "sleep", sleeps.append)
+        responses = iter([_resp(429, **{"Retry-After": "7"}), _resp(200)])
+
+        def fn():
+            r = next(responses)
+            r.raise_for_status()
+            return r
+
+        assert with_backoff(fn).status_code == 200
+        assert len(sleeps) == 1 and sleeps[0] >= 7
+
+    def test_backoff_jittered(self, monkeypatch):
+        sleeps = []
+        monkeypatch.setattr(backoff.time, "sleep", sleeps.append)
+
+        def fn():
+            raise httpx.ConnectError("nere")
+
+        with pytest.raises(httpx.ConnectError):
+            with_backoff(fn, max_retries=3, base_delay=1.0)
+        assert all(0 <= s <= 2 ** i for i, s in enumerate(sleeps))
+
+
+class TestSharedLimits:
+    def test_concurrent_requests_share_host_budget(self, monkeypatch):
+        monkeypatch.setattr(ratelimit, "HOST_LIMITS", {"a.example": RateLimit(rate=50, burst=1)})
+        ratelimit.reset_limiters()
+
+        async def run():
+            transport = httpx.MockTransport(lambda request: httpx.Response(200))
+            async with httpx.AsyncClient(transport=transport) as client:
+                await asyncio.gather(*(arequest(client, "GET", "https://a.example/") for _ in range(10)))
+                await asyncio.gather(*(arequest(client, "GET", "https://b.example/") for _ in range(10)))
+
+        t0 = time.perf_counter()
+        asyncio.run(run())
+        # 9 paced requests at 50/s on a.example; b.example is unlimited here
+        assert 0.17 < time.perf_counter() - t0 < 0.5
+
+    def test_sync_client_feeds_limiter(self, monkeypatch):
+        monkeypatch.setattr(ratelimit, "HOST_LIMITS", {"a.example": RateLimit(rate=4, burst=4, max_rate=8)})
+        monkeypatch.setattr(backoff.time, "sleep", lambda s: None)
+        ratelimit.reset_limiters()
+        statuses = iter([503, 200])
+
+        with httpx.Client(transport=httpx.MockTransport(lambda r: httpx.Response(next(statuses)))) as client:
+            assert request(client, "GET", "https://a.example/").status_code == 200
+        assert get_limiter("a.example").rate == pytest.approx(2.2)
+
+    def test_not_modified_is_not_an_error(self):
+        with httpx.Client(transport=httpx.MockTransport(lambda r: httpx.Response(304))) as client:
+            assert request(client, "GET", "https://a.example/").status_code == 304
@@ -1,6 +1,14 @@
 """Tests for scorer.py — gate, scoring, breakdown structure."""
 
-from scorer import score_procurement, sector_gate
+import json
+import os
+import random
+
+import pytest
+import yaml
+
+import scorer
+from scorer import KeywordMatcher, score_many, score_procurement, sector_gate
 
 
 class TestSectorGate:
@@ -117,3 +125,147 @@ class TestBreakdownStructure:
             assert "code" in match
             assert "bonus" in match
             assert isinstance(match["bonus"], int)
+
+
+def _reference_score(title="", description="", buyer="", cpv_codes=""):
+    """The per-keyword substring scans the automaton replaced."""
+    text = f"{title} {description}".lower()
+    buyer_lower = (buyer or "").lower()
+    cpv_lower = (cpv_codes or "").lower()
+    gate_text = f"{text} {buyer_lower} {cpv_lower}"
+    for sector, keywords in scorer.BLOCKED_SECTORS.items():
+        for kw in keywords:
+            if kw in gate_text:
+                return f"Blockerad sektor ({sector}): {kw}", [], 0
+    if not (any(kw in gate_text for kw in scorer.EDUCATION_GATE_KEYWORDS)
+            or scorer._has_cpv_prefix(cpv_lower, scorer.EDUCATION_CPV_PREFIXES)):
+        return "Ingen utbildnings-/utvecklingssignal", [], 0
+    full_text = f"{text} {cpv_lower}"
+    keywords = [kw for kw in scorer.ALL_KEYWORDS if kw in full_text]
+    buyer_bonus = 8 if any(known in buyer_lower for known in scorer.KNOWN_BUYERS) else 0
+    return "Passerade sector gate", keywords, buyer_bonus
+
+
+def _corpus(n=400):
+    rng = random.Random(11)
+    words = (list(scorer.ALL_KEYWORDS) + scorer.EDUCATION_GATE_KEYWORDS + scorer.KNOWN_BUYERS
+             + [kw for kws in scorer.BLOCKED_SECTORS.values() for kw in kws]
+             + ["för", "och", "av", "Upphandling", "tjänster", "Kommunen", "80532000", "79414000"])
+    cases = [
+        ("Kurs", "executive", "", "coaching"),
+        ("Utbildning", "för executive", "Region Skåne", "coaching,80532000"),
+        ("Team", "", "building AB", ""),
+        ("Ledarskap", "", "Uppsala kommun", "ramavtal"),
+        ("", "", "", ""),
+        ("Kurs", None, None, None),
+    ]
+    for _ in range(n):
+        def pick(k):
+            return " ".join(rng.choice(words) for _ in range(k))
+        cases.append((pick(rng.randint(0, 4)).capitalize(), pick(rng.randint(0, 12)),
+                      pick(rng.randint(0, 2)), rng.choice(["", "80532000", "79414000,80511000", pick(1)])))
+    return cases
+
+
+@pytest.mark.parametrize("backend", scorer.MATCHER_BACKENDS)
+class TestKeywordMatcher:
+    def test_overlapping_matches(self, backend):
+        matcher = KeywordMatcher(["ledarskap", "ledarskapsutbildning", "utbildning", "skap", "aa"], backend)
+        assert sorted(matcher.find("xledarskapsutbildning aaa")) == [
+            (1, 10, "ledarskap"), (1, 21, "ledarskapsutbildning"), (6, 10, "skap"), (11, 21, "utbildning"),
+            (22, 24, "aa"), (23, 25, "aa"),
+        ]
+
+    def test_same_results_as_substring_scans(self, backend, monkeypatch):
+        monkeypatch.setattr(scorer, "_MATCHER", KeywordMatcher(scorer._MATCHER.keywords, backend))
+        for title, description, buyer, cpv in _corpus():
+            reason, keywords, buyer_bonus = _reference_score(title, description or "", buyer, cpv)
+            _, _, breakdown = score_procurement(title, description or "", buyer, cpv)
+            assert sector_gate(title, description or "", buyer, cpv)[1] == reason
+            assert breakdown["gate_reason"] == reason
+            assert [m["keyword"] for m in breakdown["keyword_matches"]] == keywords
+            assert breakdown["buyer_bonus"] == buyer_bonus
+
+
+class TestScoreMany:
+    def test_matches_score_procurement(self):
+        rows = [(t, d or "", b or "", c or "") for t, d, b, c in _corpus(50)]
+        batch = {col: [r[i] for r in rows] for i, col in enumerate(scorer.SCORE_COLUMNS)}
+        result = score_many(batch)
+        assert list(zip(*result)) == [score_procurement(*r) for r in rows]
+
+    def test_dataframe_with_nulls_and_missing_columns(self):
+        pd = pytest.importorskip("pandas")
+        frame = pd.DataFrame({"title": ["Ledarskapsutbildning", "Kontorsmöbler"],
+                              "buyer": ["Region Skåne", None], "cpv_codes": [None, float("nan")]})
+        scores, rationales, breakdowns = score_many(frame)
+        assert scores == [score_procurement("Ledarskapsutbildning", buyer="Region Skåne")[0], 0]
+        assert breakdowns[1]["gate_passed"] is False
+
+    def test_empty_batch(self):
+        assert score_many({"title": []}) == ([], [], [])
+
+
+class TestRuleset:
+    def test_shipped_file_is_active(self):
+        rules = scorer.validate_ruleset(scorer.RULESET_PATH.read_bytes())
+        assert rules == scorer.active_ruleset()
+
+    def test_json_accepted(self):
+        rules = scorer.active_ruleset()
+        assert scorer.validate_ruleset(json.dumps(rules, ensure_ascii=False)) == rules
+
+    def test_reports_every_problem(self):
+        rules = dict(scorer.active_ruleset(), extra=[], hast_cpv_codes={80532000: 20},
+                     high_weight_keywords={"Ledarskap": "hög"})
+        del rules["known_buyers"]
+        with pytest.raises(scorer.RulesetError) as exc:
+            scorer.validate_ruleset(yaml.safe_dump(rules, allow_unicode=True))
+        errors = exc.value.errors
+        assert "extra: okänd tabell" in errors
+        assert "known_buyers: saknas" in errors
+        assert any(e.startswith("hast_cpv_codes: 80532000 ska vara en citerad sträng") for e in errors)
+        assert "high_weight_keywords: 'Ledarskap' ska skrivas med gemener" in errors
+        assert "high_weight_keywords.Ledarskap: ska vara ett heltal" in errors
+
+    def test_unparsable(self):
+        with pytest.raises(scorer.RulesetError, match="Kan inte läsa"):
+            scorer.validate_ruleset("version: [1")
+
+    def test_refresh_reloads_changed_file(self, tmp_ruleset):
+        assert not scorer.refresh_ruleset()
+        tmp_ruleset.write_text(tmp_ruleset.read_text().replace('"workshop": 10', '"workshop": 30'))
+        os.utime(tmp_ruleset, ns=(0, 10**9))
+        assert scorer.refresh_ruleset()
+        assert score_procurement("Workshop")[0] == 30
+
+    def test_touched_file_not_recompiled(self, tmp_ruleset):
+        scorer.refresh_ruleset()
+        matcher = scorer._MATCHER
+        os.utime(tmp_ruleset, ns=(0, 10**9))
+        assert not scorer.refresh_ruleset()
+        assert scorer._MATCHER is matcher
+
+    def test_invalid_file_keeps_tables(self, tmp_ruleset):
+        scorer.refresh_ruleset()
+        before = scorer.ruleset_hash()
+        tmp_ruleset.write_text("version: 2\n")
+        with pytest.raises(scorer.RulesetError):
+            scorer.refresh_ruleset()
+        assert scorer.ruleset_hash() == before
+
+    def test_activate_writes_file_and_keeps_previous(self, tmp_ruleset):
+        old = tmp_ruleset.read_text()
+        before = scorer.ruleset_hash()
+        text = old.replace("version: 1", "version: 2").replace("buyer_bonus: 8", "buyer_bonus: 12")
+        scorer.activate_ruleset(text)
+        assert tmp_ruleset.read_text() == text
+        assert tmp_ruleset.with_name("scoring_rules.v1.yaml").read_text() == old
+        assert scorer.BUYER_BONUS == 12
+        assert scorer.ruleset_hash() != before
+
+    def test_activate_requires_higher_version(self, tmp_ruleset):
+        text = tmp_ruleset.read_text().replace("buyer_bonus: 8", "buyer_bonus: 12")
+        with pytest.raises(scorer.RulesetError, match="högre än den aktiva"):
+            scorer.activate_ruleset(text)
+        assert scorer.BUYER_BONUS == 8
@@ -0,0 +1,77 @@
+"""Tests for FTS5-backed search_procurements — uses isolated tmp database."""
+
+from db import (
+    upsert_procurements, search_procurements, update_score, rebuild_search_index,
+    get_connection, _fts_query,
+)
+
+
+def _seed():
+    return upsert_procurements([
+        {"source": "ted", "source_id": "S1", "title": "Förändringsledning för chefer",
+         "description": "Utbildning i förändringsledning", "buyer": "Region Skåne",
+         "cpv_codes": "80532000"},
+        {"source": "kommers", "source_id": "S2", "title": "Ledarskapsutbildning",
+         "description": "Ledarskapsprogram för mellanchefer", "buyer": "Malmö stad"},
+        {"source": "eavrop", "source_id": "S3", "title": "Asfaltering",
+         "description": "Vägarbeten", "buyer": "Trafikverket"},
+    ])
+
+
+class TestFtsQuery:
+    def test_words_become_prefix_terms(self):
+        assert _fts_query("Ledarskap chef") == '"ledarskap"* "chef"*'
+
+    def test_special_characters_dropped(self):
+        assert _fts_query('"OR" (NEAR) -*') == '"or"* "near"*'
+
+
+class TestSearch:
+    def test_prefix_matches_compound_word(self, tmp_db):
+        _seed()
+        results = search_procurements(query="ledarskap")
+        assert [r["source_id"] for r in results] == ["S2"]
+
+    def test_diacritics_folded(self, tmp_db):
+        _seed()
+        results = search_procurements(query="forandringsledning")
+        assert [r["source_id"] for r in results] == ["S1"]
+
+    def test_buyer_and_cpv_indexed(self, tmp_db):
+        _seed()
+        assert [r["source_id"] for r in search_procurements(query="Trafikverket")] == ["S3"]
+        assert [r["source_id"] for r in search_procurements(query="80532000")] == ["S1"]
+
+    def test_snippet_returned(self, tmp_db):
+        _seed()
+        results = search_procurements(query="mellanchefer")
+        assert "«mellanchefer»" in results[0]["snippet"]
+
+    def test_score_boosts_rank(self, tmp_db):
+        ids = upsert_procurements([
+            {"source": "ted", "source_id": "A", "title": "Coaching", "description": "Coaching"},
+            {"source": "ted", "source_id": "B", "title": "Coaching", "description": "Coaching"},
+        ])
+        update_score(ids["B"], 90, "")
+        results = search_procurements(query="coaching")
+        assert results[0]["source_id"] == "B"
+
+    def test_filters_combine_with_query(self, tmp_db):
+        _seed()
+        assert search_procurements(query="ledarskap", source="ted") == []
+
+    def test_index_follows_updates_and_deletes(self, tmp_db):
+        ids = _seed()
+        upsert_procurements([{"source": "eavrop", "source_id": "S3", "title": "Teamutveckling"}])
+        assert search_procurements(query="asfaltering") == []
+        assert search_procurements(query="teamutveckling")[0]["id"] == ids["S3"]
+        conn = get_connection()
+        conn.execute("DELETE FROM procurements WHERE id = ?", (ids["S3"],))
+        conn.commit()
+        conn.close()
+        assert search_procurements(query="teamutveckling") == []
+
+    def test_rebuild_search_index(self, tmp_db):
+        _seed()
+        assert rebuild_search_index() == 3
+        assert len(search_procurements(query="ledarskap")) == 1
@@ -0,0 +1,205 @@
+"""Tests for bulk upsert in db.py — uses isolated tmp database."""
+
+import run_scrapers
+from db import (
+    upsert_procurements, upsert_procurement, get_all_procurements, get_procurement, get_procurements,
+    get_data_version, update_score, update_scores, get_score_inputs,
+)
+from models import TenderRecord
+import scorer
+from scorer import score_procurement
+
+
+def _record(i: int, **overrides) -> dict:
+    data = {"source": "ted", "source_id": f"BULK-{i}", "title": f"Upphandling {i}"}
+    data.update(overrides)
+    return data
+
+
+class TestUpsertProcurements:
+    def test_inserts_and_returns_mapping(self, tmp_db):
+        ids = upsert_procurements([_record(i) for i in range(5)])
+        assert set(ids) == {f"BULK-{i}" for i in range(5)}
+        assert len(set(ids.values())) == 5
+        assert len(get_all_procurements()) == 5
+
+    def test_update_keeps_row_id(self, tmp_db):
+        first = upsert_procurements([_record(1, title="Gammal titel")])
+        second = upsert_procurements([_record(1, title="Ny titel")])
+        assert first == second
+        assert get_procurement(first["BULK-1"])["title"] == "Ny titel"
+        assert len(get_all_procurements()) == 1
+
+    def test_mixed_insert_and_update(self, tmp_db):
+        upsert_procurements([_record(1)])
+        ids = upsert_procurements([_record(1), _record(2)])
+        assert len(ids) == 2
+        assert len(get_all_procurements()) == 2
+
+    def test_accepts_tender_records(self, tmp_db):
+        records = [TenderRecord(source="kommers", source_id=f"KOM-{i}", title="Coaching") for i in range(3)]
+        ids = upsert_procurements(records)
+        assert set(ids) == {"KOM-0", "KOM-1", "KOM-2"}
+
+    def test_created_at_preserved_on_update(self, tmp_db):
+        row_id = upsert_procurement(_record(1))
+        created = get_procurement(row_id)["created_at"]
+        upsert_procurement(_record(1, title="Ändrad"))
+        assert get_procurement(row_id)["created_at"] == created
+
+    def test_empty_batch(self, tmp_db):
+        assert upsert_procurements([]) == {}
+
+
+class TestContentHash:
+    def test_unchanged_rows_not_rewritten(self, tmp_db):
+        first = upsert_procurements([_record(1), _record(2)])
+        updated_at = get_procurement(first["BULK-1"])["updated_at"]
+        version = get_data_version("procurements")
+
+        second = upsert_procurements([_record(1), _record(2)])
+        assert second == first
+        assert second.changed == []
+        assert get_procurement(first["BULK-1"])["updated_at"] == updated_at
+        assert get_data_version("procurements") == version
+
+    def test_changed_and_new_rows_reported(self, tmp_db):
+        first = upsert_procurements([_record(1), _record(2)])
+        assert first.changed == [first["BULK-1"], first["BULK-2"]]
+        second = upsert_procurements([_record(1), _record(2, buyer="Region Skåne"), _record(3)])
+        assert second.changed == [second["BULK-2"], second["BULK-3"]]
+        assert get_procurement(second["BULK-2"])["buyer"] == "Region Skåne"
+
+    def test_unchanged_rescrape_keeps_score(self, tmp_db):
+        pid = upsert_procurement(_record(1))
+        update_score(pid, 80, "bra")
+        upsert_procurements([_record(1)])
+        assert get_procurement(pid)["score"] == 80
+
+    def test_long_description_change_detected(self, tmp_db):
+        text = "Ledarskap " * 400
+        pid = upsert_procurement(_record(1, description=text))
+        result = upsert_procurements([_record(1, description=text + "tillägg")])
+        assert result.changed == [pid]
+        assert get_procurement(pid)["description"].endswith("tillägg")
+
+    def test_get_procurements_by_id(self, tmp_db):
+        ids = upsert_procurements([_record(i) for i in range(4)])
+        rows = get_procurements([ids["BULK-3"], ids["BULK-1"], 999])
+        assert [r["source_id"] for r in rows] == ["BULK-1", "BULK-3"]
+
+
+class TestUpdateScores:
+    def test_bulk_scores_and_breakdowns(self, tmp_db):
+        ids = upsert_procurements([_record(i) for i in range(3)])
+        update_score(ids["BULK-2"], 5, "gammal", {"total": 5})
+        assert update_scores([
+            (ids["BULK-0"], 40, "ok", {"total": 40}),
+            (ids["BULK-2"], 0, "blockerad", None),
+        ]) == 2
+        assert get_procurement(ids["BULK-0"])["score_breakdown"] == '{"total": 40}'
+        assert get_procurement(ids["BULK-2"])["score_breakdown"] is None
+        assert get_procurement(ids["BULK-2"])["score_rationale"] == "blockerad"
+        assert get_procurement(ids["BULK-1"])["score"] == 0
+
+    def test_unchanged_scores_not_rewritten(self, tmp_db):
+        pid = upsert_procurement(_record(1))
+        update_scores([(pid, 40, "ok", {"total": 40})])
+        updated_at = get_procurement(pid)["updated_at"]
+        version = get_data_version("procurements", "procurement_blobs")
+        update_scores([(pid, 40, "ok", {"total": 40})])
+        assert get_procurement(pid)["updated_at"] == updated_at
+        assert get_data_version("procurements", "procurement_blobs") == version
+
+    def test_score_inputs_columnar(self, tmp_db):
+        ids = upsert_procurements([_record(i, buyer=f"Kommun {i}") for i in range(3)])
+        inputs = get_score_inputs([ids["BULK-2"], ids["BULK-0"]])
+        assert inputs["id"] == [ids["BULK-0"], ids["BULK-2"]]
+        assert inputs["buyer"] == ["Kommun 0", "Kommun 2"]
+        assert len(get_score_inputs()["title"]) == 3
+
+    def test_score_all_matches_per_row_scoring(self, tmp_db):
+        upsert_procurements([
+            _record(1, title="Ledarskapsutbildning", buyer="Region Skåne", cpv_codes="80532000"),
+            _record(2, title="Asfaltering"),
+            _record(3, title="Workshop", description=None),
+        ])
+        assert run_scrapers.score_all(on_progress=lambda msg: None) == 3
+        for p in get_all_procurements():
+            score, rationale, breakdown = score_procurement(p["title"], p["description"] or "",
+                                                            p["buyer"] or "", p["cpv_codes"] or "")
+            stored = get_procurement(p["id"])
+            assert (stored["score"], stored["score_rationale"]) == (score, rationale)
+
+
+class TestRulesetRescoring:
+    def _score_all(self, **kwargs):
+        return run_scrapers.score_all(on_progress=lambda msg: None, **kwargs)
+
+    def test_unchanged_run_scores_nothing(self, tmp_db):
+        upsert_procurements([_record(i, title="Ledarskapsutbildning") for i in range(3)])
+        assert self._score_all() == 3
+        assert self._score_all() == 0
+        assert get_score_inputs(ruleset=scorer.ruleset_hash())["id"] == []
+
+    def test_changed_content_rescored(self, tmp_db):
+        ids = upsert_procurements([_record(i, title="Ledarskapsutbildning") for i in range(3)])
+        self._score_all()
+        upsert_procurements([_record(1, title="Asfaltering")])
+        assert self._score_all() == 1
+        assert get_procurement(ids["BULK-1"])["score"] == 0
+
+    def test_ruleset_change_rescores_everything(self, tmp_db, monkeypatch):
+        upsert_procurements([_record(i, title="Ledarskapsutbildning") for i in range(3)])
+        self._score_all()
+        before = scorer.ruleset_hash()
+        assert scorer.ruleset_hash() == before
+        monkeypatch.setitem(scorer.HIGH_WEIGHT_KEYWORDS, "ledarskapsutbildning", 30)
+        assert scorer.ruleset_hash() != before
+        assert self._score_all() == 3
+        monkeypatch.setattr(scorer, "SCORER_VERSION", scorer.SCORER_VERSION + 1)
+        assert self._score_all() == 3
+
+    def test_rescore_all_keeps_unchanged_rows_untouched(self, tmp_db):
+        ids = upsert_procurements([_record(i, title="Ledarskapsutbildning") for i in range(2)])
+        self._score_all()
+        updated_at = get_procurement(ids["BULK-0"])["updated_at"]
+        version = get_data_version("procurements")
+        assert self._score_all(rescore_all=True) == 2
+        assert get_procurement(ids["BULK-0"])["updated_at"] == updated_at
+        assert get_data_version("procurements") == version
+
+    def test_manual_score_is_rescored(self, tmp_db):
+        pid = upsert_procurement(_record(1, title="Ledarskapsutbildning"))
+        self._score_all()
+        update_score(pid, 99, "manuell")
+        assert self._score_all() == 1
+        assert get_procurement(pid)["score"] != 99
+
+    def test_worker_pool_matches_in_process(self, tmp_db, monkeypatch):
+        upsert_procurements([
+            _record(i, title=t, buyer="Region Skåne" if i % 2 else "", cpv_codes="80532000" if i % 3 else "")
+            for i, t in enumerate(["Ledarskapsutbildning", "Asfaltering", "Workshop", "Coachning", "Städning"])
+        ])
+        monkeypatch.setattr(run_scrapers, "SCORE_BATCH", 2)
+        self._score_all()
+        expected = {p["id"]: (p["score"], p["score_rationale"]) for p in get_all_procurements()}
+        assert self._score_all(rescore_all=True, workers=2) == 5
+        assert {p["id"]: (p["score"], p["score_rationale"]) for p in get_all_procurements()} == expected
+
+    def test_workers_score_with_parent_ruleset(self, tmp_db, monkeypatch):
+        ids = upsert_procurements([_record(i, title="Ledarskapsutbildning", buyer="Region Skåne") for i in range(4)])
+        monkeypatch.setattr(run_scrapers, "SCORE_BATCH", 2)
+        monkeypatch.setattr(scorer, "BUYER_BONUS", 40)
+        assert self._score_all(workers=2) == 4
+        assert get_procurement(ids["BULK-3"])["score"] == score_procurement("Ledarskapsutbildning", buyer="Region Skåne")[0]
+
+    def test_activated_ruleset_rescored_in_background(self, tmp_db, tmp_ruleset):
+        ids = upsert_procurements([_record(1, title="Ledarskapsutbildning"), _record(2, title="Asfaltering")])
+        self._score_all()
+        text = tmp_ruleset.read_text().replace("version: 1", "version: 2").replace(
+            '"ledarskapsutbildning": 25', '"ledarskapsutbildning": 40')
+        scorer.activate_ruleset(text)
+        assert run_scrapers.rescore_in_background().result(timeout=30) == 2
+        assert get_procurement(ids["BULK-1"])["score"] == 55
+        assert get_procurement(ids["BULK-1"])["scored_ruleset"] == scorer.ruleset_hash()
@@ -0,0 +1,108 @@
+"""Tests for the serialized writer (submit_write) in db.py."""
+
+import sqlite3
+import threading
+
+import pytest
+
+import db
+from db import (
+    submit_write, upsert_procurement, save_label, get_label, add_procurement_note,
+    get_procurement_notes, close_all_connections,
+)
+
+
+@pytest.fixture()
+def pid(tmp_db):
+    return upsert_procurement({"source": "ted", "source_id": "W1", "title": "T"})
+
+
+def _hold_writer() -> threading.Event:
+    """Queue a write that blocks the writer until the returned event is set."""
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocker():
+        started.set()
+        release.wait(5)
+
+    submit_write(blocker)
+    started.wait(5)
+    return release
+
+
+class TestSubmitWrite:
+    def test_returns_result_after_commit(self, pid):
+        label_id = submit_write(save_label, pid, "relevant", "bra").result(timeout=5)
+        assert isinstance(label_id, int)
+        assert get_label(pid)["reason"] == "bra"
+
+    def test_exception_reported_on_future(self, pid):
+        future = submit_write(save_label, pid, "kanske")
+        with pytest.raises(sqlite3.IntegrityError):
+            future.result(timeout=5)
+
+    def test_queued_writes_are_group_committed(self, pid, monkeypatch):
+        sizes = []
+        commit = db._Writer._commit
+        monkeypatch.setattr(db._Writer, "_commit",
+                            lambda self, conn, batch: (sizes.append(len(batch)), commit(self, conn, batch)))
+        release = _hold_writer()
+        futures = [submit_write(add_procurement_note, pid, "anna", f"n{i}") for i in range(10)]
+        release.set()
+        for f in futures:
+            f.result(timeout=5)
+        assert sizes[-1] == 10
+        assert len(get_procurement_notes(pid)) == 10
+
+    def test_failed_write_rolled_back_alone(self, pid):
+        release = _hold_writer()
+        ok1 = submit_write(add_procurement_note, pid, "anna", "före")
+        bad = submit_write(save_label, pid, "kanske")
+        ok2 = submit_write(add_procurement_note, pid, "anna", "efter")
+        release.set()
+        ok1.result(timeout=5)
+        ok2.result(timeout=5)
+        assert isinstance(bad.exception(timeout=5), sqlite3.IntegrityError)
+        assert {n["content"] for n in get_procurement_notes(pid)} == {"före", "efter"}
+
+    def test_partial_write_undone_on_error(self, pid):
+        def half_done():
+            add_procurement_note(pid, "anna", "halv")
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            submit_write(half_done).result(timeout=5)
+        assert get_procurement_notes(pid) == []
+
+    def test_concurrent_sessions(self, pid):
+        errors = []
+
+        def session(user):
+            try:
+                for i in range(25):
+                    submit_write(add_procurement_note, pid, user, f"{user}-{i}").result(timeout=10)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=session, args=(f"kam{n}",)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert errors == []
+        assert len(get_procurement_notes(pid)) == 200
+
+    def test_nested_submit_runs_inline(self, pid):
+        def outer():
+            return submit_write(save_label, pid, "relevant").result(timeout=5)
+
+        assert isinstance(submit_write(outer).result(timeout=5), int)
+
+    def test_close_drains_queue(self, pid):
+        release = _hold_writer()
+        futures = [submit_write(add_procurement_note, pid, "anna", f"n{i}") for i in range(5)]
+        release.set()
+        close_all_connections()
+        assert all(f.done() and f.exception() is None for f in futures)
+        assert len(get_procurement_notes(pid)) == 5